@@ -3,11 +3,28 @@ Build vector index from handbook markdown files.
 
 This script orchestrates the indexing pipeline for each handbook:
 1. Load and parse each handbook
-2. Create RAG chunks for each handbook
+2. Create RAG chunks for each handbook (in parallel worker processes)
 3. Save chunks to JSONL file for each handbook
-4. Generate embeddings and create vector store for each handbook
+4. Generate embeddings concurrently within the configured rate limits,
+   checkpointing every batch in the document embedding cache
+5. Create or update the vector store for each handbook
+   (or, with UNIFIED_INDEX, one combined store for all handbooks)
+6. Publish the new index version
+
+Builds are incremental: chunks carry content-hash IDs, and each store keeps
+a manifest of the chunks it holds, so only new or edited chunks are embedded
+and deleted chunks are removed. Pass --full to rebuild every store from scratch.
+
+The stores being served are never modified: each build copies them into a
+new version directory (vectorstore/versions/<version>/), updates the copy,
+and then points vectorstore/CURRENT at it. Running servers pick the new
+version up without a restart.
 """
 
+import argparse
+import shutil
+from pathlib import Path
+
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -15,15 +32,50 @@ load_dotenv()
 
 from indexing import (
     load_handbooks,
-    chunk_markdown_intelligently,
+    assign_chunk_ids,
+    chunk_handbooks_parallel,
+    precompute_embeddings,
     generate_embeddings,
+    update_embeddings,
 )
-from utils import save_chunks_to_jsonl
-from config import JSONL_DIR
+from utils import (
+    ChunkStore,
+    save_chunks_to_jsonl,
+    write_index_version,
+    new_index_version,
+    index_version_dir,
+    resolve_index_dir,
+    publish_index_version,
+    prune_index_versions,
+)
+from config import (
+    CHUNK_STORE_DIR,
+    JSONL_DIR,
+    UNIFIED_INDEX,
+    UNIFIED_INDEX_NAME,
+    VECTOR_STORE_PATH,
+    INDEX_BUILD_WORKERS,
+    INDEX_VERSIONS_TO_KEEP,
+)
+
 
+def _build_store(chunks, store_name: str, full: bool, current_dir: Path, build_dir: Path) -> dict:
+    """Rebuild a store from scratch, or update a copy of the current store incrementally."""
+    if full:
+        generate_embeddings(chunks=chunks, handbook_name=store_name, base_persist_directory=build_dir)
+        return {"added": len(chunks), "removed": 0, "unchanged": 0, "moved": 0, "rebuilt": 1}
+    if (current_dir / store_name).exists():
+        shutil.copytree(current_dir / store_name, build_dir / store_name)
+    return update_embeddings(chunks=chunks, handbook_name=store_name, base_persist_directory=build_dir)
 
-def main():
-    """Main function to build the index."""
+
+def main(full: bool = False):
+    """
+    Main function to build the index.
+    
+    Args:
+        full: Rebuild every store instead of updating the stores incrementally.
+    """
     print("=" * 60)
     print("Building Vector Index from Handbooks")
     print("=" * 60)
@@ -38,38 +90,91 @@ def main():
         print("No handbooks found in data directory!")
         return
     
-    # Process each handbook independently
+    # Step 2: Create RAG chunks, one handbook per worker process
+    print(f"\n{'='*60}")
+    print(f"Step 2: Creating chunks ({INDEX_BUILD_WORKERS} worker processes)...")
+    print(f"{'='*60}")
+    chunks_by_handbook = chunk_handbooks_parallel(handbooks, workers=INDEX_BUILD_WORKERS)
+    
     total_chunks = 0
+    all_chunks = []
+    changes = {"added": 0, "removed": 0, "unchanged": 0, "moved": 0, "rebuilt": 0}
     
-    for handbook_name, content in handbooks.items():
-        print(f"\n{'='*60}")
-        print(f"Processing: {handbook_name}")
-        print(f"{'='*60}")
-        
-        # Step 2: Create RAG chunks for this handbook
-        print(f"Step 2: Creating chunks for {handbook_name}...")
-        chunks = chunk_markdown_intelligently(content, handbook_name)
-        total_chunks += len(chunks)
-        
-        # Step 3: Save chunks to JSONL file
-        print(f"Step 3: Saving chunks to JSONL for {handbook_name}...")
-        # Ensure jsonl directory exists
-        JSONL_DIR.mkdir(parents=True, exist_ok=True)
+    # Step 3: Save chunks (with their content-hash IDs) as chunk stores,
+    # plus JSONL exports
+    print(f"\n{'='*60}")
+    print("Step 3: Saving chunks...")
+    print(f"{'='*60}")
+    # Ensure jsonl directory exists
+    JSONL_DIR.mkdir(parents=True, exist_ok=True)
+    for handbook_name, chunks in chunks_by_handbook.items():
+        assign_chunk_ids(chunks, handbook_name)
+        ChunkStore.write(CHUNK_STORE_DIR / handbook_name, chunks)
         chunks_file = JSONL_DIR / f"{handbook_name}_chunks.jsonl"
         save_chunks_to_jsonl(chunks, chunks_file)
-        print(f"✓ Saved {len(chunks)} chunks to {chunks_file}")
-        
-        # Step 4: Generate embeddings and create vector store
-        print(f"Step 4: Generating embeddings and creating vector store for {handbook_name}...")
-        try:
-            vector_store = generate_embeddings(
-                chunks=chunks,
-                handbook_name=handbook_name,
-            )
-            print(f"✓ Vector store created for {handbook_name}")
-        except ValueError as e:
-            print(f"Error: {e}")
-            return
+        print(f"✓ Saved {len(chunks)} chunks to {CHUNK_STORE_DIR / handbook_name}/ and {chunks_file}")
+        total_chunks += len(chunks)
+        all_chunks.extend(chunks)
+    
+    # Step 4: Embed every chunk not embedded before, concurrently and rate limited.
+    # Each batch is checkpointed in the document embedding cache, so an
+    # interrupted build resumes from there.
+    print(f"\n{'='*60}")
+    print("Step 4: Generating embeddings...")
+    print(f"{'='*60}")
+    try:
+        embedding_stats = precompute_embeddings(all_chunks)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if embedding_stats is None:
+        print("Document embedding cache disabled; each store embeds its own chunks")
+    else:
+        print(
+            f"✓ {embedding_stats['embedded']} chunks embedded, {embedding_stats['cached']} reused "
+            f"({embedding_stats['batches']} batches, {embedding_stats['tokens']} tokens, "
+            f"{embedding_stats['seconds']}s, {embedding_stats['rate_limit_wait_seconds']}s rate limited)"
+        )
+    
+    # Step 5: Create or update the vector stores (vectors come from the cache)
+    # in a new version directory, leaving the served version untouched
+    current_dir, current_version = resolve_index_dir(VECTOR_STORE_PATH)
+    index_version = new_index_version()
+    build_dir = index_version_dir(VECTOR_STORE_PATH, index_version)
+    print(f"\n{'='*60}")
+    print(f"Step 5: Updating vector stores (version {index_version})...")
+    print(f"{'='*60}")
+    try:
+        if UNIFIED_INDEX:
+            # One store for all handbooks, tagged with "handbook" metadata
+            changes = _build_store(all_chunks, UNIFIED_INDEX_NAME, full, current_dir, build_dir)
+            print(f"✓ Unified vector store up to date for {len(handbooks)} handbooks")
+        else:
+            for handbook_name, chunks in chunks_by_handbook.items():
+                store_changes = _build_store(chunks, handbook_name, full, current_dir, build_dir)
+                for key, value in store_changes.items():
+                    changes[key] += value
+                print(f"✓ Vector store up to date for {handbook_name}")
+    except ValueError as e:
+        print(f"Error: {e}")
+        shutil.rmtree(build_dir, ignore_errors=True)
+        return
+    except BaseException:
+        # Never leave a half-built version behind (crashes, Ctrl+C)
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    
+    # Step 6: Publish the new version (caches derived from the previous index
+    # are invalidated by the version change), or drop it if nothing changed
+    if changes["added"] or changes["removed"] or changes["moved"] or changes["rebuilt"]:
+        write_index_version(build_dir, index_version)
+        publish_index_version(VECTOR_STORE_PATH, index_version)
+        pruned = prune_index_versions(VECTOR_STORE_PATH, INDEX_VERSIONS_TO_KEEP)
+        if pruned:
+            print(f"Deleted old index versions: {', '.join(pruned)}")
+    else:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        index_version = f"{current_version} (unchanged)"
     
     # Summary
     print(f"\n{'='*60}")
@@ -77,11 +182,22 @@ def main():
     print(f"{'='*60}")
     print(f"Total handbooks processed: {len(handbooks)}")
     print(f"Total chunks created: {total_chunks}")
+    print(f"Chunks added: {changes['added']}, removed: {changes['removed']}, unchanged: {changes['unchanged']}")
+    print(f"Index version: {index_version}")
     print(f"\nFiles created:")
+    served_dir = resolve_index_dir(VECTOR_STORE_PATH)[0].relative_to(VECTOR_STORE_PATH.parent)
     for handbook_name in handbooks.keys():
+        print(f"  - chunks/{handbook_name}/ (chunk store)")
         print(f"  - jsonl/{handbook_name}_chunks.jsonl")
-        print(f"  - vectorstore/{handbook_name}/ (vector store directory)")
+        if not UNIFIED_INDEX:
+            print(f"  - {served_dir / handbook_name}/ (vector store directory)")
+    if UNIFIED_INDEX:
+        print(f"  - {served_dir / UNIFIED_INDEX_NAME}/ (unified vector store directory)")
+    print(f"  - vectorstore/CURRENT")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build or incrementally update the vector index")
+    parser.add_argument("--full", action="store_true", help="Rebuild every store instead of updating only changed chunks")
+    args = parser.parse_args()
+    main(full=args.full)
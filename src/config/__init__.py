@@ -6,14 +6,67 @@ from .config import (
     HANDBOOKS_DIR,
     OUTPUT_DIR,
     JSONL_DIR,
+    CHUNK_STORE_DIR,
     CHUNK_SIZE,
     CHUNK_OVERLAP,
+    CHUNKING_STRATEGY,
     OPENAI_MODEL,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_PATH,
+    DOCUMENT_EMBEDDING_CACHE_PATH,
+    DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES,
+    INDEX_BUILD_WORKERS,
+    INDEXING_EMBEDDING_BATCH_SIZE,
+    INDEXING_EMBEDDING_CONCURRENCY,
+    EMBEDDING_RATE_LIMIT_RPM,
+    EMBEDDING_RATE_LIMIT_TPM,
+    EMBEDDING_BATCHING,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+    EMBEDDING_BATCH_MAX_SIZE,
     LLM_MODEL,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_HTTP_KEEPALIVE_SECONDS,
+    LLM_HTTP_TIMEOUT_SECONDS,
+    ROUTING_STRATEGY,
+    EMBEDDING_ROUTER_TOP_M,
+    EMBEDDING_ROUTER_MARGIN,
+    EMBEDDING_ROUTER_MIN_SIMILARITY,
+    ROUTING_CACHE_ENABLED,
+    ROUTING_CACHE_MAX_DISTANCE,
+    ROUTING_CACHE_TTL_SECONDS,
+    ROUTING_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_DISTANCE,
+    RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    SINGLE_FLIGHT_ENABLED,
+    SESSION_STORE_BACKEND,
+    SESSION_STORE_PATH,
+    SESSION_MAX_SESSIONS,
+    SESSION_TTL_SECONDS,
+    CONVERSATION_MAX_MESSAGES,
+    SESSION_MAX_PENDING_TURNS,
+    EVALUATION_MODE,
+    EVALUATION_SAMPLE_RATE,
+    EVALUATION_QUEUE_MAX_SIZE,
+    EVALUATION_WORKERS,
+    EVALUATION_FLUSH_INTERVAL_SECONDS,
+    EVALUATION_FLUSH_BATCH_SIZE,
     VECTOR_STORE_TYPE,
     VECTOR_STORE_PATH,
+    INDEX_VERSIONS_TO_KEEP,
+    INDEX_WATCH_INTERVAL_SECONDS,
+    SHARED_INDEX_ENABLED,
+    SHARED_INDEX_PATH,
+    SERVER_WORKERS,
+    UNIFIED_INDEX,
+    UNIFIED_INDEX_NAME,
     MIN_SIMILARITY,
     DEFAULT_K,
+    SPECULATIVE_RETRIEVAL,
+    SPECULATIVE_RETRIEVAL_K,
     HEADERS_TO_SPLIT_ON,
     TEXT_SPLITTER_SEPARATORS,
 )
@@ -24,14 +77,67 @@ __all__ = [
     "HANDBOOKS_DIR",
     "OUTPUT_DIR",
     "JSONL_DIR",
+    "CHUNK_STORE_DIR",
     "CHUNK_SIZE",
     "CHUNK_OVERLAP",
+    "CHUNKING_STRATEGY",
     "OPENAI_MODEL",
+    "QUERY_EMBEDDING_CACHE_SIZE",
+    "QUERY_EMBEDDING_CACHE_PATH",
+    "DOCUMENT_EMBEDDING_CACHE_PATH",
+    "DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES",
+    "INDEX_BUILD_WORKERS",
+    "INDEXING_EMBEDDING_BATCH_SIZE",
+    "INDEXING_EMBEDDING_CONCURRENCY",
+    "EMBEDDING_RATE_LIMIT_RPM",
+    "EMBEDDING_RATE_LIMIT_TPM",
+    "EMBEDDING_BATCHING",
+    "EMBEDDING_BATCH_MAX_WAIT_MS",
+    "EMBEDDING_BATCH_MAX_SIZE",
     "LLM_MODEL",
+    "LLM_HTTP_MAX_CONNECTIONS",
+    "LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+    "LLM_HTTP_KEEPALIVE_SECONDS",
+    "LLM_HTTP_TIMEOUT_SECONDS",
+    "ROUTING_STRATEGY",
+    "EMBEDDING_ROUTER_TOP_M",
+    "EMBEDDING_ROUTER_MARGIN",
+    "EMBEDDING_ROUTER_MIN_SIMILARITY",
+    "ROUTING_CACHE_ENABLED",
+    "ROUTING_CACHE_MAX_DISTANCE",
+    "ROUTING_CACHE_TTL_SECONDS",
+    "ROUTING_CACHE_MAX_ENTRIES",
+    "RESPONSE_CACHE_ENABLED",
+    "RESPONSE_CACHE_MAX_DISTANCE",
+    "RESPONSE_CACHE_TTL_SECONDS",
+    "RESPONSE_CACHE_MAX_ENTRIES",
+    "RESPONSE_CACHE_MAX_BYTES",
+    "SINGLE_FLIGHT_ENABLED",
+    "SESSION_STORE_BACKEND",
+    "SESSION_STORE_PATH",
+    "SESSION_MAX_SESSIONS",
+    "SESSION_TTL_SECONDS",
+    "CONVERSATION_MAX_MESSAGES",
+    "SESSION_MAX_PENDING_TURNS",
+    "EVALUATION_MODE",
+    "EVALUATION_SAMPLE_RATE",
+    "EVALUATION_QUEUE_MAX_SIZE",
+    "EVALUATION_WORKERS",
+    "EVALUATION_FLUSH_INTERVAL_SECONDS",
+    "EVALUATION_FLUSH_BATCH_SIZE",
     "VECTOR_STORE_TYPE",
     "VECTOR_STORE_PATH",
+    "INDEX_VERSIONS_TO_KEEP",
+    "INDEX_WATCH_INTERVAL_SECONDS",
+    "SHARED_INDEX_ENABLED",
+    "SHARED_INDEX_PATH",
+    "SERVER_WORKERS",
+    "UNIFIED_INDEX",
+    "UNIFIED_INDEX_NAME",
     "MIN_SIMILARITY",
     "DEFAULT_K",
+    "SPECULATIVE_RETRIEVAL",
+    "SPECULATIVE_RETRIEVAL_K",
     "HEADERS_TO_SPLIT_ON",
     "TEXT_SPLITTER_SEPARATORS",
 ]
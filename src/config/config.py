@@ -17,25 +17,118 @@ DATA_DIR = PROJECT_ROOT / "data"
 HANDBOOKS_DIR = DATA_DIR / "handbooks"
 OUTPUT_DIR = DATA_DIR
 JSONL_DIR = DATA_DIR / "jsonl"
+CHUNK_STORE_DIR = DATA_DIR / "chunks"  # Memory-mapped chunk stores (one directory per handbook)
 
 # Chunking configuration
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 100  # 10% of CHUNK_SIZE
+CHUNKING_STRATEGY = "streaming"  # "streaming" (single pass, records byte offsets) or "langchain" (header + recursive splitters)
 
 # Embedding model configuration
 OPENAI_MODEL = "text-embedding-ada-002"
 
+# Query embedding cache (normalized query text -> vector)
+QUERY_EMBEDDING_CACHE_SIZE = 2048  # Max vectors held in the in-memory LRU (0 disables caching)
+QUERY_EMBEDDING_CACHE_PATH = DATA_DIR / "cache" / "query_embeddings.sqlite3"  # On-disk tier (None disables)
+
+# Document embedding cache used while indexing ((model, chunk text) -> vector)
+DOCUMENT_EMBEDDING_CACHE_PATH = DATA_DIR / "cache" / "document_embeddings.sqlite3"  # None disables
+DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES = 100000  # Least recently used vectors are dropped beyond this
+
+# Index build pipeline
+INDEX_BUILD_WORKERS = 4  # Processes used to chunk handbooks
+INDEXING_EMBEDDING_BATCH_SIZE = 96  # Chunks per embedding request
+INDEXING_EMBEDDING_CONCURRENCY = 4  # Embedding requests in flight
+EMBEDDING_RATE_LIMIT_RPM = 3000  # Requests per minute budget (None for unlimited)
+EMBEDDING_RATE_LIMIT_TPM = 1000000  # Tokens per minute budget (None for unlimited)
+
+# Micro-batching of concurrent query embeddings into one embed_documents request
+EMBEDDING_BATCHING = True
+EMBEDDING_BATCH_MAX_WAIT_MS = 5  # Maximum latency added to a query while its batch fills
+EMBEDDING_BATCH_MAX_SIZE = 64  # Maximum texts per embedding request
+
 # LLM configuration for routing
 LLM_MODEL = "gpt-4o-mini"  # Model for orchestrator routing decisions
 
+# HTTP connection pool shared by every LLM and embedding client of a process
+LLM_HTTP_MAX_CONNECTIONS = 100  # Concurrent requests to the provider (more wait for a connection)
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = 20  # Idle connections kept open for reuse
+LLM_HTTP_KEEPALIVE_SECONDS = 30  # Idle connections are closed after this
+LLM_HTTP_TIMEOUT_SECONDS = 60  # Request timeout
+
+# Routing strategy: "llm" (always LLM) or "hybrid" (embedding router, LLM only when ambiguous).
+# The router thresholds below are uncalibrated; run src/evaluation/routing_benchmark.py on
+# the golden datasets and set them from its accuracy/coverage before enabling "hybrid".
+ROUTING_STRATEGY = "llm"
+EMBEDDING_ROUTER_TOP_M = 3  # Best-matching chunks averaged per handbook
+EMBEDDING_ROUTER_MARGIN = 0.03  # Score lead over the runner-up required to skip the LLM
+EMBEDDING_ROUTER_MIN_SIMILARITY = 0.78  # Minimum score of the winning handbook to skip the LLM
+
+# Semantic routing cache: reuse the routing decision of a near-identical earlier query
+ROUTING_CACHE_ENABLED = True
+# Maximum cosine distance between queries to reuse a decision. ada-002 packs text tightly: among
+# the 289 indexed chunks, 3 pairs of different chunks (one across handbooks) lie within 0.05 and
+# none within 0.02; short questions sit even closer. routing_benchmark.py reports the closest
+# golden queries with different expected routes, which this must stay below.
+ROUTING_CACHE_MAX_DISTANCE = 0.02
+ROUTING_CACHE_TTL_SECONDS = 3600  # Lifetime of a cached decision
+ROUTING_CACHE_MAX_ENTRIES = 1024  # Maximum cached decisions (least recently used are replaced)
+
+# Semantic response cache: answer near-identical, context-free questions without retrieval/generation
+RESPONSE_CACHE_ENABLED = False
+# Maximum cosine distance between queries to reuse an answer (kept at ROUTING_CACHE_MAX_DISTANCE:
+# a wrong answer costs more than a wrong route)
+RESPONSE_CACHE_MAX_DISTANCE = 0.02
+RESPONSE_CACHE_TTL_SECONDS = 3600  # Lifetime of a cached answer (index rebuilds also invalidate)
+RESPONSE_CACHE_MAX_ENTRIES = 2048  # Maximum cached answers
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory bound for cached answers
+SINGLE_FLIGHT_ENABLED = True  # Identical context-free queries arriving while one is processed share its answer
+
+# Conversation sessions (one per session_id / client IP)
+SESSION_STORE_BACKEND = "memory"  # "memory" (per process) or "sqlite" (survives restarts, shared by workers)
+SESSION_STORE_PATH = DATA_DIR / "cache" / "sessions.sqlite3"  # Used by the sqlite backend
+SESSION_MAX_SESSIONS = 10000  # Least recently used sessions are evicted beyond this
+SESSION_TTL_SECONDS = 3600  # Sessions idle for longer are dropped
+CONVERSATION_MAX_MESSAGES = 20  # Messages kept per session
+SESSION_MAX_PENDING_TURNS = 4  # Queries of one session allowed to wait behind its running query (more get 429)
+
+# Response quality evaluation (LLM-as-a-Judge)
+EVALUATION_MODE = "background"  # "background" (queued, off the request path), "inline" or "off"
+EVALUATION_SAMPLE_RATE = 1.0  # Fraction of responses evaluated in background mode
+EVALUATION_QUEUE_MAX_SIZE = 1000  # Queued evaluations beyond this are dropped
+EVALUATION_WORKERS = 2  # Concurrent background evaluation tasks
+EVALUATION_FLUSH_INTERVAL_SECONDS = 5  # Maximum delay before scores are uploaded to Langfuse
+EVALUATION_FLUSH_BATCH_SIZE = 20  # Upload as soon as this many scores are pending
+
 # Vector store configuration
-VECTOR_STORE_TYPE = "chroma"  # Options: "chroma" or "faiss"
+VECTOR_STORE_TYPE = "chroma"  # Options: "chroma", "faiss" or "numpy" (memory-mapped brute force)
 VECTOR_STORE_PATH = DATA_DIR / "vectorstore"
 
+# Index versions: each build is written to vectorstore/versions/<version>/ and
+# published by pointing vectorstore/CURRENT at it; running servers swap to it
+INDEX_VERSIONS_TO_KEEP = 3  # Versions kept on disk, including the current one
+INDEX_WATCH_INTERVAL_SECONDS = 10  # How often the API checks CURRENT for a new version (None disables)
+
+# Shared index for multi-worker serving: the served version is copied once per
+# host into SHARED_INDEX_PATH as memory-mapped NumPy stores that every worker attaches to
+SHARED_INDEX_ENABLED = False
+SHARED_INDEX_PATH = (
+    Path("/dev/shm/multi-agent-rag-index") if Path("/dev/shm").is_dir() else DATA_DIR / "shared_index"
+)  # On tmpfs the copy lives in RAM, mapped by every worker
+SERVER_WORKERS = 1  # Worker processes started by `python src/main.py`
+
+# Unified index: one store holding every handbook, filtered by "handbook" metadata
+UNIFIED_INDEX = False  # If True, build_index.py builds and the API loads a single combined index
+UNIFIED_INDEX_NAME = "all_handbooks"  # Directory/collection name of the combined index
+
 # RAG retrieval configuration
 MIN_SIMILARITY = 0.7  # Minimum similarity threshold for retrieved context (0.0 to 1.0)
 DEFAULT_K = 5  # Default number of documents to retrieve (final count after filtering)
 
+# Speculative retrieval: search every handbook while the routing decision is being made
+SPECULATIVE_RETRIEVAL = True
+SPECULATIVE_RETRIEVAL_K = 10  # Raw results per handbook (agents filter these down to their k)
+
 # Markdown header levels to split on
 HEADERS_TO_SPLIT_ON = [
     ("#", "Header 1"),
@@ -1,8 +1,10 @@
 """Evaluation framework using Langfuse for automatic quality scoring."""
 
 from .langfuse_evaluator import LangfuseEvaluator, QualityScore
+from .evaluation_queue import EvaluationQueue
 
 __all__ = [
     "LangfuseEvaluator",
     "QualityScore",
+    "EvaluationQueue",
 ]
@@ -0,0 +1,207 @@
+"""Background queue that scores responses off the request path."""
+
+import asyncio
+import random
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from evaluation.langfuse_evaluator import LangfuseEvaluator, QualityScore
+
+
+class EvaluationQueue:
+    """
+    Runs LLM-as-a-Judge evaluations in background worker tasks.
+    
+    Responses are sampled at `sample_rate` and queued without waiting for the
+    judge; a bounded queue means that under overload evaluations are dropped
+    rather than delaying answers. Worker tasks run the judge concurrently and
+    the resulting scores are uploaded to Langfuse in batches.
+    
+    Results are kept (bounded) so clients can fetch a score by evaluation ID
+    once it is ready.
+    """
+    
+    def __init__(
+        self,
+        evaluator: LangfuseEvaluator,
+        sample_rate: float = 1.0,
+        max_size: int = 1000,
+        workers: int = 2,
+        flush_interval_seconds: float = 5.0,
+        flush_batch_size: int = 20,
+        max_results: int = 10000,
+    ):
+        """
+        Initialize the queue (workers start on first submit).
+        
+        Args:
+            evaluator: Evaluator used to score responses
+            sample_rate: Fraction of responses to evaluate (0.0 to 1.0)
+            max_size: Maximum queued evaluations; further submissions are dropped
+            workers: Number of concurrent worker tasks
+            flush_interval_seconds: Maximum delay before scores are uploaded
+            flush_batch_size: Upload as soon as this many scores are pending
+            max_results: Number of evaluation results kept for lookup
+        """
+        self.evaluator = evaluator
+        self.sample_rate = sample_rate
+        self.max_size = max_size
+        self.workers = workers
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_batch_size = flush_batch_size
+        self.max_results = max_results
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending_scores: List[Tuple[QualityScore, Optional[str]]] = []
+        self._flush_event: Optional[asyncio.Event] = None
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        self.submitted = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self.uploaded = 0
+    
+    def _ensure_started(self):
+        """Start worker and flusher tasks on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._flush_event = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._flusher()))
+    
+    def submit(self, query: str, response: str, trace_id: Optional[str] = None) -> Optional[str]:
+        """
+        Queue a response for evaluation.
+        
+        Must be called from a coroutine running on the serving event loop.
+        
+        Args:
+            query: Original user query
+            response: Response to evaluate
+            trace_id: Langfuse trace ID the score should be attached to
+        
+        Returns:
+            Evaluation ID, or None if the response was not sampled or the queue is full
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return None
+        
+        self._ensure_started()
+        evaluation_id = uuid.uuid4().hex
+        try:
+            self._queue.put_nowait((evaluation_id, query, response, trace_id))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return None
+        
+        self.submitted += 1
+        self._set_result(evaluation_id, {"status": "pending"})
+        return evaluation_id
+    
+    def _set_result(self, evaluation_id: str, result: Dict[str, Any]):
+        """Record an evaluation result, forgetting the oldest beyond max_results."""
+        self._results[evaluation_id] = result
+        self._results.move_to_end(evaluation_id)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+    
+    def get_result(self, evaluation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an evaluation.
+        
+        Args:
+            evaluation_id: ID returned by `submit`
+        
+        Returns:
+            Dict with status ("pending", "completed" or "failed") and, once
+            completed, quality_score, quality_reasoning and quality_dimensions.
+            None if the ID is unknown or has been forgotten.
+        """
+        return self._results.get(evaluation_id)
+    
+    async def _worker(self):
+        """Evaluate queued responses one at a time."""
+        while True:
+            evaluation_id, query, response, trace_id = await self._queue.get()
+            try:
+                quality_score = await self.evaluator.aevaluate_response(
+                    query=query,
+                    response=response,
+                    trace_id=trace_id,
+                    store_score=False,
+                )
+                if quality_score.error:
+                    raise RuntimeError(quality_score.error)
+                self._set_result(evaluation_id, {
+                    "status": "completed",
+                    "quality_score": quality_score.score,
+                    "quality_reasoning": quality_score.reasoning,
+                    "quality_dimensions": quality_score.dimensions,
+                })
+                self.completed += 1
+                self._pending_scores.append((quality_score, trace_id))
+                if len(self._pending_scores) >= self.flush_batch_size:
+                    self._flush_event.set()
+            except Exception as e:
+                self.failed += 1
+                self._set_result(evaluation_id, {"status": "failed", "error": str(e)})
+            finally:
+                self._queue.task_done()
+    
+    async def _flusher(self):
+        """Upload pending scores every flush interval or when a batch is full."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+    
+    async def flush(self):
+        """Upload all pending scores to Langfuse in one batch."""
+        if not self._pending_scores:
+            return
+        batch, self._pending_scores = self._pending_scores, []
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, self.evaluator.store_scores, batch)
+            self.uploaded += len(batch)
+        except Exception as e:
+            print(f"Warning: Failed to upload {len(batch)} evaluation scores: {e}")
+    
+    async def aclose(self):
+        """Finish queued evaluations, upload their scores and stop the workers."""
+        if self._queue is not None and self._tasks:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue counters."""
+        return {
+            "sample_rate": self.sample_rate,
+            "submitted": self.submitted,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "uploaded": self.uploaded,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "pending_uploads": len(self._pending_scores),
+        }
@@ -1,16 +1,17 @@
 """Langfuse-based evaluator for automatic RAG response quality scoring."""
 
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langfuse import Langfuse
 from langfuse import observe
 
+from utils.llm import get_client_registry
+
 # Load environment variables
 load_dotenv()
 
@@ -21,6 +22,7 @@ class QualityScore:
     score: float  # 1-10 scale
     reasoning: str
     dimensions: Dict[str, float]  # Breakdown by dimension
+    error: Optional[str] = None  # Set if evaluation failed (score is a placeholder)
 
 
 class LangfuseEvaluator:
@@ -53,22 +55,16 @@ class LangfuseEvaluator:
         self._create_evaluation_prompt()
     
     def _initialize_judge_llm(self):
-        """Initialize the LLM that will act as judge."""
+        """Initialize the LLM that will act as judge (the shared client for the model)."""
         api_key = os.getenv("OPENAI_API_KEY")
         base_url = os.getenv("OPENAI_API_BASE")
         
-        if base_url:
-            self.judge_llm = ChatOpenAI(
-                model=self.llm_model,
-                openai_api_key=api_key,
-                openai_api_base=base_url,
-                temperature=0.0,  # Deterministic scoring
-            )
-        else:
-            self.judge_llm = ChatOpenAI(
-                model=self.llm_model,
-                temperature=0.0,  # Deterministic scoring
-            )
+        self.judge_llm = get_client_registry().chat_model(
+            self.llm_model,
+            temperature=0.0,  # Deterministic scoring
+            api_key=api_key,
+            base_url=base_url,
+        )
     
     def _create_evaluation_prompt(self):
         """Create the evaluation prompt for LLM-as-a-Judge."""
@@ -139,6 +135,13 @@ JSON:"""),
         
         self.parser = JsonOutputParser()
     
+        # Evaluation chain shared by the sync and async paths
+        self.evaluation_chain = (
+            self.evaluation_prompt
+            | self.judge_llm
+            | self.parser
+        )
+    
     @observe(name="langfuse_evaluator_score_response")
     def evaluate_response(
         self,
@@ -161,54 +164,96 @@ JSON:"""),
             QualityScore with score, reasoning, and dimension breakdown
         """
         try:
-            # Create evaluation chain
-            evaluation_chain = (
-                self.evaluation_prompt
-                | self.judge_llm
-                | self.parser
-            )
-            
             # Run evaluation
-            result = evaluation_chain.invoke({
+            result = self.evaluation_chain.invoke({
                 "query": query,
                 "response": response,
             })
             
-            # Parse result
-            score = float(result.get("score", 5.0))
-            reasoning = result.get("reasoning", "No reasoning provided")
-            dimensions = result.get("dimensions", {})
-            
-            # Ensure score is in valid range
-            score = max(1.0, min(10.0, score))
+            return self._record_result(result, query, response, trace_id)
             
-            quality_score = QualityScore(
-                score=score,
-                reasoning=reasoning,
-                dimensions=dimensions,
-            )
+        except Exception as e:
+            return self._error_score(e)
+    
+    @observe(name="langfuse_evaluator_score_response")
+    async def aevaluate_response(
+        self,
+        query: str,
+        response: str,
+        trace_id: Optional[str] = None,
+        store_score: bool = True,
+    ) -> QualityScore:
+        """
+        Async variant of `evaluate_response` using `ainvoke` on the judge chain.
+        
+        Args:
+            query: Original user query
+            response: Chatbot response to evaluate
+            trace_id: Optional Langfuse trace ID to attach score to
+            store_score: If False, the score is not sent to Langfuse (the caller
+                        uploads it later, e.g. in a batch via `store_scores`)
             
-            # Store score in Langfuse
-            # The @observe decorator creates a trace, and we can get the trace ID from it
-            self._store_score_in_langfuse(
-                score=score,
-                reasoning=reasoning,
-                dimensions=dimensions,
-                query=query,
-                response=response,
-                trace_id=trace_id,
-            )
+        Returns:
+            QualityScore with score, reasoning, and dimension breakdown
+        """
+        try:
+            result = await self.evaluation_chain.ainvoke({
+                "query": query,
+                "response": response,
+            })
             
-            return quality_score
+            return self._record_result(result, query, response, trace_id, store_score)
             
         except Exception as e:
-            # Fallback to default score on error
-            print(f"Warning: Evaluation failed: {e}")
-            return QualityScore(
-                score=5.0,
-                reasoning=f"Evaluation error: {str(e)}",
-                dimensions={},
-            )
+            return self._error_score(e)
+    
+    def _record_result(
+        self,
+        result: Dict[str, Any],
+        query: str,
+        response: str,
+        trace_id: Optional[str] = None,
+        store_score: bool = True,
+    ) -> QualityScore:
+        """Turn the judge's JSON into a QualityScore and (optionally) store it in Langfuse."""
+        score = float(result.get("score", 5.0))
+        reasoning = result.get("reasoning", "No reasoning provided")
+        dimensions = result.get("dimensions", {})
+        
+        # Ensure score is in valid range
+        score = max(1.0, min(10.0, score))
+        
+        quality_score = QualityScore(
+            score=score,
+            reasoning=reasoning,
+            dimensions=dimensions,
+        )
+        
+        if not store_score:
+            return quality_score
+        
+        # Store score in Langfuse
+        # The @observe decorator creates a trace, and we can get the trace ID from it
+        self._store_score_in_langfuse(
+            score=score,
+            reasoning=reasoning,
+            dimensions=dimensions,
+            query=query,
+            response=response,
+            trace_id=trace_id,
+        )
+        
+        return quality_score
+    
+    def _error_score(self, error: Exception) -> QualityScore:
+        """Fallback score returned when evaluation fails."""
+        print(f"Warning: Evaluation failed: {error}")
+        return QualityScore(
+            score=5.0,
+            reasoning=f"Evaluation error: {str(error)}",
+            dimensions={},
+            error=str(error),
+        )
     
     def _store_score_in_langfuse(
         self,
@@ -255,6 +300,28 @@ JSON:"""),
         except Exception as e:
             print(f"Warning: Failed to store score in Langfuse: {e}")
     
+    def store_scores(self, scores: List[Tuple[QualityScore, Optional[str]]]):
+        """
+        Upload several scores to Langfuse at once.
+        
+        Args:
+            scores: List of (QualityScore, trace_id) tuples. Scores without a
+                   trace ID cannot be attached to a trace and are skipped.
+        """
+        for quality_score, trace_id in scores:
+            if not trace_id:
+                continue
+            try:
+                self.langfuse.create_score(
+                    name="rag_quality_score",
+                    value=quality_score.score,
+                    trace_id=trace_id,
+                    comment=quality_score.reasoning,
+                )
+            except Exception as e:
+                print(f"Warning: Failed to store score in Langfuse: {e}")
+        self.langfuse.flush()
+    
     def evaluate_batch(
         self,
         queries_and_responses: list[tuple[str, str]],
@@ -0,0 +1,201 @@
+"""Measure routing accuracy and latency of the embedding router against the LLM router."""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import ROUTING_CACHE_MAX_DISTANCE
+from querying.agents import Orchestrator
+from querying.agents.embedding_router import EmbeddingRouter
+from evaluation.test_runner import load_golden_dataset
+
+DEFAULT_DATASETS = ["routing.jsonl", "multi_agent.jsonl"]
+
+
+def _expected_agents(test_case: dict) -> List[str]:
+    """Expected agent names for a golden test case."""
+    if test_case.get("expected_agents"):
+        return list(test_case["expected_agents"])
+    return [test_case["expected_agent"]]
+
+
+def _is_correct(agents: List[str], expected: List[str]) -> bool:
+    """A routing decision is correct if it selects exactly the expected agents."""
+    return set(agents) == set(expected)
+
+
+def _latency_summary(latencies_ms: List[float]) -> str:
+    """Format mean/p50/p95 latency."""
+    if not latencies_ms:
+        return "n/a"
+    ordered = sorted(latencies_ms)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return (
+        f"mean {statistics.mean(ordered):.1f} ms, "
+        f"p50 {statistics.median(ordered):.1f} ms, "
+        f"p95 {p95:.1f} ms"
+    )
+
+
+def _closest_conflicting_queries(
+    embeddings: List[List[float]],
+    expected: List[List[str]],
+) -> Optional[Tuple[float, int, int]]:
+    """
+    Find the two most similar queries that expect different agents.
+    
+    A routing cache that reuses decisions within a larger cosine distance
+    would route one of them like the other.
+    
+    Returns:
+        (cosine distance, index, index), or None if all queries expect the same agents.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    distances = 1.0 - matrix @ matrix.T
+    routes = [frozenset(agents) for agents in expected]
+    conflicting = np.array([[a != b for b in routes] for a in routes])
+    if not conflicting.any():
+        return None
+    distances[~conflicting] = np.inf
+    i, j = np.unravel_index(int(np.argmin(distances)), distances.shape)
+    return float(distances[i, j]), int(i), int(j)
+
+
+def run_benchmark(
+    datasets: Optional[List[str]] = None,
+    skip_llm: bool = False,
+    margin: Optional[float] = None,
+    min_similarity: Optional[float] = None,
+) -> Dict:
+    """
+    Route every golden query with the embedding router and the LLM router.
+    
+    Args:
+        datasets: Golden dataset files to use. Defaults to routing and multi_agent.
+        skip_llm: Only evaluate the embedding router (no LLM calls).
+        margin: Override EMBEDDING_ROUTER_MARGIN for this run.
+        min_similarity: Override EMBEDDING_ROUTER_MIN_SIMILARITY for this run.
+    
+    Returns:
+        Summary dict with coverage, accuracy and latency figures.
+    """
+    print("=" * 60)
+    print("Routing Benchmark")
+    print("=" * 60)
+    
+    orchestrator = Orchestrator()
+    router_kwargs = {}
+    if margin is not None:
+        router_kwargs["margin"] = margin
+    if min_similarity is not None:
+        router_kwargs["min_similarity"] = min_similarity
+    router = EmbeddingRouter(
+        orchestrator.vector_store_manager,
+        {name: config.handbook_name for name, config in orchestrator.agent_registry.AGENTS.items()},
+        **router_kwargs,
+    )
+    
+    test_cases = []
+    for dataset_file in datasets or DEFAULT_DATASETS:
+        test_cases.extend(load_golden_dataset(dataset_file))
+    
+    embed_ms, router_ms, llm_ms, hybrid_ms = [], [], [], []
+    query_embeddings, expected_routes = [], []
+    decided = router_correct = llm_correct = hybrid_correct = 0
+    
+    for i, test_case in enumerate(test_cases, 1):
+        query = test_case["query"]
+        expected = _expected_agents(test_case)
+        
+        start = time.perf_counter()
+        query_embedding = orchestrator.vector_store_manager.embed_query(query)
+        embed_ms.append((time.perf_counter() - start) * 1000)
+        query_embeddings.append(query_embedding)
+        expected_routes.append(expected)
+        
+        start = time.perf_counter()
+        router_result = router.route(query_embedding)
+        router_ms.append((time.perf_counter() - start) * 1000)
+        
+        llm_result = None
+        if not skip_llm:
+            start = time.perf_counter()
+            llm_result = orchestrator._detect_multi_agent(query)
+            llm_ms.append((time.perf_counter() - start) * 1000)
+            if _is_correct(llm_result["agents"], expected):
+                llm_correct += 1
+        
+        if router_result is not None:
+            decided += 1
+            if _is_correct(router_result["agents"], expected):
+                router_correct += 1
+        
+        hybrid_result = router_result or llm_result
+        if hybrid_result is not None:
+            hybrid_ms.append(embed_ms[-1] + router_ms[-1] + (0.0 if router_result else llm_ms[-1]))
+            if _is_correct(hybrid_result["agents"], expected):
+                hybrid_correct += 1
+        
+        decision = router_result["agents"] if router_result else "-> LLM"
+        print(f"[{i}/{len(test_cases)}] {test_case.get('id')}: expected {expected}, router {decision}")
+    
+    total = len(test_cases)
+    closest = _closest_conflicting_queries(query_embeddings, expected_routes) if total > 1 else None
+    summary = {
+        "queries": total,
+        "router_coverage": decided / total if total else 0.0,
+        "router_accuracy": router_correct / decided if decided else None,
+        "llm_accuracy": None if skip_llm else llm_correct / total if total else 0.0,
+        "hybrid_accuracy": None if skip_llm else hybrid_correct / total if total else 0.0,
+        "closest_conflicting_distance": closest[0] if closest else None,
+    }
+    
+    print(f"\n{'=' * 60}")
+    print(f"Queries: {total}")
+    print(f"Router decided without LLM: {decided}/{total} ({summary['router_coverage']:.0%})")
+    if decided:
+        print(f"Router accuracy on decided queries: {router_correct}/{decided}")
+    print(f"Query embedding latency: {_latency_summary(embed_ms)}")
+    print(f"Embedding router latency: {_latency_summary(router_ms)}")
+    if not skip_llm:
+        print(f"LLM router accuracy: {llm_correct}/{total}")
+        print(f"Hybrid accuracy: {hybrid_correct}/{total}")
+        print(f"LLM routing latency: {_latency_summary(llm_ms)}")
+        print(f"Hybrid routing latency (incl. embedding): {_latency_summary(hybrid_ms)}")
+    if closest:
+        distance, i, j = closest
+        print(
+            f"Closest queries with different routes: {distance:.4f} cosine distance "
+            f"({test_cases[i].get('id')} vs {test_cases[j].get('id')}); "
+            f"ROUTING_CACHE_MAX_DISTANCE ({ROUTING_CACHE_MAX_DISTANCE}) must stay below it"
+        )
+    print(f"{'=' * 60}")
+    
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark embedding vs LLM routing")
+    parser.add_argument("--dataset", type=str, action="append", help="Dataset file (repeatable). Defaults to routing.jsonl and multi_agent.jsonl")
+    parser.add_argument("--skip-llm", action="store_true", help="Only evaluate the embedding router")
+    parser.add_argument("--margin", type=float, help="Override EMBEDDING_ROUTER_MARGIN")
+    parser.add_argument("--min-similarity", type=float, help="Override EMBEDDING_ROUTER_MIN_SIMILARITY")
+    
+    args = parser.parse_args()
+    
+    run_benchmark(
+        datasets=args.dataset,
+        skip_llm=args.skip_llm,
+        margin=args.margin,
+        min_similarity=args.min_similarity,
+    )
@@ -2,11 +2,28 @@
 
 from .parsing import load_handbooks, load_single_handbook
 from .chunking import chunk_markdown_intelligently, chunk_with_recursive_splitter
+from .streaming_chunker import StreamingMarkdownChunker, iter_markdown_chunks, iter_markdown_file_chunks
 from .embeddings import (
     generate_embeddings,
+    update_embeddings,
     load_vector_store,
     generate_embedding_for_text,
+    get_query_embeddings_model,
+    get_query_embedding_cache,
+    get_query_embedding_batcher,
+    get_document_embedding_store,
 )
+from .numpy_store import NumpyVectorStore
+from .manifest import assign_chunk_ids, load_manifest, diff_manifest
+from .pipeline import chunk_handbooks_parallel, precompute_embeddings, RateLimiter
+from .embedding_cache import (
+    QueryEmbeddingCache,
+    CachedQueryEmbeddings,
+    CachedDocumentEmbeddings,
+    PersistentEmbeddingStore,
+    cache_key,
+)
+from .embedding_batcher import BatchingEmbeddings
 
 __all__ = [
     # Parsing
@@ -15,8 +32,33 @@ __all__ = [
     # Chunking
     "chunk_markdown_intelligently",
     "chunk_with_recursive_splitter",
+    "StreamingMarkdownChunker",
+    "iter_markdown_chunks",
+    "iter_markdown_file_chunks",
     # Embeddings
     "generate_embeddings",
+    "update_embeddings",
     "load_vector_store",
     "generate_embedding_for_text",
+    "get_query_embeddings_model",
+    "get_query_embedding_cache",
+    "get_query_embedding_batcher",
+    "get_document_embedding_store",
+    # Vector stores
+    "NumpyVectorStore",
+    # Incremental indexing
+    "assign_chunk_ids",
+    "load_manifest",
+    "diff_manifest",
+    # Build pipeline
+    "chunk_handbooks_parallel",
+    "precompute_embeddings",
+    "RateLimiter",
+    # Caching
+    "QueryEmbeddingCache",
+    "CachedQueryEmbeddings",
+    "CachedDocumentEmbeddings",
+    "PersistentEmbeddingStore",
+    "cache_key",
+    "BatchingEmbeddings",
 ]
@@ -8,9 +8,11 @@ from langchain_core.documents import Document
 from config import (
     CHUNK_SIZE,
     CHUNK_OVERLAP,
+    CHUNKING_STRATEGY,
     HEADERS_TO_SPLIT_ON,
     TEXT_SPLITTER_SEPARATORS,
 )
+from indexing.streaming_chunker import iter_markdown_chunks
 
 
 def chunk_markdown_intelligently(
@@ -18,16 +20,23 @@ def chunk_markdown_intelligently(
     handbook_name: str,
     chunk_size: int = None,
     chunk_overlap: int = None,
+    strategy: str = None,
 ) -> List[Document]:
     """
     Intelligently chunk markdown content using header-based splitting.
-    Falls back to recursive character splitting if header splitting fails.
+    
+    With the "streaming" strategy this is a single pass of
+    `StreamingMarkdownChunker`, which also records each chunk's byte offsets
+    and header path. The "langchain" strategy runs `MarkdownHeaderTextSplitter`
+    followed by `RecursiveCharacterTextSplitter` for oversized sections, and
+    falls back to recursive character splitting if header splitting fails.
     
     Args:
         content: The markdown content to chunk.
         handbook_name: Name of the handbook (for metadata).
         chunk_size: Optional custom chunk size. Defaults to config value.
         chunk_overlap: Optional custom chunk overlap. Defaults to config value.
+        strategy: "streaming" or "langchain". Defaults to config CHUNKING_STRATEGY.
     
     Returns:
         List of Document chunks with metadata.
@@ -36,6 +45,13 @@ def chunk_markdown_intelligently(
         chunk_size = CHUNK_SIZE
     if chunk_overlap is None:
         chunk_overlap = CHUNK_OVERLAP
+    if strategy is None:
+        strategy = CHUNKING_STRATEGY
+    
+    if strategy == "streaming":
+        chunks = list(iter_markdown_chunks(content, handbook_name, chunk_size, chunk_overlap))
+        print(f"Generated {len(chunks)} chunks for {handbook_name}")
+        return chunks
     
     chunks = []
     
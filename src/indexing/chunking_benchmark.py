@@ -0,0 +1,129 @@
+"""Benchmark the streaming markdown chunker against the LangChain splitter pipeline."""
+
+import contextlib
+import io
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import CHUNK_SIZE
+from indexing.chunking import chunk_markdown_intelligently
+from indexing.parsing import load_handbooks
+from indexing.streaming_chunker import iter_markdown_chunks
+
+STRATEGIES = ["langchain", "streaming"]
+
+
+def _peak_kb(run: Callable[[], None]) -> float:
+    """Peak memory allocated while running `run`, in KB."""
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def _measure(chunk: Callable[[], List], repeats: int) -> Dict:
+    """Best wall time over `repeats` runs, plus peak traced memory of one run."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = chunk()
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    sizes = [len(doc.page_content) for doc in chunks]
+    return {
+        "best_ms": min(timings),
+        "chunks": len(chunks),
+        "mean_chars": statistics.mean(sizes) if sizes else 0,
+        "max_chars": max(sizes) if sizes else 0,
+        "oversized": sum(1 for size in sizes if size > CHUNK_SIZE),
+        "peak_kb": _peak_kb(chunk),
+        "documents": chunks,
+    }
+
+
+def _offset_errors(content: str, chunks: List) -> int:
+    """Number of chunks whose byte offsets do not point at their text."""
+    source = content.encode("utf-8")
+    return sum(
+        1 for doc in chunks
+        if source[doc.metadata["start_byte"]:doc.metadata["end_byte"]].decode("utf-8") != doc.page_content
+    )
+
+
+def _run(label: str, handbooks: Dict[str, str], repeats: int):
+    """Chunk every handbook with each strategy and print a comparison."""
+    total_kb = sum(len(content.encode("utf-8")) for content in handbooks.values()) / 1024
+    print(f"\n{label}: {len(handbooks)} handbooks, {total_kb:.0f} KB")
+    print(f"{'strategy':<10} {'time (ms)':>10} {'chunks':>7} {'mean':>6} {'max':>6} {'>size':>6} {'peak KB':>9}")
+    
+    results = {}
+    for strategy in STRATEGIES:
+        # chunk_markdown_intelligently prints a line per call
+        with contextlib.redirect_stdout(io.StringIO()):
+            per_handbook = {
+                name: _measure(lambda: chunk_markdown_intelligently(content, name, strategy=strategy), repeats)
+                for name, content in handbooks.items()
+            }
+        results[strategy] = per_handbook
+        documents = [doc for result in per_handbook.values() for doc in result["documents"]]
+        sizes = [len(doc.page_content) for doc in documents]
+        print(
+            f"{strategy:<10} "
+            f"{sum(r['best_ms'] for r in per_handbook.values()):>10.1f} "
+            f"{len(documents):>7} "
+            f"{statistics.mean(sizes):>6.0f} "
+            f"{max(sizes):>6} "
+            f"{sum(r['oversized'] for r in per_handbook.values()):>6} "
+            f"{max(r['peak_kb'] for r in per_handbook.values()):>9.0f}"
+        )
+    
+    speedup = (
+        sum(r["best_ms"] for r in results["langchain"].values())
+        / max(sum(r["best_ms"] for r in results["streaming"].values()), 1e-9)
+    )
+    errors = sum(
+        _offset_errors(handbooks[name], result["documents"])
+        for name, result in results["streaming"].items()
+    )
+    # Consumed lazily, the streaming chunker only holds the current chunk
+    lazy_peak_kb = max(
+        _peak_kb(lambda: sum(1 for _ in iter_markdown_chunks(content, name)))
+        for name, content in handbooks.items()
+    )
+    print(f"Streaming speedup: {speedup:.1f}x, byte offset mismatches: {errors}")
+    print(f"Streaming peak memory when consumed lazily: {lazy_peak_kb:.0f} KB")
+
+
+def run_benchmark(repeats: int = 5, scale: int = 100):
+    """
+    Compare chunkers on data/handbooks and on a synthetic large handbook.
+    
+    Args:
+        repeats: Timed runs per handbook (the best is reported)
+        scale: The large handbook is every handbook concatenated this many times
+    """
+    handbooks = load_handbooks()
+    _run("data/handbooks", handbooks, repeats)
+    if scale > 1:
+        large = "\n\n".join(handbooks.values()) * scale
+        _run(f"Synthetic handbook (x{scale})", {"large_handbook": large}, 1)
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark streaming vs LangChain markdown chunking")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per handbook")
+    parser.add_argument("--scale", type=int, default=100, help="Size multiplier of the synthetic large handbook (1 to skip)")
+    
+    args = parser.parse_args()
+    
+    run_benchmark(repeats=args.repeats, scale=args.scale)
@@ -0,0 +1,139 @@
+"""Micro-batching dispatcher that merges concurrent query embeddings into one request."""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+class BatchingEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that batches concurrent `embed_query` calls.
+    
+    Queries arriving within `max_wait_ms` of the first queued query are sent
+    together as one `embed_documents` request, and each caller receives its
+    own vector. A single query therefore waits at most `max_wait_ms` longer
+    than it would unbatched, while bursts of concurrent requests cost one API
+    call per batch instead of one per query.
+    
+    `embed_documents` is passed through unchanged (it is already batched).
+    """
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 64,
+        max_concurrent_batches: int = 4,
+    ):
+        """
+        Initialize the dispatcher.
+        
+        Args:
+            embeddings: Underlying embeddings model.
+            max_wait_ms: Maximum time a query waits for others to join its batch.
+            max_batch_size: Maximum number of texts per embedding request.
+            max_concurrent_batches: Maximum embedding requests in flight at once.
+        """
+        self.embeddings = embeddings
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches,
+            thread_name_prefix="embedding-batch",
+        )
+        self._dispatcher = None
+        self._dispatcher_lock = threading.Lock()
+        
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+    
+    def _ensure_dispatcher(self):
+        """Start the dispatcher thread on first use."""
+        if self._dispatcher is not None:
+            return
+        with self._dispatcher_lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop,
+                    name="embedding-dispatcher",
+                    daemon=True,
+                )
+                self._dispatcher.start()
+    
+    def _dispatch_loop(self):
+        """Collect queued queries into batches and hand them to the executor."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._executor.submit(self._run_batch, batch)
+    
+    def _run_batch(self, batch: List[Tuple[str, Future]]):
+        """Embed one batch and resolve every caller's future."""
+        # Identical texts in the same batch are embedded once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        
+        with self._stats_lock:
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+        
+        try:
+            vectors = dict(zip(texts, self.embeddings.embed_documents(texts)))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for text, future in batch:
+            future.set_result(vectors[text])
+    
+    def _submit(self, text: str) -> Future:
+        """Queue a query for the next batch."""
+        self._ensure_dispatcher()
+        future: Future = Future()
+        with self._stats_lock:
+            self.requests += 1
+        self._queue.put((text, future))
+        return future
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self._submit(text).result()
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self._submit(text))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Request and batch counters."""
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "max_batch_size": self.max_batch_size,
+            }
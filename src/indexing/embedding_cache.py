@@ -0,0 +1,459 @@
+"""Embedding caches: queries (in-memory LRU plus SQLite) and indexed chunks (SQLite)."""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text for cache lookups.
+    
+    Collapses whitespace and lowercases, so "How do I  pay?" and "how do i pay?"
+    share one entry.
+    """
+    return " ".join(text.split()).lower()
+
+
+def cache_key(model: str, text: str) -> str:
+    """
+    Content-addressed key for a (model, text) pair.
+    
+    Every vector in a PersistentEmbeddingStore is stored under this key.
+    """
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class PersistentEmbeddingStore:
+    """
+    SQLite-backed mapping from cache key to embedding vector.
+    
+    Vectors are stored as float32 blobs, together with the embedding model
+    that produced them and when they were last used, so the store can be
+    capped (least recently used first) and compacted. The store is safe to
+    share between threads; each operation runs under a lock on a single
+    connection.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Open (or create) the store.
+        
+        Args:
+            path: SQLite database file.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        # Stores created before model/last_used tracking are upgraded in place
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "model" not in columns:
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN model TEXT")
+        if "last_used" not in columns:
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the vector stored under key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up several keys at once, marking the hits as recently used.
+        
+        Returns:
+            Dict mapping each stored key to its vector (missing keys are omitted).
+        """
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ):
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+    
+    def put(self, key: str, vector: List[float], model: Optional[str] = None):
+        """Store a vector under key (overwrites any existing entry)."""
+        self.put_many({key: vector}, model=model)
+    
+    def put_many(self, vectors: Dict[str, List[float]], model: Optional[str] = None):
+        """Store several vectors in one transaction (overwrites existing entries)."""
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), model, now)
+            for key, vector in vectors.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, model, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+    
+    def enforce_size(self, max_entries: int) -> int:
+        """
+        Delete the least recently used entries beyond max_entries.
+        
+        Returns:
+            Number of entries deleted.
+        """
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            excess = count - max_entries
+            if excess <= 0:
+                return 0
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self._conn.commit()
+            return excess
+    
+    def compact(self, max_entries: Optional[int] = None, keep_model: Optional[str] = None) -> int:
+        """
+        Shrink the store and reclaim disk space.
+        
+        Args:
+            max_entries: Also cap the store to this many entries (LRU first).
+            keep_model: Drop vectors produced by any other embedding model.
+        
+        Returns:
+            Number of entries deleted.
+        """
+        deleted = 0
+        if keep_model is not None:
+            with self._lock:
+                deleted += self._conn.execute(
+                    "DELETE FROM embeddings WHERE model IS NOT NULL AND model != ?", (keep_model,)
+                ).rowcount
+                self._conn.commit()
+        if max_entries is not None:
+            deleted += self.enforce_size(max_entries)
+        with self._lock:
+            self._conn.execute("VACUUM")
+        return deleted
+    
+    def export(self, destination: Path):
+        """
+        Copy the store to a standalone SQLite file (e.g., to seed another deployment).
+        
+        Args:
+            destination: File to write; overwritten if it exists.
+        """
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.unlink(missing_ok=True)
+        target = sqlite3.connect(str(destination))
+        try:
+            with self._lock:
+                self._conn.backup(target)
+        finally:
+            target.close()
+    
+    def import_from(self, source: Path) -> int:
+        """
+        Merge entries from an exported store, keeping entries already present.
+        
+        Args:
+            source: SQLite file written by `export` (or another store's database).
+        
+        Returns:
+            Number of entries added.
+        """
+        with self._lock:
+            before = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._conn.execute("ATTACH DATABASE ? AS source", (str(source),))
+            try:
+                source_columns = {
+                    row[1] for row in self._conn.execute("PRAGMA source.table_info(embeddings)")
+                }
+                model = "model" if "model" in source_columns else "NULL"
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO embeddings (key, vector, model, last_used) "
+                    f"SELECT key, vector, {model}, ? FROM source.embeddings",
+                    (time.time(),),
+                )
+                self._conn.commit()
+            finally:
+                self._conn.execute("DETACH DATABASE source")
+            after = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return after - before
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts per model and the database file size."""
+        with self._lock:
+            by_model = dict(self._conn.execute(
+                "SELECT COALESCE(model, 'unknown'), COUNT(*) FROM embeddings GROUP BY model"
+            ).fetchall())
+        return {
+            "path": str(self.path),
+            "entries": sum(by_model.values()),
+            "by_model": by_model,
+            "file_bytes": self.path.stat().st_size if self.path.exists() else 0,
+        }
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache mapping normalized query text to its embedding.
+    
+    The first tier is a bounded in-memory LRU; the optional second tier is a
+    PersistentEmbeddingStore that survives restarts. Hits in the persistent
+    tier are promoted into the LRU.
+    """
+    
+    def __init__(self, max_size: int = 2048, persistent_path: Optional[Path] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of vectors held in memory.
+            persistent_path: Optional SQLite file for the on-disk tier.
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._persistent: Optional[PersistentEmbeddingStore] = None
+        if persistent_path is not None:
+            try:
+                self._persistent = PersistentEmbeddingStore(persistent_path)
+            except Exception as e:
+                print(f"Warning: Could not open persistent embedding cache at {persistent_path}: {e}")
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Look up the embedding for (model, normalized text)."""
+        key = cache_key(model, normalize_query(text))
+        vector = self._get_memory(key)
+        if vector is None and self._persistent is not None:
+            vector = self._get_disk(key)
+        if vector is None:
+            self._count_miss()
+        return vector
+    
+    async def aget(self, model: str, text: str) -> Optional[List[float]]:
+        """Async variant of `get`: the SQLite tier is read in a worker thread."""
+        key = cache_key(model, normalize_query(text))
+        vector = self._get_memory(key)
+        if vector is None and self._persistent is not None:
+            vector = await asyncio.to_thread(self._get_disk, key)
+        if vector is None:
+            self._count_miss()
+        return vector
+    
+    def put(self, model: str, text: str, vector: List[float]):
+        """Store the embedding for (model, normalized text) in both tiers."""
+        key = cache_key(model, normalize_query(text))
+        self._remember(key, vector)
+        if self._persistent is not None:
+            self._put_disk(key, vector, model)
+    
+    async def aput(self, model: str, text: str, vector: List[float]):
+        """Async variant of `put`: the SQLite tier is written in a worker thread."""
+        key = cache_key(model, normalize_query(text))
+        self._remember(key, vector)
+        if self._persistent is not None:
+            await asyncio.to_thread(self._put_disk, key, vector, model)
+    
+    def _get_memory(self, key: str) -> Optional[List[float]]:
+        """Look up the LRU tier."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return vector
+    
+    def _get_disk(self, key: str) -> Optional[List[float]]:
+        """Look up the persistent tier, promoting a hit into the LRU."""
+        vector = self._persistent.get(key)
+        if vector is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, vector)
+        return vector
+    
+    def _put_disk(self, key: str, vector: List[float], model: str):
+        """Write to the persistent tier (failures only warn)."""
+        try:
+            self._persistent.put(key, vector, model=model)
+        except Exception as e:
+            print(f"Warning: Could not write to persistent embedding cache: {e}")
+    
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+    
+    def _remember(self, key: str, vector: List[float]):
+        """Insert into the LRU tier, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop the in-memory tier (the persistent tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizes."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "persistent": self._persistent is not None,
+            }
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves `embed_query` from a QueryEmbeddingCache.
+    
+    `embed_documents` is passed through unchanged; only request-time query
+    embeddings are cached.
+    """
+    
+    def __init__(self, embeddings: Embeddings, cache: QueryEmbeddingCache, model: str):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            embeddings: Underlying embeddings model.
+            cache: Cache shared by every wrapper of the same model.
+            model: Embedding model name (part of the cache key).
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(self.model, text, vector)
+        return vector
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = await self.cache.aget(self.model, text)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await self.cache.aput(self.model, text, vector)
+        return vector
+
+
+class CachedDocumentEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves `embed_documents` from a PersistentEmbeddingStore.
+    
+    Vectors are keyed by (model, exact chunk text), so rebuilding an index,
+    switching vector store backends or resuming an interrupted build reuses
+    every vector already computed; only unseen texts are sent to the model,
+    in one request. The store is capped at `max_entries` (least recently used
+    entries are dropped first).
+    
+    `embed_query` is passed through unchanged.
+    """
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        store: PersistentEmbeddingStore,
+        model: str,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            embeddings: Underlying embeddings model.
+            store: Persistent store of chunk vectors.
+            model: Embedding model name (part of the cache key).
+            max_entries: Optional cap on the number of stored vectors.
+        """
+        self.embeddings = embeddings
+        self.store = store
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [cache_key(self.model, text) for text in texts]
+        vectors = self.store.get_many(keys)
+        
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        self.hits += len(texts) - sum(1 for key in keys if key in missing)
+        self.misses += len(missing)
+        if missing:
+            computed = dict(zip(missing, self.embeddings.embed_documents(list(missing.values()))))
+            self.store.put_many(computed, model=self.model)
+            if self.max_entries is not None:
+                self.store.enforce_size(self.max_entries)
+            vectors.update(computed)
+        
+        return [vectors[key] for key in keys]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this wrapper plus the store's sizes."""
+        return {"hits": self.hits, "misses": self.misses, **self.store.stats()}
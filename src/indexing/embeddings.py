@@ -1,13 +1,28 @@
-"""Initialize embeddings and vector stores (Chroma/Faiss) for document chunks."""
+"""Initialize embeddings and vector stores (Chroma/Faiss/NumPy) for document chunks."""
 
 import os
+import sys
 from pathlib import Path
-from typing import List, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from langchain_community.vectorstores import FAISS
+
+from indexing.numpy_store import NumpyVectorStore
+from indexing.embedding_cache import (
+    QueryEmbeddingCache,
+    CachedQueryEmbeddings,
+    CachedDocumentEmbeddings,
+    PersistentEmbeddingStore,
+)
+from indexing.embedding_batcher import BatchingEmbeddings
+from indexing.manifest import assign_chunk_ids, load_manifest, save_manifest, diff_manifest, moved_chunks
+from utils.llm import get_client_registry
+from utils.storage import resolve_index_dir
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_community.vectorstores import FAISS
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,8 +31,41 @@ from config import (
     OPENAI_MODEL,
     VECTOR_STORE_TYPE,
     VECTOR_STORE_PATH,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_PATH,
+    DOCUMENT_EMBEDDING_CACHE_PATH,
+    DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_BATCHING,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+    EMBEDDING_BATCH_MAX_SIZE,
 )
 
+# Modules defining the Chroma and FAISS stores. They are imported only when
+# that backend is used: chromadb and faiss each take about a second to import.
+_VECTOR_STORE_MODULES = {
+    "chroma": ("langchain_chroma.vectorstores", "Chroma"),
+    "faiss": ("langchain_community.vectorstores.faiss", "FAISS"),
+}
+
+
+def is_vector_store(store, vector_store_type: str) -> bool:
+    """
+    Check whether a store is a Chroma ("chroma") or FAISS ("faiss") store.
+    
+    Unlike `isinstance`, this does not import the backend: if its module was
+    never imported, no store of that type can exist.
+    """
+    module_name, class_name = _VECTOR_STORE_MODULES[vector_store_type]
+    store_class = getattr(sys.modules.get(module_name), class_name, None)
+    return store_class is not None and isinstance(store, store_class)
+
+
+# Shared embeddings model and cache for request-time query embedding (created lazily)
+_query_embeddings_model = None
+_query_embedding_cache = None
+_query_embedding_batcher = None
+_document_embedding_store = None
+
 
 def _initialize_embeddings_model():
     """
@@ -25,7 +73,7 @@ def _initialize_embeddings_model():
     Supports both OpenAI and OpenRouter (via OPENAI_API_BASE).
     
     Returns:
-        Initialized OpenAIEmbeddings model.
+        Shared OpenAIEmbeddings model.
     
     Raises:
         ValueError: If OPENAI_API_KEY is not set.
@@ -40,29 +88,142 @@ def _initialize_embeddings_model():
     # Check for OpenRouter base URL
     base_url = os.getenv("OPENAI_API_BASE")
     
-    # Initialize embeddings model
+    # Shared embeddings client (pooled HTTP connections with the LLM clients)
     if base_url:
         # Using OpenRouter or custom OpenAI-compatible endpoint
         print(f"Using OpenAI-compatible API at {base_url}")
-        embeddings_model = OpenAIEmbeddings(
-            model=OPENAI_MODEL,
-            openai_api_key=api_key,
-            openai_api_base=base_url,
-        )
     else:
         # Using standard OpenAI API
         print("Using OpenAI API")
-        embeddings_model = OpenAIEmbeddings(model=OPENAI_MODEL)
+    embeddings_model = get_client_registry().embeddings(OPENAI_MODEL, api_key=api_key, base_url=base_url)
     
     return embeddings_model
 
 
+def get_document_embedding_store() -> Optional[PersistentEmbeddingStore]:
+    """
+    Get the on-disk cache of chunk embeddings used while indexing.
+    
+    Returns:
+        Shared PersistentEmbeddingStore, or None if DOCUMENT_EMBEDDING_CACHE_PATH
+        is None or the database cannot be opened.
+    """
+    global _document_embedding_store
+    if _document_embedding_store is None and DOCUMENT_EMBEDDING_CACHE_PATH is not None:
+        try:
+            _document_embedding_store = PersistentEmbeddingStore(DOCUMENT_EMBEDDING_CACHE_PATH)
+        except Exception as e:
+            print(f"Warning: Could not open document embedding cache at {DOCUMENT_EMBEDDING_CACHE_PATH}: {e}")
+    return _document_embedding_store
+
+
+def _initialize_document_embeddings_model() -> Union[OpenAIEmbeddings, CachedDocumentEmbeddings]:
+    """
+    Initialize the embeddings model used to embed chunks while indexing.
+    
+    Chunk vectors already in the document embedding cache are reused instead
+    of calling the API again.
+    
+    Returns:
+        Embeddings model (cached unless the cache is disabled).
+    
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set.
+    """
+    embeddings_model = _initialize_embeddings_model()
+    store = get_document_embedding_store()
+    if store is None:
+        return embeddings_model
+    return CachedDocumentEmbeddings(
+        embeddings_model,
+        store=store,
+        model=OPENAI_MODEL,
+        max_entries=DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES,
+    )
+
+
+def _report_cache_usage(embeddings_model):
+    """Print how many chunk vectors were reused from the document embedding cache."""
+    if isinstance(embeddings_model, CachedDocumentEmbeddings):
+        print(
+            f"Document embedding cache: {embeddings_model.hits} vectors reused, "
+            f"{embeddings_model.misses} embedded"
+        )
+
+
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """
+    Get the process-wide query embedding cache.
+    
+    Returns:
+        Shared QueryEmbeddingCache (in-memory LRU plus optional SQLite tier),
+        or None if QUERY_EMBEDDING_CACHE_SIZE is 0 (nothing is opened on disk).
+    """
+    global _query_embedding_cache
+    if QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+    if _query_embedding_cache is None:
+        _query_embedding_cache = QueryEmbeddingCache(
+            max_size=QUERY_EMBEDDING_CACHE_SIZE,
+            persistent_path=QUERY_EMBEDDING_CACHE_PATH,
+        )
+    return _query_embedding_cache
+
+
+def get_query_embedding_batcher() -> Optional[BatchingEmbeddings]:
+    """
+    Get the process-wide query embedding batcher, if batching is enabled.
+    
+    Returns:
+        Shared BatchingEmbeddings, or None if not created (yet or at all).
+    """
+    return _query_embedding_batcher
+
+
+def get_query_embeddings_model() -> Union[OpenAIEmbeddings, CachedQueryEmbeddings, BatchingEmbeddings]:
+    """
+    Get the shared embeddings model used to embed queries at request time.
+    
+    The model is created on first use and reused afterwards, so a query can be
+    embedded once and the vector shared by every agent that searches for it.
+    Repeated queries are served from the query embedding cache unless
+    QUERY_EMBEDDING_CACHE_SIZE is 0. Cache misses from concurrent requests are
+    merged into one `embed_documents` call by the micro-batching dispatcher
+    when EMBEDDING_BATCHING is enabled.
+    
+    Returns:
+        Shared embeddings model.
+    
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set.
+    """
+    global _query_embeddings_model, _query_embedding_batcher
+    if _query_embeddings_model is None:
+        embeddings_model = _initialize_embeddings_model()
+        if EMBEDDING_BATCHING:
+            _query_embedding_batcher = BatchingEmbeddings(
+                embeddings_model,
+                max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS,
+                max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+            )
+            embeddings_model = _query_embedding_batcher
+        query_cache = get_query_embedding_cache()
+        if query_cache is not None:
+            embeddings_model = CachedQueryEmbeddings(
+                embeddings_model,
+                cache=query_cache,
+                model=OPENAI_MODEL,
+            )
+        _query_embeddings_model = embeddings_model
+    return _query_embeddings_model
+
+
 def generate_embeddings(
     chunks,
     handbook_name: str,
     vector_store_type: str = None,
     base_persist_directory: Path = None,
-) -> Union[Chroma, FAISS]:
+) -> Union["Chroma", "FAISS", NumpyVectorStore]:
     """
     Generate embeddings and create vector store for document chunks.
     Encapsulates all embedding and vector store creation logic.
@@ -70,8 +231,9 @@ def generate_embeddings(
     Args:
         chunks: List of Document chunks to embed and store.
         handbook_name: Name of the handbook (used for directory/collection naming).
-        vector_store_type: Type of vector store ("chroma" or "faiss"). Defaults to config.
-        base_persist_directory: Base directory for vector stores. Defaults to config.
+        vector_store_type: Type of vector store ("chroma", "faiss" or "numpy"). Defaults to config.
+        base_persist_directory: Base directory for vector stores. Defaults to the
+                                current index version under config VECTOR_STORE_PATH.
     
     Returns:
         Initialized vector store with chunks and embeddings.
@@ -79,15 +241,15 @@ def generate_embeddings(
     Raises:
         ValueError: If OPENAI_API_KEY is not set.
     """
-    # Initialize embeddings model (supports OpenAI and OpenRouter)
-    embeddings_model = _initialize_embeddings_model()
+    # Initialize embeddings model (supports OpenAI and OpenRouter), backed by the chunk vector cache
+    embeddings_model = _initialize_document_embeddings_model()
     
     # Create vector store
     if vector_store_type is None:
         vector_store_type = VECTOR_STORE_TYPE
     
     if base_persist_directory is None:
-        base_persist_directory = VECTOR_STORE_PATH
+        base_persist_directory, _ = resolve_index_dir(VECTOR_STORE_PATH)
     
     # Create handbook-specific directory
     persist_directory = base_persist_directory / handbook_name
@@ -95,12 +257,16 @@ def generate_embeddings(
     
     collection_name = handbook_name  # Use handbook name as collection name
     
+    # Stable content-hash IDs (also stored in chunk metadata) for incremental updates
+    ids = assign_chunk_ids(chunks, handbook_name)
+    
     print(f"Generating embeddings and creating {vector_store_type.upper()} vector store for {handbook_name} with {len(chunks)} chunks...")
     
     if vector_store_type.lower() == "chroma":
         # Delete existing collection if it exists to avoid duplicates
         # Chroma.from_documents() appends to existing collections, causing duplicates
         import chromadb
+        from langchain_chroma import Chroma
         client = chromadb.PersistentClient(path=str(persist_directory))
         try:
             client.delete_collection(name=collection_name)
@@ -109,12 +275,6 @@ def generate_embeddings(
             # Collection doesn't exist, which is fine
             pass
         
-        # Generate IDs matching JSONL format for consistency
-        ids = [
-            f"{chunk.metadata.get('handbook', handbook_name)}_{i}"
-            for i, chunk in enumerate(chunks)
-        ]
-        
         vector_store = Chroma.from_documents(
             documents=chunks,
             embedding=embeddings_model,
@@ -126,33 +286,157 @@ def generate_embeddings(
         print(f"Chroma vector store created and persisted to {persist_directory}")
         
     elif vector_store_type.lower() == "faiss":
+        from langchain_community.vectorstores import FAISS
         vector_store = FAISS.from_documents(
             documents=chunks,
             embedding=embeddings_model,
+            ids=ids,
         )
         # Save FAISS index
         faiss_path = persist_directory / "faiss_index"
         vector_store.save_local(str(faiss_path))
         print(f"FAISS vector store created and saved to {faiss_path}")
         
+    elif vector_store_type.lower() == "numpy":
+        vector_store = NumpyVectorStore.from_documents(
+            documents=chunks,
+            embedding=embeddings_model,
+        )
+        # Save embedding matrix (.npy) alongside the chunk texts
+        numpy_path = persist_directory / "numpy_index"
+        vector_store.save_local(str(numpy_path))
+        print(f"NumPy vector store created and saved to {numpy_path}")
+        
     else:
-        raise ValueError(f"Unknown vector store type: {vector_store_type}. Use 'chroma' or 'faiss'")
+        raise ValueError(f"Unknown vector store type: {vector_store_type}. Use 'chroma', 'faiss' or 'numpy'")
+    
+    _report_cache_usage(embeddings_model)
+    save_manifest(persist_directory, vector_store_type.lower(), chunks)
     
     return vector_store
 
 
+def update_embeddings(
+    chunks,
+    handbook_name: str,
+    vector_store_type: str = None,
+    base_persist_directory: Path = None,
+) -> Dict[str, int]:
+    """
+    Bring a vector store up to date with the given chunks, embedding only what changed.
+    
+    Chunks are identified by content hash (see `indexing.manifest`). Compared
+    with the store's manifest, new or edited chunks are embedded and added,
+    chunks that no longer exist are deleted, and unchanged chunks are kept
+    as they are (only their position metadata is refreshed if they moved
+    within the file). Stores without a manifest (or built with another backend)
+    are rebuilt from scratch with `generate_embeddings`.
+    
+    Args:
+        chunks: All current Document chunks for the store.
+        handbook_name: Name of the handbook (or unified index) the store is for.
+        vector_store_type: Type of vector store ("chroma", "faiss" or "numpy"). Defaults to config.
+        base_persist_directory: Base directory for vector stores. Defaults to the
+                                current index version under config VECTOR_STORE_PATH.
+    
+    Returns:
+        Dict with counts of "added", "removed" and "unchanged" chunks, "moved"
+        (unchanged chunks whose position metadata was refreshed) and "rebuilt"
+        (1 if the store was built from scratch).
+    
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set.
+    """
+    if vector_store_type is None:
+        vector_store_type = VECTOR_STORE_TYPE
+    vector_store_type = vector_store_type.lower()
+    
+    if base_persist_directory is None:
+        base_persist_directory, _ = resolve_index_dir(VECTOR_STORE_PATH)
+    
+    persist_directory = base_persist_directory / handbook_name
+    manifest = load_manifest(persist_directory)
+    
+    if manifest is None or manifest.get("vector_store_type") != vector_store_type:
+        print(f"No usable manifest for {handbook_name}, rebuilding the whole store...")
+        generate_embeddings(chunks, handbook_name, vector_store_type, base_persist_directory)
+        return {"added": len(chunks), "removed": 0, "unchanged": 0, "moved": 0, "rebuilt": 1}
+    
+    ids = assign_chunk_ids(chunks, handbook_name)
+    added, removed, unchanged = diff_manifest(manifest, ids)
+    moved = moved_chunks(manifest, chunks, unchanged)
+    print(
+        f"{handbook_name}: {len(added)} new/changed, {len(removed)} removed, "
+        f"{len(unchanged)} unchanged chunks ({len(moved)} moved)"
+    )
+    
+    if added or removed or moved:
+        # Load with the document embeddings model (not the cached query model)
+        embeddings_model = _initialize_document_embeddings_model()
+        vector_store = load_vector_store(
+            handbook_name,
+            vector_store_type,
+            base_persist_directory,
+            embeddings_model=embeddings_model,
+        )
+        
+        if removed:
+            vector_store.delete(ids=removed)
+        if added:
+            added_ids = set(added)
+            added_chunks = [chunk for chunk, chunk_id in zip(chunks, ids) if chunk_id in added_ids]
+            vector_store.add_documents(added_chunks, ids=added)
+        if moved:
+            _update_metadata(vector_store, moved)
+        
+        # Chroma persists on write; the file-based stores are saved again
+        if vector_store_type == "faiss":
+            vector_store.save_local(str(persist_directory / "faiss_index"))
+        elif vector_store_type == "numpy":
+            vector_store.save_local(str(persist_directory / "numpy_index"))
+        
+        _report_cache_usage(embeddings_model)
+    
+    save_manifest(persist_directory, vector_store_type, chunks)
+    return {
+        "added": len(added),
+        "removed": len(removed),
+        "unchanged": len(unchanged),
+        "moved": len(moved),
+        "rebuilt": 0,
+    }
+
+
+def _update_metadata(vector_store: Union["Chroma", "FAISS", NumpyVectorStore], chunks):
+    """Replace the stored metadata of already embedded chunks (e.g., new byte offsets)."""
+    if is_vector_store(vector_store, "chroma"):
+        vector_store._collection.update(
+            ids=[chunk.metadata["chunk_id"] for chunk in chunks],
+            metadatas=[chunk.metadata for chunk in chunks],
+        )
+    elif is_vector_store(vector_store, "faiss"):
+        for chunk in chunks:
+            vector_store.docstore._dict[chunk.metadata["chunk_id"]] = chunk
+    else:
+        vector_store.update_documents(chunks)
+
+
 def load_vector_store(
     handbook_name: str,
     vector_store_type: str = None,
     base_persist_directory: Path = None,
-) -> Union[Chroma, FAISS]:
+    embeddings_model=None,
+) -> Union["Chroma", "FAISS", NumpyVectorStore]:
     """
     Load an existing vector store for a specific handbook.
     
     Args:
         handbook_name: Name of the handbook.
-        vector_store_type: Type of vector store ("chroma" or "faiss"). Defaults to config.
-        base_persist_directory: Base directory for vector stores. Defaults to config.
+        vector_store_type: Type of vector store ("chroma", "faiss" or "numpy"). Defaults to config.
+        base_persist_directory: Base directory for vector stores. Defaults to the
+                                current index version under config VECTOR_STORE_PATH.
+        embeddings_model: Embeddings model for the store. Defaults to the shared
+                          query embeddings model.
     
     Returns:
         Loaded vector store.
@@ -160,14 +444,15 @@ def load_vector_store(
     Raises:
         ValueError: If OPENAI_API_KEY is not set.
     """
-    # Initialize embeddings model (supports OpenAI and OpenRouter)
-    embeddings_model = _initialize_embeddings_model()
+    # Shared query embeddings model (supports OpenAI and OpenRouter, cached)
+    if embeddings_model is None:
+        embeddings_model = get_query_embeddings_model()
     
     if vector_store_type is None:
         vector_store_type = VECTOR_STORE_TYPE
     
     if base_persist_directory is None:
-        base_persist_directory = VECTOR_STORE_PATH
+        base_persist_directory, _ = resolve_index_dir(VECTOR_STORE_PATH)
     
     # Handbook-specific directory
     persist_directory = base_persist_directory / handbook_name
@@ -181,6 +466,7 @@ def load_vector_store(
                 f"Please run the indexing script to create vector stores."
             )
         
+        from langchain_chroma import Chroma
         vector_store = Chroma(
             persist_directory=str(persist_directory),
             embedding_function=embeddings_model,
@@ -202,6 +488,7 @@ def load_vector_store(
         
     elif vector_store_type.lower() == "faiss":
         faiss_path = persist_directory / "faiss_index"
+        from langchain_community.vectorstores import FAISS
         vector_store = FAISS.load_local(
             str(faiss_path),
             embeddings_model,
@@ -209,8 +496,17 @@ def load_vector_store(
         )
         print(f"Loaded FAISS vector store from {faiss_path}")
         
+    elif vector_store_type.lower() == "numpy":
+        # Embedding matrix is memory-mapped, so workers share the same pages
+        numpy_path = persist_directory / "numpy_index"
+        vector_store = NumpyVectorStore.load_local(
+            str(numpy_path),
+            embeddings_model,
+        )
+        print(f"Loaded NumPy vector store from {numpy_path} ({len(vector_store)} documents)")
+        
     else:
-        raise ValueError(f"Unknown vector store type: {vector_store_type}. Use 'chroma' or 'faiss'")
+        raise ValueError(f"Unknown vector store type: {vector_store_type}. Use 'chroma', 'faiss' or 'numpy'")
     
     return vector_store
 
@@ -228,7 +524,4 @@ def generate_embedding_for_text(text: str) -> List[float]:
     Raises:
         ValueError: If OPENAI_API_KEY is not set.
     """
-    # Initialize embeddings model (supports OpenAI and OpenRouter)
-    embeddings_model = _initialize_embeddings_model()
-    
-    return embeddings_model.embed_query(text)
+    return get_query_embeddings_model().embed_query(text)
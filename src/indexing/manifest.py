@@ -0,0 +1,159 @@
+"""Content-hash chunk IDs and the per-store manifest used for incremental re-indexing."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+MANIFEST_FILE = "manifest.json"
+CHUNK_ID_KEY = "chunk_id"
+# Where a chunk sits in its source; excluded from the hash so that edits
+# elsewhere in the file do not change the IDs of the chunks that moved
+POSITION_KEYS = ("start_byte", "end_byte")
+
+
+def chunk_hash(chunk: Document) -> str:
+    """
+    Hash a chunk's text and metadata.
+    
+    Any change to the text or metadata (e.g., its headers) changes the hash,
+    while an edit elsewhere in the handbook does not (position metadata is
+    not hashed).
+    """
+    metadata = {
+        key: value for key, value in chunk.metadata.items()
+        if key != CHUNK_ID_KEY and key not in POSITION_KEYS
+    }
+    payload = json.dumps(
+        {"text": chunk.page_content, "metadata": metadata},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def assign_chunk_ids(chunks: List[Document], handbook_name: str = None) -> List[str]:
+    """
+    Give every chunk a stable, content-derived ID.
+    
+    IDs have the form `{handbook}_{hash}`; identical chunks within a handbook
+    get an occurrence suffix (`_2`, `_3`, ...). The ID is also stored in each
+    chunk's metadata under `chunk_id`.
+    
+    Args:
+        chunks: Chunks to label (modified in place).
+        handbook_name: Fallback prefix for chunks without `handbook` metadata.
+    
+    Returns:
+        Chunk IDs, aligned with `chunks`.
+    """
+    ids = []
+    seen: Dict[str, int] = {}
+    for chunk in chunks:
+        chunk_id = f"{chunk.metadata.get('handbook', handbook_name or 'unknown')}_{chunk_hash(chunk)}"
+        seen[chunk_id] = seen.get(chunk_id, 0) + 1
+        if seen[chunk_id] > 1:
+            chunk_id = f"{chunk_id}_{seen[chunk_id]}"
+        chunk.metadata[CHUNK_ID_KEY] = chunk_id
+        ids.append(chunk_id)
+    return ids
+
+
+def load_manifest(store_directory: Path) -> Optional[Dict]:
+    """
+    Load the manifest of a vector store directory.
+    
+    Args:
+        store_directory: Directory of one vector store.
+    
+    Returns:
+        Dict with `vector_store_type`, `handbooks` (handbook name -> chunk IDs)
+        and `positions` (chunk ID -> position metadata), or None if the store
+        predates manifests.
+    """
+    try:
+        with open(Path(store_directory) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_manifest(store_directory: Path, vector_store_type: str, chunks: List[Document]):
+    """
+    Write the manifest for the chunks now held by a vector store.
+    
+    Args:
+        store_directory: Directory of one vector store.
+        vector_store_type: Backend the store was built with.
+        chunks: Chunks in the store (with `chunk_id` metadata).
+    """
+    handbooks: Dict[str, List[str]] = {}
+    positions: Dict[str, Dict] = {}
+    for chunk in chunks:
+        handbooks.setdefault(chunk.metadata.get("handbook", "unknown"), []).append(chunk.metadata[CHUNK_ID_KEY])
+        position = _position(chunk)
+        if position:
+            positions[chunk.metadata[CHUNK_ID_KEY]] = position
+    
+    path = Path(store_directory) / MANIFEST_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"vector_store_type": vector_store_type, "handbooks": handbooks, "positions": positions},
+            f,
+            indent=2,
+        )
+    tmp_path.replace(path)
+
+
+def _position(chunk: Document) -> Dict:
+    """Position metadata of a chunk."""
+    return {key: chunk.metadata[key] for key in POSITION_KEYS if key in chunk.metadata}
+
+
+def moved_chunks(manifest: Dict, chunks: List[Document], unchanged: List[str]) -> List[Document]:
+    """
+    Unchanged chunks whose position in the source differs from the manifest.
+    
+    Args:
+        manifest: Manifest from `load_manifest`.
+        chunks: Current chunks (with `chunk_id` metadata).
+        unchanged: IDs of chunks already in the store (see `diff_manifest`).
+    
+    Returns:
+        Chunks whose stored metadata should be refreshed (no re-embedding needed).
+    """
+    positions = manifest.get("positions", {})
+    unchanged = set(unchanged)
+    return [
+        chunk for chunk in chunks
+        if chunk.metadata[CHUNK_ID_KEY] in unchanged
+        and _position(chunk) != positions.get(chunk.metadata[CHUNK_ID_KEY], {})
+    ]
+
+
+def diff_manifest(manifest: Dict, chunk_ids: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Compare the chunk IDs in a manifest with a freshly chunked corpus.
+    
+    Args:
+        manifest: Manifest from `load_manifest`.
+        chunk_ids: IDs of the current chunks.
+    
+    Returns:
+        (added, removed, unchanged) chunk IDs.
+    """
+    indexed = {
+        chunk_id
+        for handbook_ids in manifest.get("handbooks", {}).values()
+        for chunk_id in handbook_ids
+    }
+    current = set(chunk_ids)
+    added = [chunk_id for chunk_id in chunk_ids if chunk_id not in indexed]
+    removed = sorted(indexed - current)
+    unchanged = [chunk_id for chunk_id in chunk_ids if chunk_id in indexed]
+    return added, removed, unchanged
@@ -0,0 +1,434 @@
+"""In-process vector store backed by a memory-mapped NumPy embedding matrix."""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from indexing.manifest import CHUNK_ID_KEY
+from utils.chunk_store import ChunkStore, LazyDocuments
+from utils.storage import load_chunks_from_jsonl
+
+# Files of indexes saved before the chunk store format (still loadable)
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.jsonl"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so that a dot product equals cosine similarity."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Brute-force cosine vector store for small corpora.
+    
+    Embeddings are kept as one contiguous, L2-normalized float32 matrix. On disk
+    the index is a `ChunkStore` (texts, metadata and the matrix as columns)
+    that is memory-mapped at load time, so several processes loading the same
+    index share the same pages and Documents are only built for the rows a
+    search returns. A search is a single matrix-vector product followed by
+    `argpartition`.
+    
+    Scores are cosine distances (1 - cosine similarity), matching Chroma
+    collections created with `hnsw:space = cosine`.
+    """
+    
+    def __init__(
+        self,
+        embedding: Embeddings,
+        documents: Sequence[Document],
+        matrix: np.ndarray,
+    ):
+        """
+        Initialize the store.
+        
+        Args:
+            embedding: Embeddings model used to embed queries.
+            documents: Documents, one per matrix row (a list, or the lazy
+                       read-only sequence of a ChunkStore).
+            matrix: L2-normalized float32 matrix of shape (len(documents), dim).
+        """
+        if len(documents) != matrix.shape[0]:
+            raise ValueError(
+                f"Document count ({len(documents)}) does not match embedding rows ({matrix.shape[0]})"
+            )
+        self._embedding = embedding
+        self._documents = documents
+        self._matrix = matrix
+        # Row indices per (metadata key, value), built lazily for filtering
+        self._metadata_index: Dict[str, Dict[Any, np.ndarray]] = {}
+    
+    @property
+    def embeddings(self) -> Embeddings:
+        """Embeddings model used for queries."""
+        return self._embedding
+    
+    @property
+    def matrix(self) -> np.ndarray:
+        """Normalized embedding matrix (read-only when memory-mapped)."""
+        return self._matrix
+    
+    @property
+    def documents(self) -> Sequence[Document]:
+        """Documents, aligned with the rows of `matrix`."""
+        return self._documents
+    
+    def _mutable_documents(self) -> List[Document]:
+        """Load lazily stored documents into a list before modifying them."""
+        if not isinstance(self._documents, list):
+            self._documents = list(self._documents)
+        return self._documents
+    
+    def _iter_metadata(self) -> Iterable[Dict[str, Any]]:
+        """Metadata of every row (read without building lazily stored Documents)."""
+        if isinstance(self._documents, LazyDocuments):
+            return self._documents.iter_metadata()
+        return (doc.metadata for doc in self._documents)
+    
+    def __len__(self) -> int:
+        return len(self._documents)
+    
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """
+        Embed and append texts. The matrix is copied into memory.
+        
+        If `ids` is passed, each ID is stored in the metadata under `chunk_id`
+        so that the text can later be removed with `delete`.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = kwargs.get("ids")
+        if ids is not None:
+            metadatas = [
+                {**metadata, CHUNK_ID_KEY: chunk_id}
+                for metadata, chunk_id in zip(metadatas, ids)
+            ]
+        
+        vectors = _normalize_rows(
+            np.asarray(self._embedding.embed_documents(texts), dtype=np.float32)
+        )
+        start = len(self._documents)
+        self._mutable_documents().extend(
+            Document(page_content=text, metadata=metadata)
+            for text, metadata in zip(texts, metadatas)
+        )
+        if self._matrix.shape[0] == 0:
+            self._matrix = vectors
+        else:
+            self._matrix = np.vstack([self._matrix, vectors])
+        self._metadata_index = {}
+        
+        if ids is not None:
+            return list(ids)
+        return [str(i) for i in range(start, len(self._documents))]
+    
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        Remove documents by their `chunk_id` metadata. The matrix is copied into memory.
+        
+        Args:
+            ids: Chunk IDs to remove.
+        
+        Returns:
+            True if any document was removed.
+        """
+        if not ids:
+            return False
+        ids = set(ids)
+        keep = [
+            i for i, metadata in enumerate(self._iter_metadata())
+            if metadata.get(CHUNK_ID_KEY) not in ids
+        ]
+        if len(keep) == len(self._documents):
+            return False
+        
+        self._documents = [self._documents[i] for i in keep]
+        self._matrix = np.ascontiguousarray(self._matrix[keep], dtype=np.float32)
+        self._metadata_index = {}
+        return True
+    
+    def update_documents(self, documents: List[Document]) -> int:
+        """
+        Replace stored documents (text and metadata) by `chunk_id`, keeping their embeddings.
+        
+        Args:
+            documents: Documents carrying the `chunk_id` of the row to replace.
+        
+        Returns:
+            Number of documents replaced.
+        """
+        by_id = {doc.metadata.get(CHUNK_ID_KEY): doc for doc in documents}
+        stored = self._mutable_documents()
+        replaced = 0
+        for i, doc in enumerate(stored):
+            replacement = by_id.get(doc.metadata.get(CHUNK_ID_KEY))
+            if replacement is not None:
+                stored[i] = replacement
+                replaced += 1
+        self._metadata_index = {}
+        return replaced
+    
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        """Create a store by embedding texts in one batch."""
+        metadatas = metadatas or [{} for _ in texts]
+        documents = [
+            Document(page_content=text, metadata=metadata)
+            for text, metadata in zip(texts, metadatas)
+        ]
+        if texts:
+            matrix = _normalize_rows(
+                np.asarray(embedding.embed_documents(list(texts)), dtype=np.float32)
+            )
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        return cls(embedding=embedding, documents=documents, matrix=matrix)
+    
+    def _rows_for_value(self, key: str, value: Any) -> np.ndarray:
+        """Return the row indices whose metadata[key] equals value."""
+        if key not in self._metadata_index:
+            groups: Dict[Any, List[int]] = {}
+            for i, metadata in enumerate(self._iter_metadata()):
+                groups.setdefault(metadata.get(key), []).append(i)
+            self._metadata_index[key] = {
+                group_value: np.asarray(rows, dtype=np.int64)
+                for group_value, rows in groups.items()
+            }
+        return self._metadata_index[key].get(value, np.zeros(0, dtype=np.int64))
+    
+    def _filter_rows(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Resolve a metadata filter to matching row indices.
+        
+        Supports the subset of the Chroma/FAISS filter syntax used by this
+        project: `{"key": value}`, `{"key": {"$eq": value}}` and
+        `{"key": {"$in": [values]}}`. Multiple keys are combined with AND.
+        
+        Returns:
+            Sorted row indices, or None if no filter was given.
+        """
+        if not filter:
+            return None
+        
+        rows = None
+        for key, condition in filter.items():
+            if isinstance(condition, dict):
+                if "$in" in condition:
+                    values = condition["$in"]
+                elif "$eq" in condition:
+                    values = [condition["$eq"]]
+                else:
+                    raise ValueError(f"Unsupported filter condition for '{key}': {condition}")
+            else:
+                values = [condition]
+            
+            matched = np.unique(np.concatenate(
+                [self._rows_for_value(key, value) for value in values]
+                or [np.zeros(0, dtype=np.int64)]
+            ))
+            rows = matched if rows is None else np.intersect1d(rows, matched)
+        
+        return rows
+    
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Return positions of the k highest scores, best first."""
+        n = scores.shape[0]
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        return top[np.argsort(-scores[top])]
+    
+    def _score(self, embedding: List[float], rows: Optional[np.ndarray]) -> np.ndarray:
+        """Cosine similarity of the query against all rows (or a subset)."""
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0.0:
+            query = query / norm
+        
+        matrix = self._matrix if rows is None else self._matrix[rows]
+        return matrix @ query
+    
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return the k nearest documents to an embedding vector.
+        
+        Args:
+            embedding: Query embedding.
+            k: Number of documents to return.
+            filter: Optional metadata filter (see `_filter_rows`).
+        
+        Returns:
+            List of (document, cosine distance) tuples, nearest first.
+        """
+        if self._matrix.shape[0] == 0 or k <= 0:
+            return []
+        
+        rows = self._filter_rows(filter)
+        if rows is not None and rows.shape[0] == 0:
+            return []
+        
+        scores = self._score(embedding, rows)
+        top = self._top_k(scores, k)
+        indices = top if rows is None else rows[top]
+        
+        return [
+            (self._documents[i], max(0.0, float(1.0 - score)))
+            for i, score in zip(indices, scores[top])
+        ]
+    
+    def grouped_similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        group_key: str,
+        groups: List[Any],
+        k: int = 4,
+    ) -> Dict[Any, List[Tuple[Document, float]]]:
+        """
+        Return the k nearest documents per metadata group in a single pass.
+        
+        One matrix-vector product scores every row; the top k are then
+        selected within each requested group.
+        
+        Args:
+            embedding: Query embedding.
+            group_key: Metadata key to group by (e.g., "handbook").
+            groups: Group values to search.
+            k: Number of documents to return per group.
+        
+        Returns:
+            Dict mapping each group value to (document, cosine distance) tuples.
+        """
+        results: Dict[Any, List[Tuple[Document, float]]] = {group: [] for group in groups}
+        if self._matrix.shape[0] == 0 or k <= 0:
+            return results
+        
+        scores = self._score(embedding, None)
+        
+        for group in groups:
+            group_rows = self._rows_for_value(group_key, group)
+            if group_rows.shape[0] == 0:
+                continue
+            group_scores = scores[group_rows]
+            top = self._top_k(group_scores, k)
+            results[group] = [
+                (self._documents[group_rows[i]], max(0.0, float(1.0 - group_scores[i])))
+                for i in top
+            ]
+        
+        return results
+    
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        """Embed the query and return (document, cosine distance) tuples."""
+        embedding = self._embedding.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)
+    
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        **kwargs: Any,
+    ) -> List[Document]:
+        """Return the k nearest documents to an embedding vector."""
+        return [
+            doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)
+        ]
+    
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        **kwargs: Any,
+    ) -> List[Document]:
+        """Return the k nearest documents to a query string."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+    
+    def _select_relevance_score_fn(self):
+        """Convert cosine distance to a relevance score in [0, 1]."""
+        return self._cosine_relevance_score_fn
+    
+    def save_local(self, folder_path: str):
+        """
+        Persist the store as a ChunkStore holding the texts, metadata and matrix.
+        
+        Args:
+            folder_path: Directory to write the index into.
+        """
+        path = Path(folder_path)
+        ChunkStore.write(path, list(self._documents), embeddings=self._matrix)
+        (path / CHUNKS_FILE).unlink(missing_ok=True)
+    
+    @classmethod
+    def load_local(
+        cls,
+        folder_path: str,
+        embeddings: Embeddings,
+        mmap: bool = True,
+    ) -> "NumpyVectorStore":
+        """
+        Load a store saved with `save_local`.
+        
+        Args:
+            folder_path: Directory containing the index.
+            embeddings: Embeddings model used for queries.
+            mmap: Memory-map the embedding matrix read-only (default: True).
+        
+        Returns:
+            Loaded NumpyVectorStore.
+        
+        Raises:
+            FileNotFoundError: If the index files do not exist.
+        """
+        path = Path(folder_path)
+        if ChunkStore.exists(path):
+            chunk_store = ChunkStore(path, mmap=mmap)
+            matrix = chunk_store.embeddings
+            if matrix is None:
+                matrix = np.zeros((0, 0), dtype=np.float32)
+            return cls(embedding=embeddings, documents=chunk_store.documents, matrix=matrix)
+        
+        # Index saved before the chunk store format
+        matrix_file = path / EMBEDDINGS_FILE
+        chunks_file = path / CHUNKS_FILE
+        
+        if not matrix_file.exists() or not chunks_file.exists():
+            raise FileNotFoundError(
+                f"NumPy index not found in {path}. "
+                f"Please run the indexing script to create vector stores."
+            )
+        
+        matrix = np.load(matrix_file, mmap_mode="r" if mmap else None)
+        documents = load_chunks_from_jsonl(chunks_file)
+        
+        return cls(embedding=embeddings, documents=documents, matrix=matrix)
@@ -0,0 +1,231 @@
+"""Parallel index build: process-pool chunking and rate-limited concurrent embedding."""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from indexing.chunking import chunk_markdown_intelligently
+from indexing.embedding_cache import PersistentEmbeddingStore, cache_key
+
+
+def chunk_handbooks_parallel(handbooks: Dict[str, str], workers: int = 4) -> Dict[str, List[Document]]:
+    """
+    Chunk every handbook, one handbook per process-pool task.
+    
+    Args:
+        handbooks: Dict mapping handbook name to markdown content.
+        workers: Number of worker processes (1 chunks in this process).
+    
+    Returns:
+        Dict mapping handbook name to its chunks, in the input order.
+    """
+    names = list(handbooks)
+    if workers <= 1 or len(names) <= 1:
+        return {name: chunk_markdown_intelligently(handbooks[name], name) for name in names}
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(names))) as executor:
+        results = executor.map(chunk_markdown_intelligently, [handbooks[name] for name in names], names)
+        return dict(zip(names, results))
+
+
+def _token_counter(model: str):
+    """Return a function counting the tokens of a text for the embedding model."""
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(model)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        # Roughly four characters per token for English text
+        return lambda text: len(text) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Async limiter for a requests-per-minute and tokens-per-minute budget.
+    
+    Both budgets are token buckets that refill continuously, so short bursts
+    up to one minute's budget are allowed and the sustained rate never
+    exceeds the limits.
+    """
+    
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """
+        Initialize the limiter.
+        
+        Args:
+            requests_per_minute: Request budget (None for unlimited).
+            tokens_per_minute: Token budget (None for unlimited).
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+    
+    def _refill(self):
+        """Add the budget accrued since the last refill."""
+        now = time.monotonic()
+        elapsed_minutes = (now - self._updated) / 60.0
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed_minutes * self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed_minutes * self.tokens_per_minute)
+    
+    async def acquire(self, tokens: int):
+        """
+        Wait until one request of `tokens` tokens fits in both budgets.
+        
+        Requests larger than the whole token budget are let through once the
+        bucket is full rather than waiting forever.
+        """
+        async with self._lock:
+            if self.tokens_per_minute:
+                tokens = min(tokens, self.tokens_per_minute)
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.requests_per_minute and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60.0 / self.requests_per_minute)
+                if self.tokens_per_minute and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60.0 / self.tokens_per_minute)
+                if wait <= 0:
+                    break
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+
+
+async def aembed_into_store(
+    texts: List[str],
+    embeddings: Embeddings,
+    store: PersistentEmbeddingStore,
+    model: str,
+    batch_size: int = 96,
+    concurrency: int = 4,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+    max_retries: int = 3,
+) -> Dict[str, float]:
+    """
+    Embed every text missing from the store, concurrently and within the rate limits.
+    
+    Each finished batch is written to the store straight away, so the store
+    doubles as the build checkpoint: an interrupted run resumes with only the
+    batches that had not completed. Failed batches are retried with
+    exponential backoff.
+    
+    Args:
+        texts: Chunk texts to embed.
+        embeddings: Embeddings model (uncached).
+        store: Persistent store of chunk vectors (see `CachedDocumentEmbeddings`).
+        model: Embedding model name (part of the cache key).
+        batch_size: Texts per embedding request.
+        concurrency: Maximum embedding requests in flight.
+        requests_per_minute: Request budget (None for unlimited).
+        tokens_per_minute: Token budget (None for unlimited).
+        max_retries: Attempts per batch after the first failure.
+    
+    Returns:
+        Dict with "cached", "embedded" and "batches" counts, "tokens" sent,
+        "rate_limit_wait_seconds" and "seconds" elapsed.
+    
+    Raises:
+        Exception: The last error of a batch that failed every attempt.
+    """
+    start = time.perf_counter()
+    unique = {cache_key(model, text): text for text in texts}
+    cached = store.get_many(list(unique))
+    missing = [(key, text) for key, text in unique.items() if key not in cached]
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    
+    count_tokens = _token_counter(model)
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    total_tokens = 0
+    done = 0
+    
+    async def run(batch):
+        nonlocal total_tokens, done
+        batch_tokens = sum(count_tokens(text) for _, text in batch)
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                await limiter.acquire(batch_tokens)
+                try:
+                    vectors = await embeddings.aembed_documents([text for _, text in batch])
+                    break
+                except Exception as e:
+                    if attempt == max_retries:
+                        raise
+                    delay = 2 ** attempt
+                    print(f"Warning: Embedding batch failed ({e}), retrying in {delay}s...")
+                    await asyncio.sleep(delay)
+        # Checkpoint the batch before reporting progress
+        store.put_many({key: vector for (key, _), vector in zip(batch, vectors)}, model=model)
+        total_tokens += batch_tokens
+        done += len(batch)
+        print(f"  Embedded {done}/{len(missing)} chunks")
+    
+    if batches:
+        print(f"Embedding {len(missing)} chunks in {len(batches)} batches ({len(cached)} already cached)...")
+        await asyncio.gather(*(run(batch) for batch in batches))
+    
+    return {
+        "cached": len(cached),
+        "embedded": len(missing),
+        "batches": len(batches),
+        "tokens": total_tokens,
+        "rate_limit_wait_seconds": round(limiter.waited_seconds, 2),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def precompute_embeddings(chunks: List[Document]) -> Optional[Dict[str, float]]:
+    """
+    Fill the document embedding cache for every chunk before the stores are built.
+    
+    Store construction then reads every vector from the cache. Uses the
+    INDEXING_EMBEDDING_* and EMBEDDING_RATE_LIMIT_* settings.
+    
+    Args:
+        chunks: Chunks of every handbook.
+    
+    Returns:
+        Stats from `aembed_into_store`, or None if the document embedding
+        cache is disabled (stores then embed their chunks themselves).
+    
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set.
+    """
+    from config import (
+        OPENAI_MODEL,
+        INDEXING_EMBEDDING_BATCH_SIZE,
+        INDEXING_EMBEDDING_CONCURRENCY,
+        EMBEDDING_RATE_LIMIT_RPM,
+        EMBEDDING_RATE_LIMIT_TPM,
+    )
+    from indexing.embeddings import _initialize_embeddings_model, get_document_embedding_store
+    
+    store = get_document_embedding_store()
+    if store is None:
+        return None
+    
+    return asyncio.run(aembed_into_store(
+        [chunk.page_content for chunk in chunks],
+        _initialize_embeddings_model(),
+        store,
+        OPENAI_MODEL,
+        batch_size=INDEXING_EMBEDDING_BATCH_SIZE,
+        concurrency=INDEXING_EMBEDDING_CONCURRENCY,
+        requests_per_minute=EMBEDDING_RATE_LIMIT_RPM,
+        tokens_per_minute=EMBEDDING_RATE_LIMIT_TPM,
+    ))
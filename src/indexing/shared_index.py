@@ -0,0 +1,207 @@
+"""Shared-memory copy of the served index, attached read-only by every API worker."""
+
+import hashlib
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from indexing.embeddings import load_vector_store, is_vector_store
+from indexing.numpy_store import NumpyVectorStore, _normalize_rows
+from utils.chunk_store import ChunkStore
+from utils.storage import INDEX_VERSIONS_DIR
+
+COMPLETE_FILE = "COMPLETE"
+LOCK_SUFFIX = ".lock"
+NUMPY_INDEX_DIR = "numpy_index"
+
+
+@contextmanager
+def _exclusive_lock(lock_file: Path):
+    """Hold an exclusive lock on a file, shared between processes."""
+    import fcntl
+    with open(lock_file, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def shared_index_key(index_dir: Path, version: Optional[str]) -> str:
+    """
+    Name of the shared copy of an index.
+    
+    Versioned indexes are immutable once published, so the version is the
+    key. An index built before versioning is keyed by its manifests'
+    modification times, so a rebuild is not mistaken for the old copy.
+    """
+    if version:
+        return version
+    stamps = sorted(
+        f"{path.parent.name}:{path.stat().st_mtime_ns}"
+        for path in Path(index_dir).glob("*/manifest.json")
+    )
+    return "unversioned-" + hashlib.sha256("\n".join(stamps).encode("utf-8")).hexdigest()[:12]
+
+
+def export_store(store) -> Tuple[List[Document], np.ndarray]:
+    """
+    Read every chunk of a vector store with its embedding.
+    
+    Args:
+        store: Chroma, FAISS or NumpyVectorStore instance
+    
+    Returns:
+        (documents, L2-normalized float32 matrix with one row per document)
+    """
+    if isinstance(store, NumpyVectorStore):
+        return list(store.documents), np.asarray(store.matrix, dtype=np.float32)
+    
+    if is_vector_store(store, "faiss"):
+        ntotal = store.index.ntotal
+        documents = [store.docstore.search(store.index_to_docstore_id[i]) for i in range(ntotal)]
+        matrix = store.index.reconstruct_n(0, ntotal) if ntotal else np.zeros((0, 0))
+    else:
+        result = store._collection.get(include=["embeddings", "documents", "metadatas"])
+        documents = [
+            Document(page_content=text or "", metadata=metadata or {})
+            for text, metadata in zip(result["documents"], result["metadatas"])
+        ]
+        matrix = result["embeddings"] if len(documents) else np.zeros((0, 0))
+    
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return documents, _normalize_rows(matrix) if matrix.shape[0] else matrix
+
+
+def _close_store(store):
+    """Release a store loaded only to be exported."""
+    if is_vector_store(store, "chroma"):
+        try:
+            store._client.close()
+        except Exception:
+            pass
+
+
+def publish_shared_index(
+    index_dir: Path,
+    version: Optional[str],
+    shared_root: Path,
+    store_names: Optional[List[str]] = None,
+    vector_store_type: Optional[str] = None,
+) -> Path:
+    """
+    Copy an index into shared memory as memory-mapped NumPy stores, once per host.
+    
+    Every store is exported as a `ChunkStore` (texts, metadata and the
+    normalized embedding matrix) under `shared_root/<key>/<store>/numpy_index/`.
+    When `shared_root` is on tmpfs (e.g., `/dev/shm`) the files live in RAM,
+    so every worker that attaches with `NumpyVectorStore.load_local` maps the
+    same physical pages instead of loading a private copy of the index.
+    
+    The first process to get here publishes (under a file lock); others wait
+    for it and reuse its copy. Chunks of a unified index are written grouped
+    by handbook, so each handbook's embeddings are one contiguous slice.
+    
+    Scores of the shared stores are cosine distances for every backend
+    (FAISS indexes are searched by cosine rather than L2 distance).
+    
+    Args:
+        index_dir: Directory of the index version to share.
+        version: Index version (see `resolve_index_dir`).
+        shared_root: Directory for shared copies (ideally on tmpfs).
+        store_names: Stores to share (handbook names, or the unified index name).
+                     Defaults to every store directory of the index.
+        vector_store_type: Backend of the source index. Defaults to config.
+    
+    Returns:
+        Directory to pass as `base_persist_directory` with the "numpy" backend.
+    
+    Raises:
+        FileNotFoundError: If none of the stores could be loaded.
+    """
+    shared_root = Path(shared_root)
+    shared_root.mkdir(parents=True, exist_ok=True)
+    key = shared_index_key(index_dir, version)
+    target = shared_root / key
+    
+    with _exclusive_lock(shared_root / f"{key}{LOCK_SUFFIX}"):
+        if (target / COMPLETE_FILE).exists():
+            print(f"✓ Attached to shared index {target}")
+            return target
+        
+        start = time.perf_counter()
+        tmp = shared_root / f"{key}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.rmtree(target, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        if store_names is None:
+            store_names = sorted(
+                path.name for path in Path(index_dir).iterdir()
+                if path.is_dir() and path.name != INDEX_VERSIONS_DIR
+            )
+        published = 0
+        for store_name in store_names:
+            try:
+                store = load_vector_store(
+                    store_name,
+                    vector_store_type=vector_store_type,
+                    base_persist_directory=Path(index_dir),
+                )
+            except Exception as e:
+                print(f"✗ Error loading {store_name} for the shared index: {e}")
+                continue
+            documents, matrix = export_store(store)
+            _close_store(store)
+            order = sorted(range(len(documents)), key=lambda i: documents[i].metadata.get("handbook") or "")
+            ChunkStore.write(
+                tmp / store_name / NUMPY_INDEX_DIR,
+                [documents[i] for i in order],
+                embeddings=matrix[order] if len(order) else matrix,
+            )
+            published += 1
+        
+        if not published:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise FileNotFoundError(f"No vector store in {index_dir} could be loaded for the shared index")
+        
+        (tmp / COMPLETE_FILE).write_text(f"{version or key}\n", encoding="utf-8")
+        os.replace(tmp, target)
+        print(f"✓ Published shared index {target} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    
+    return target
+
+
+def prune_shared_indexes(shared_root: Path, keep: int, current: Optional[str] = None) -> List[str]:
+    """
+    Delete old shared copies, keeping the current one and the newest others.
+    
+    Workers still serving from a deleted copy keep their mapped pages until
+    they swap to the new version, so pruning never breaks a running search.
+    
+    Args:
+        shared_root: Directory of the shared copies.
+        keep: Number of copies to keep, including the current one.
+        current: Key of the copy being served.
+    
+    Returns:
+        The deleted keys.
+    """
+    shared_root = Path(shared_root)
+    if not shared_root.exists():
+        return []
+    others = sorted(
+        (path for path in shared_root.iterdir() if path.is_dir() and path.name != current and ".tmp-" not in path.name),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    deleted = [path.name for path in others[max(keep - 1, 0):]]
+    for key in deleted:
+        shutil.rmtree(shared_root / key, ignore_errors=True)
+        (shared_root / f"{key}{LOCK_SUFFIX}").unlink(missing_ok=True)
+    return deleted
@@ -0,0 +1,242 @@
+"""Single-pass streaming markdown chunker that records where each chunk came from."""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from langchain_core.documents import Document
+
+from config import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    HEADERS_TO_SPLIT_ON,
+    TEXT_SPLITTER_SEPARATORS,
+)
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of a string with their line endings, without copying the whole text."""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+def _header_level(line: str, headers: List[Tuple[str, str]]) -> Optional[Tuple[str, str, str]]:
+    """
+    Match a line against the configured header markers.
+    
+    Returns:
+        (marker, metadata key, header text) for a split header, otherwise None.
+    """
+    for marker, name in headers:
+        if line.startswith(marker) and (len(line) == len(marker) or line[len(marker)] in " \t"):
+            return marker, name, line[len(marker):].strip()
+    return None
+
+
+def _find_cut(text: str, chunk_size: int, chunk_overlap: int, separators: List[str]) -> int:
+    """
+    Choose where to end a chunk of an oversized buffer.
+    
+    Prefers the last separator (in `separators` order) that leaves a chunk
+    longer than the overlap, so every cut makes progress.
+    """
+    for separator in separators:
+        if not separator:
+            continue
+        index = text.rfind(separator, 0, chunk_size)
+        if index > chunk_overlap:
+            return index + len(separator)
+    return chunk_size
+
+
+def _overlap_start(text: str, cut: int, chunk_overlap: int) -> int:
+    """Start of the next chunk: up to `chunk_overlap` characters before the cut, on a word boundary."""
+    start = cut - chunk_overlap
+    if chunk_overlap <= 0 or start <= 0:
+        return cut
+    for index in range(start, cut):
+        if text[index - 1].isspace() and not text[index].isspace():
+            return index
+    return cut
+
+
+class StreamingMarkdownChunker:
+    """
+    Split markdown into chunks in one pass over its lines.
+    
+    Sections start at every header listed in `headers_to_split_on` (headers
+    inside fenced code blocks are ignored) and keep their header line, like
+    `MarkdownHeaderTextSplitter(strip_headers=False)`; a header directly
+    followed by another header starts the same chunk. Sections longer than
+    `chunk_size` characters are cut at the last paragraph, line, sentence or
+    word boundary (`separators` order) and consecutive pieces overlap by up
+    to `chunk_overlap` characters.
+    
+    Only the current section (at most about one chunk) is buffered, so memory
+    does not grow with the document. Each chunk records the UTF-8 byte range
+    it covers in the source (`start_byte`, `end_byte`) and its `header_path`.
+    """
+    
+    def __init__(
+        self,
+        chunk_size: int = None,
+        chunk_overlap: int = None,
+        headers_to_split_on: List[Tuple[str, str]] = None,
+        separators: List[str] = None,
+    ):
+        """
+        Initialize the chunker.
+        
+        Args:
+            chunk_size: Maximum chunk length in characters. Defaults to config CHUNK_SIZE.
+            chunk_overlap: Overlap between pieces of a long section. Defaults to config CHUNK_OVERLAP.
+            headers_to_split_on: (marker, metadata key) pairs. Defaults to config HEADERS_TO_SPLIT_ON.
+            separators: Preferred cut points. Defaults to config TEXT_SPLITTER_SEPARATORS.
+        """
+        self.chunk_size = CHUNK_SIZE if chunk_size is None else chunk_size
+        self.chunk_overlap = CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        # Longest marker first so "###" is not mistaken for "#"
+        self.headers = sorted(
+            HEADERS_TO_SPLIT_ON if headers_to_split_on is None else headers_to_split_on,
+            key=lambda header: len(header[0]),
+            reverse=True,
+        )
+        self.separators = TEXT_SPLITTER_SEPARATORS if separators is None else separators
+        self._levels = {name: len(marker) for marker, name in self.headers}
+    
+    def iter_chunks(self, lines: Union[str, Iterable[str]], handbook_name: str) -> Iterator[Document]:
+        """
+        Yield chunks lazily.
+        
+        Args:
+            lines: Markdown text, or an iterable of lines with their line endings
+                   (e.g., a file opened with `newline=""`).
+            handbook_name: Name of the handbook (for metadata).
+        
+        Yields:
+            Document chunks with handbook, source, header (`Header 1`, ...),
+            header_path, start_byte and end_byte metadata.
+        """
+        if isinstance(lines, str):
+            lines = _iter_lines(lines)
+        
+        active_headers: Dict[str, str] = {}
+        buffer = ""
+        buffer_byte = 0  # Byte offset of buffer[0] in the source
+        offset = 0  # Byte offset of the current line
+        fence = None
+        has_body = False  # Whether the buffer holds more than header lines
+        
+        for line in lines:
+            stripped = line.lstrip()
+            header = None
+            if fence is not None:
+                if stripped.startswith(fence):
+                    fence = None
+            elif stripped.startswith("```") or stripped.startswith("~~~"):
+                fence = stripped[:3]
+            else:
+                header = _header_level(line.rstrip("\r\n"), self.headers)
+            
+            if header is not None:
+                # A split header closes the current section; consecutive
+                # headers without body text are kept together
+                if has_body:
+                    yield from self._emit(buffer, buffer_byte, active_headers, handbook_name)
+                    buffer, buffer_byte, has_body = "", offset, False
+                elif not buffer.strip():
+                    buffer, buffer_byte = "", offset
+                _, name, text = header
+                level = self._levels[name]
+                active_headers = {
+                    key: value for key, value in active_headers.items() if self._levels[key] < level
+                }
+                active_headers[name] = text
+                buffer += line
+            else:
+                buffer += line
+                has_body = has_body or bool(stripped)
+            
+            offset += len(line.encode("utf-8"))
+            
+            # Cut oversized sections as soon as a full chunk is buffered
+            while len(buffer) > self.chunk_size:
+                cut = _find_cut(buffer, self.chunk_size, self.chunk_overlap, self.separators)
+                yield from self._emit(buffer[:cut], buffer_byte, active_headers, handbook_name)
+                start = _overlap_start(buffer, cut, self.chunk_overlap)
+                buffer_byte += len(buffer[:start].encode("utf-8"))
+                buffer = buffer[start:]
+        
+        yield from self._emit(buffer, buffer_byte, active_headers, handbook_name)
+    
+    def _emit(
+        self,
+        text: str,
+        start_byte: int,
+        active_headers: Dict[str, str],
+        handbook_name: str,
+    ) -> Iterator[Document]:
+        """Yield one chunk for `text` (trimmed), unless it is blank."""
+        content = text.strip()
+        if not content:
+            return
+        leading = text[:len(text) - len(text.lstrip())]
+        start = start_byte + len(leading.encode("utf-8"))
+        ordered = sorted(active_headers.items(), key=lambda item: self._levels[item[0]])
+        yield Document(
+            page_content=content,
+            metadata={
+                **dict(ordered),
+                "handbook": handbook_name,
+                "source": f"{handbook_name}.md",
+                "header_path": " > ".join(value for _, value in ordered),
+                "start_byte": start,
+                "end_byte": start + len(content.encode("utf-8")),
+            },
+        )
+
+
+def iter_markdown_chunks(
+    content: Union[str, Iterable[str]],
+    handbook_name: str,
+    chunk_size: int = None,
+    chunk_overlap: int = None,
+) -> Iterator[Document]:
+    """
+    Chunk markdown in a single streaming pass (see `StreamingMarkdownChunker`).
+    
+    Args:
+        content: Markdown text, or an iterable of lines with their line endings.
+        handbook_name: Name of the handbook (for metadata).
+        chunk_size: Optional custom chunk size. Defaults to config value.
+        chunk_overlap: Optional custom chunk overlap. Defaults to config value.
+    
+    Yields:
+        Document chunks with byte offsets and header path metadata.
+    """
+    chunker = StreamingMarkdownChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    yield from chunker.iter_chunks(content, handbook_name)
+
+
+def iter_markdown_file_chunks(path: Path, handbook_name: str = None) -> Iterator[Document]:
+    """
+    Chunk a markdown file without reading it into memory.
+    
+    The file is read line by line with line endings preserved, so the byte
+    offsets match the file on disk exactly (including CRLF files).
+    
+    Args:
+        path: Markdown file.
+        handbook_name: Name of the handbook. Defaults to the file stem.
+    
+    Yields:
+        Document chunks with byte offsets and header path metadata.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from iter_markdown_chunks(f, handbook_name or path.stem)
@@ -1,7 +1,14 @@
 """FastAPI application setup for the multi-agent RAG chatbot."""
 
+import asyncio
+import time
+
+# Taken before the first import so the startup profile covers import time
+_process_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 import sys
 from pathlib import Path
@@ -11,8 +18,31 @@ src_path = Path(__file__).parent
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
-from querying.agents import Orchestrator
+from config import INDEX_WATCH_INTERVAL_SECONDS, SHARED_INDEX_ENABLED, SERVER_WORKERS
 from querying import setup_query_routes
+from utils.startup import StartupProfile, BackgroundInitializer
+
+startup_profile = StartupProfile(started=_process_started)
+startup_profile.lap("import_app")
+
+
+def build_orchestrator():
+    """
+    Import and build the orchestrator, then warm up its agents.
+    
+    Runs in a worker thread after the server has started, so the port is
+    bound while langchain, langfuse and openai are imported and the vector
+    stores, LLM clients and evaluator are created.
+    """
+    startup_profile.restart()
+    from querying.agents import Orchestrator
+    startup_profile.lap("import_orchestrator")
+    
+    orchestrator = Orchestrator(startup_profile=startup_profile)
+    orchestrator.warm_up()
+    startup_profile.mark_ready()
+    print(f"✓ Ready in {startup_profile.ready_ms:.0f} ms: {startup_profile.steps}")
+    return orchestrator
 
 
 def create_app() -> FastAPI:
@@ -33,13 +63,39 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Initialize orchestrator (singleton)
-    orchestrator = Orchestrator()
+    # Orchestrator (singleton) is built in the background once the server has started
+    orchestrator_initializer = BackgroundInitializer(build_orchestrator, name="orchestrator")
+    app.add_event_handler("startup", orchestrator_initializer.start)
+    
+    # Swap in new index versions published by build_index.py without a restart
+    index_watcher: dict = {}
+    
+    async def watch_index():
+        try:
+            orchestrator = await orchestrator_initializer.get()
+        except Exception:
+            return
+        await orchestrator.watch_index(INDEX_WATCH_INTERVAL_SECONDS)
+    
+    async def start_index_watcher():
+        if INDEX_WATCH_INTERVAL_SECONDS:
+            index_watcher["task"] = asyncio.get_running_loop().create_task(watch_index())
+    
+    app.add_event_handler("startup", start_index_watcher)
     
     # Setup query routes
-    query_router = setup_query_routes(orchestrator)
+    query_router = setup_query_routes(orchestrator_initializer)
     app.include_router(query_router)
     
+    # Finish queued background evaluations before exiting
+    async def shutdown():
+        if "task" in index_watcher:
+            index_watcher["task"].cancel()
+        if orchestrator_initializer.ready:
+            await orchestrator_initializer.value.aclose()
+    
+    app.add_event_handler("shutdown", shutdown)
+    
     # Root endpoint
     @app.get("/")
     def read_root():
@@ -52,12 +108,17 @@ def create_app() -> FastAPI:
                 "root": {
                     "GET /": "This endpoint - API information",
                     "HEAD /health": "Health check endpoint",
+                    "GET /ready": "Readiness check (200 once vector stores and agents are loaded)",
                 },
                 "query": {
                     "POST /api/v1/query": "Process a user query through the orchestrator",
+                    "POST /api/v1/query/stream": "Process a user query, streaming the answer as server-sent events",
                     "GET /api/v1/agents": "List all available specialist agents",
                        "GET /api/v1/sessions/{session_id}/history": "Get conversation history for a session",
                        "DELETE /api/v1/sessions/{session_id}": "Clear conversation history for a session",
+                       "GET /api/v1/evaluations/{evaluation_id}": "Quality score of a response evaluated in the background",
+                       "GET /api/v1/metrics": "Runtime metrics (cache hit/miss counters)",
+                       "POST /api/v1/admin/reload-index": "Load the latest index version and swap it in (requires X-Admin-Key)",
                    },
                 "docs": {
                     "GET /docs": "Interactive API documentation (Swagger UI)",
@@ -72,6 +133,17 @@ def create_app() -> FastAPI:
         """Health check endpoint."""
         return {"status": "ok"}
     
+    # Readiness endpoint: the process serves /health immediately, but only
+    # answers queries without waiting once the orchestrator is built
+    @app.get("/ready")
+    def readiness_check():
+        """Readiness check with the startup profile."""
+        status = orchestrator_initializer.status()
+        content = {"status": status, "startup": startup_profile.as_dict()}
+        if status == "failed":
+            content["error"] = str(orchestrator_initializer.error)
+        return JSONResponse(content=content, status_code=200 if status == "ready" else 503)
+    
     return app
 
 
@@ -79,6 +151,38 @@ def create_app() -> FastAPI:
 app = create_app()
 
 
+def publish_shared_index():
+    """
+    Copy the current index into shared memory before the workers start.
+    
+    Workers then attach to the copy instead of each loading (or racing to
+    publish) the index.
+    """
+    from config import SHARED_INDEX_PATH, VECTOR_STORE_PATH
+    from indexing.shared_index import publish_shared_index as publish
+    from utils.storage import resolve_index_dir
+    
+    index_dir, version = resolve_index_dir(VECTOR_STORE_PATH)
+    try:
+        publish(index_dir, version, SHARED_INDEX_PATH)
+    except Exception as e:
+        print(f"Warning: Could not publish the shared index ({e}); workers will load their own copy")
+
+
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    parser = argparse.ArgumentParser(description="Run the API server")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Worker processes")
+    args = parser.parse_args()
+    
+    if args.workers > 1:
+        if SHARED_INDEX_ENABLED:
+            publish_shared_index()
+        # Workers import the app themselves, so it is passed by name
+        uvicorn.run("main:app", app_dir=str(src_path), host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,72 @@
+"""
+Inspect and maintain the document embedding cache used by build_index.py.
+
+Commands:
+    stats                  Show entry counts per embedding model and file size
+    compact                Drop vectors of other embedding models, apply the size cap, reclaim space
+    export PATH            Copy the cache to a standalone SQLite file
+    import PATH            Merge vectors from an exported cache (e.g., from another deployment)
+"""
+
+import argparse
+
+from config import DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES, OPENAI_MODEL
+from indexing import get_document_embedding_store
+
+
+def main():
+    """Main function to manage the document embedding cache."""
+    parser = argparse.ArgumentParser(description="Manage the document embedding cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show cache statistics")
+    compact_parser = subparsers.add_parser("compact", help="Shrink the cache and reclaim disk space")
+    compact_parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES,
+        help="Keep at most this many vectors (least recently used dropped first)",
+    )
+    compact_parser.add_argument(
+        "--keep-model",
+        default=OPENAI_MODEL,
+        help="Drop vectors produced by any other embedding model",
+    )
+    compact_parser.add_argument(
+        "--all-models",
+        action="store_true",
+        help="Keep vectors of every embedding model",
+    )
+    export_parser = subparsers.add_parser("export", help="Copy the cache to a file")
+    export_parser.add_argument("path", help="Destination SQLite file")
+    import_parser = subparsers.add_parser("import", help="Merge an exported cache")
+    import_parser.add_argument("path", help="SQLite file written by export")
+    args = parser.parse_args()
+    
+    store = get_document_embedding_store()
+    if store is None:
+        print("Document embedding cache is disabled (DOCUMENT_EMBEDDING_CACHE_PATH is None)")
+        return
+    
+    if args.command == "compact":
+        before = store.stats()["file_bytes"]
+        deleted = store.compact(
+            max_entries=args.max_entries,
+            keep_model=None if args.all_models else args.keep_model,
+        )
+        print(f"✓ Deleted {deleted} vectors ({before} -> {store.stats()['file_bytes']} bytes)")
+    elif args.command == "export":
+        store.export(args.path)
+        print(f"✓ Exported {len(store)} vectors to {args.path}")
+    elif args.command == "import":
+        added = store.import_from(args.path)
+        print(f"✓ Imported {added} new vectors from {args.path}")
+    
+    stats = store.stats()
+    print(f"Cache: {stats['path']}")
+    print(f"Entries: {stats['entries']} ({stats['file_bytes']} bytes)")
+    for model, count in stats["by_model"].items():
+        print(f"  - {model}: {count}")
+
+
+if __name__ == "__main__":
+    main()
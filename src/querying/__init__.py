@@ -1,6 +1,6 @@
 """Query endpoints module."""
 
-from .models import QueryRequest, QueryResponse, SourceResponse, AgentResponseModel
+from .models import QueryRequest, QueryResponse, SourceResponse, AgentResponseModel, EvaluationResponse
 from .routes import setup_query_routes
 
 __all__ = [
@@ -8,6 +8,7 @@ __all__ = [
     "QueryResponse",
     "SourceResponse",
     "AgentResponseModel",
+    "EvaluationResponse",
     "setup_query_routes",
 ]
 
@@ -2,26 +2,30 @@
 
 import os
 from abc import ABC
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
 from dotenv import load_dotenv
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables.config import run_in_executor
 from langfuse import observe
-from langfuse.langchain import CallbackHandler
 
 # Load environment variables
 load_dotenv()
 
-from typing import Optional, Union
-from langchain_chroma import Chroma
-from langchain_community.vectorstores import FAISS
+from typing import TYPE_CHECKING, Optional, Union, Tuple
 
 from config import LLM_MODEL, MIN_SIMILARITY, DEFAULT_K
 from indexing.embeddings import load_vector_store
 from querying.tools.rag_tool import get_rag_tools_for_agent
-from utils.llm import initialize_llm
+from querying.tools.vector_store_manager import similarity_search_by_vector_with_score
+from utils.llm import initialize_llm, get_langfuse_handler
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_community.vectorstores import FAISS
 
 
 @dataclass
@@ -42,7 +46,7 @@ class BaseAgent(ABC):
         handbook_name: str,
         description: str,
         llm_model: str = None,
-        vector_store: Optional[Union[Chroma, FAISS]] = None,
+        vector_store: Optional[Union["Chroma", "FAISS"]] = None,
     ):
         """
         Initialize the agent.
@@ -59,9 +63,8 @@ class BaseAgent(ABC):
         self.description = description
         self.llm_model = llm_model or LLM_MODEL
         
-        # Initialize Langfuse callback handler
-        # CallbackHandler reads from environment variables automatically
-        self.langfuse_handler = CallbackHandler()
+        # Shared Langfuse callback handler (reads from environment variables)
+        self.langfuse_handler = get_langfuse_handler()
         
         # Initialize LLM
         self._initialize_llm()
@@ -128,7 +131,8 @@ Answer the user's question based ONLY on the retrieved context above. If the con
         self, 
         query: str, 
         k: int = DEFAULT_K,
-        min_similarity: float = MIN_SIMILARITY
+        min_similarity: float = MIN_SIMILARITY,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant context from the vector store.
@@ -144,6 +148,8 @@ Answer the user's question based ONLY on the retrieved context above. If the con
             k: Number of documents to retrieve (final count after filtering)
             min_similarity: Minimum similarity threshold (0.0 to 1.0). 
                           Defaults to config MIN_SIMILARITY.
+            query_embedding: Precomputed query embedding shared across agents.
+                           If None, the vector store embeds the query itself.
             
         Returns:
             List of retrieved documents with metadata, filtered and deduplicated
@@ -152,8 +158,30 @@ Answer the user's question based ONLY on the retrieved context above. If the con
         vector_store = self._load_vector_store()
         
         # Retrieve k*2 documents (same as RAG tool)
-        docs = vector_store.similarity_search_with_score(query, k=k * 2)
+        if query_embedding is not None:
+            docs = similarity_search_by_vector_with_score(vector_store, query_embedding, k=k * 2)
+        else:
+            docs = vector_store.similarity_search_with_score(query, k=k * 2)
         
+        return self._filter_search_results(docs, k=k, min_similarity=min_similarity)
+    
+    def _filter_search_results(
+        self,
+        docs: List[Tuple[Document, float]],
+        k: int = DEFAULT_K,
+        min_similarity: float = MIN_SIMILARITY,
+    ) -> List[Dict[str, Any]]:
+        """
+        Filter raw (document, distance) search results into context documents.
+        
+        Args:
+            docs: Search results, nearest first
+            k: Number of documents to keep
+            min_similarity: Minimum similarity threshold (0.0 to 1.0)
+            
+        Returns:
+            List of retrieved documents with metadata, filtered and deduplicated
+        """
         # Filter, deduplicate, and return top k (same logic as RAG tool)
         context_docs = []
         seen_content = set()
@@ -178,6 +206,80 @@ Answer the user's question based ONLY on the retrieved context above. If the con
         
         return context_docs
     
+    async def _aretrieve_context(
+        self,
+        query: str,
+        k: int = DEFAULT_K,
+        min_similarity: float = MIN_SIMILARITY,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of `_retrieve_context`.
+        
+        The vector store search runs in the default executor so the event loop
+        stays free while it runs.
+        """
+        return await run_in_executor(
+            None,
+            self._retrieve_context,
+            query,
+            k,
+            min_similarity,
+            query_embedding,
+        )
+    
+    def _format_history(self, conversation_history: Optional[List[Dict[str, str]]]) -> str:
+        """Format the last 5 conversation messages for the prompt."""
+        if not conversation_history:
+            return "None"
+        return "\n".join([
+            f"{msg['role'].title()}: {msg['content']}"
+            for msg in conversation_history[-5:]  # Last 5 messages
+        ])
+    
+    def _format_context(self, context_docs: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Format retrieved documents for the LLM and as response sources.
+        
+        Args:
+            context_docs: Documents returned by `_retrieve_context`
+            
+        Returns:
+            Tuple of (context text for the prompt, sources list)
+        """
+        # Format context for LLM (same format as RAG tool)
+        if not context_docs:
+            retrieved_context = f"No relevant information found in {self.handbook_name} knowledge base."
+        else:
+            context_parts = []
+            for i, doc in enumerate(context_docs, 1):
+                context_parts.append(
+                    f"[Source {i}] (Similarity: {doc['similarity']:.2f})\n{doc['content']}"
+                )
+            retrieved_context = "\n\n".join(context_parts)
+        
+        # Use same documents for sources
+        sources = [
+            {
+                "content": doc["content"],
+                "metadata": doc["metadata"],
+                "similarity": doc["similarity"],
+                "distance": doc.get("distance"),
+            }
+            for doc in context_docs
+        ]
+        
+        return retrieved_context, sources
+    
+    def _error_response(self, error: Exception) -> AgentResponse:
+        """Response returned when processing a query fails."""
+        return AgentResponse(
+            content=f"I encountered an error while processing your query. Please try again or contact support if the issue persists.",
+            agent_name=self.name,
+            sources=[],
+            metadata={"error": str(error), "error_type": type(error).__name__},
+        )
+    
     @observe(name="agent_process_query")
     def process_query(
         self,
@@ -185,6 +287,8 @@ Answer the user's question based ONLY on the retrieved context above. If the con
         conversation_history: Optional[List[Dict[str, str]]] = None,
         k: int = DEFAULT_K,
         min_similarity: float = MIN_SIMILARITY,
+        search_results: Optional[List[Tuple[Document, float]]] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> AgentResponse:
         """
         Process a query and generate a response using LCEL chain.
@@ -194,6 +298,11 @@ Answer the user's question based ONLY on the retrieved context above. If the con
             conversation_history: Previous conversation messages [{"role": "user/assistant", "content": "..."}]
             k: Number of documents to retrieve
             min_similarity: Minimum similarity threshold (0.0 to 1.0). Defaults to config MIN_SIMILARITY.
+            search_results: Raw (document, distance) results already retrieved for this
+                           agent's handbook (e.g., from one multi-handbook search). If None,
+                           the agent searches its own vector store.
+            query_embedding: Precomputed query embedding (computed once per request by
+                           the orchestrator). If None, the query is embedded here.
             
         Returns:
             AgentResponse with answer and sources
@@ -201,39 +310,20 @@ Answer the user's question based ONLY on the retrieved context above. If the con
         # Metadata is captured automatically by @observe decorator
         
         try:
-            # Format conversation history if provided
-            if conversation_history:
-                history_context = "\n".join([
-                    f"{msg['role'].title()}: {msg['content']}"
-                    for msg in conversation_history[-5:]  # Last 5 messages
-                ])
-            else:
-                history_context = "None"
-            
-            # Single retrieval call - get documents once
-            context_docs = self._retrieve_context(query, k=k, min_similarity=min_similarity)
+            history_context = self._format_history(conversation_history)
             
-            # Format context for LLM (same format as RAG tool)
-            if not context_docs:
-                retrieved_context = f"No relevant information found in {self.handbook_name} knowledge base."
+            # Single retrieval call - get documents once (unless already retrieved)
+            if search_results is not None:
+                context_docs = self._filter_search_results(search_results, k=k, min_similarity=min_similarity)
             else:
-                context_parts = []
-                for i, doc in enumerate(context_docs, 1):
-                    context_parts.append(
-                        f"[Source {i}] (Similarity: {doc['similarity']:.2f})\n{doc['content']}"
-                    )
-                retrieved_context = "\n\n".join(context_parts)
+                context_docs = self._retrieve_context(
+                    query,
+                    k=k,
+                    min_similarity=min_similarity,
+                    query_embedding=query_embedding,
+                )
             
-            # Use same documents for sources
-            sources = [
-                {
-                    "content": doc["content"],
-                    "metadata": doc["metadata"],
-                    "similarity": doc["similarity"],
-                    "distance": doc.get("distance"),
-                }
-                for doc in context_docs
-            ]
+            retrieved_context, sources = self._format_context(context_docs)
             
             # Run LCEL chain with retrieved context
             response_content = self.rag_chain.invoke(
@@ -256,9 +346,132 @@ Answer the user's question based ONLY on the retrieved context above. If the con
             
         except Exception as e:
             # Error is automatically captured by @observe decorator
+            return self._error_response(e)
+    
+    @observe(name="agent_process_query")
+    async def aprocess_query(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        k: int = DEFAULT_K,
+        min_similarity: float = MIN_SIMILARITY,
+        search_results: Optional[List[Tuple[Document, float]]] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> AgentResponse:
+        """
+        Async variant of `process_query` that never blocks the event loop.
+        
+        Retrieval runs in the default executor and generation uses `ainvoke`,
+        so many queries can be in flight in one worker. Arguments and return
+        value are the same as `process_query`.
+        """
+        try:
+            chain_inputs, sources = await self._aprepare_chain_inputs(
+                query,
+                conversation_history,
+                k=k,
+                min_similarity=min_similarity,
+                search_results=search_results,
+                query_embedding=query_embedding,
+            )
+            
+            response_content = await self.rag_chain.ainvoke(
+                chain_inputs,
+                config={"callbacks": [self.langfuse_handler]}
+            )
+            
             return AgentResponse(
-                content=f"I encountered an error while processing your query. Please try again or contact support if the issue persists.",
+                content=response_content,
+                agent_name=self.name,
+                sources=sources,
+                metadata={"success": True},
+            )
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def _aprepare_chain_inputs(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        k: int = DEFAULT_K,
+        min_similarity: float = MIN_SIMILARITY,
+        search_results: Optional[List[Tuple[Document, float]]] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+        """
+        Retrieve context and build the RAG chain inputs.
+        
+        Returns:
+            Tuple of (chain inputs, sources)
+        """
+        history_context = self._format_history(conversation_history)
+        
+        if search_results is not None:
+            context_docs = self._filter_search_results(search_results, k=k, min_similarity=min_similarity)
+        else:
+            context_docs = await self._aretrieve_context(
+                query,
+                k=k,
+                min_similarity=min_similarity,
+                query_embedding=query_embedding,
+            )
+        
+        retrieved_context, sources = self._format_context(context_docs)
+        
+        chain_inputs = {
+            "query": query,
+            "context": retrieved_context,
+            "conversation_history": history_context,
+        }
+        return chain_inputs, sources
+    
+    async def astream_query(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        k: int = DEFAULT_K,
+        min_similarity: float = MIN_SIMILARITY,
+        search_results: Optional[List[Tuple[Document, float]]] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the answer to a query as it is generated.
+        
+        Arguments are the same as `process_query`. Yields events:
+        - {"event": "sources", "agent": name, "sources": [...]} once retrieval is done
+        - {"event": "token", "agent": name, "content": "..."} per generated chunk
+        - {"event": "agent_done", "agent": name, "response": AgentResponse} last
+        
+        Errors are reported through the final AgentResponse (as in `process_query`).
+        """
+        try:
+            chain_inputs, sources = await self._aprepare_chain_inputs(
+                query,
+                conversation_history,
+                k=k,
+                min_similarity=min_similarity,
+                search_results=search_results,
+                query_embedding=query_embedding,
+            )
+            yield {"event": "sources", "agent": self.name, "sources": sources}
+            
+            chunks = []
+            async for chunk in self.rag_chain.astream(
+                chain_inputs,
+                config={"callbacks": [self.langfuse_handler]}
+            ):
+                if chunk:
+                    chunks.append(chunk)
+                    yield {"event": "token", "agent": self.name, "content": chunk}
+            
+            response = AgentResponse(
+                content="".join(chunks),
                 agent_name=self.name,
-                sources=[],
-                metadata={"error": str(e), "error_type": type(e).__name__},
+                sources=sources,
+                metadata={"success": True},
             )
+        except Exception as e:
+            response = self._error_response(e)
+            
+        yield {"event": "agent_done", "agent": self.name, "response": response}
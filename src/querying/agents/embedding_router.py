@@ -0,0 +1,153 @@
+"""
+Embedding-based router that picks an agent without an LLM call.
+
+Each agent is represented by the embeddings of its handbook's chunks. A query
+is scored against every handbook (mean cosine similarity of its top-m chunks),
+and when one handbook wins by a clear margin the query is routed there
+directly. Ambiguous queries return None so the caller can fall back to the
+LLM-based multi-agent detection.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import (
+    EMBEDDING_ROUTER_TOP_M,
+    EMBEDDING_ROUTER_MARGIN,
+    EMBEDDING_ROUTER_MIN_SIMILARITY,
+)
+from querying.tools.vector_store_manager import VectorStoreManager, get_store_embeddings
+
+
+class EmbeddingRouter:
+    """Routes queries by similarity to each agent's handbook chunks."""
+    
+    def __init__(
+        self,
+        vector_store_manager: VectorStoreManager,
+        agent_handbooks: Dict[str, str],
+        top_m: int = EMBEDDING_ROUTER_TOP_M,
+        margin: float = EMBEDDING_ROUTER_MARGIN,
+        min_similarity: float = EMBEDDING_ROUTER_MIN_SIMILARITY,
+    ):
+        """
+        Initialize the router and load per-agent chunk embeddings.
+        
+        Args:
+            vector_store_manager: Manager holding the preloaded vector stores
+            agent_handbooks: Mapping of agent name to handbook name
+            top_m: Number of best-matching chunks averaged per handbook
+            margin: Minimum score gap between the best and second-best agent
+                    for the router to decide without the LLM
+            min_similarity: Minimum score of the best agent for a decision
+        """
+        self.top_m = top_m
+        self.margin = margin
+        self.min_similarity = min_similarity
+        
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._load_embeddings(vector_store_manager, agent_handbooks)
+        
+        self._stats_lock = threading.Lock()
+        self.decided = 0
+        self.deferred = 0
+    
+    def _load_embeddings(self, vector_store_manager: VectorStoreManager, agent_handbooks: Dict[str, str]):
+        """Read and L2-normalize every handbook's chunk embeddings."""
+        for agent_name, handbook_name in agent_handbooks.items():
+            store = vector_store_manager.get_store(handbook_name)
+            if store is None:
+                continue
+            try:
+                matrix = get_store_embeddings(store)
+            except Exception as e:
+                print(f"Warning: Could not load embeddings for routing to {agent_name}: {e}")
+                continue
+            if matrix.shape[0] == 0:
+                continue
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            if np.allclose(norms, 1.0, atol=1e-4):
+                # Already normalized (e.g., NumPy stores): keep the memory-mapped matrix rather than a copy
+                self._matrices[agent_name] = matrix
+                continue
+            norms[norms == 0.0] = 1.0
+            self._matrices[agent_name] = (matrix / norms).astype(np.float32)
+    
+    @property
+    def ready(self) -> bool:
+        """Whether at least two agents can be compared."""
+        return len(self._matrices) >= 2
+    
+    def score(self, query_embedding: List[float]) -> Dict[str, float]:
+        """
+        Score a query against every agent.
+        
+        Args:
+            query_embedding: Query embedding
+        
+        Returns:
+            Dict mapping agent name to the mean cosine similarity of its top-m chunks
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0.0:
+            query = query / norm
+        
+        scores = {}
+        for agent_name, matrix in self._matrices.items():
+            similarities = matrix @ query
+            m = min(self.top_m, similarities.shape[0])
+            top = np.partition(similarities, similarities.shape[0] - m)[-m:]
+            scores[agent_name] = float(top.mean())
+        return scores
+    
+    def route(self, query_embedding: List[float]) -> Optional[Dict]:
+        """
+        Route a query if one agent wins by a clear margin.
+        
+        Args:
+            query_embedding: Query embedding
+        
+        Returns:
+            Detection result in the same shape as `Orchestrator._detect_multi_agent`,
+            or None if the decision is ambiguous and the LLM should decide.
+        """
+        if not self.ready:
+            return None
+        
+        scores = self.score(query_embedding)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (best_agent, best_score), (_, second_score) = ranked[0], ranked[1]
+        margin = best_score - second_score
+        
+        if best_score < self.min_similarity or margin < self.margin:
+            with self._stats_lock:
+                self.deferred += 1
+            return None
+        
+        with self._stats_lock:
+            self.decided += 1
+        
+        return {
+            "requires_multiple_agents": False,
+            "agents": [best_agent],
+            "requires_sequential": False,
+            "reasoning": f"Embedding router: {best_agent} leads by {margin:.3f} (score {best_score:.3f})",
+            "router": "embedding",
+            "router_scores": {name: round(value, 4) for name, value in ranked},
+        }
+    
+    def stats(self) -> Dict:
+        """Counts of queries decided by embeddings vs deferred to the LLM."""
+        with self._stats_lock:
+            total = self.decided + self.deferred
+            return {
+                "decided": self.decided,
+                "deferred_to_llm": self.deferred,
+                "decided_rate": self.decided / total if total else 0.0,
+                "margin": self.margin,
+                "min_similarity": self.min_similarity,
+                "top_m": self.top_m,
+            }
@@ -1,32 +1,83 @@
 """
 Orchestrator for routing queries to specialist agents.
 
-The orchestrator uses an LLM to determine which specialist agent should handle
-a given query, supports multi-agent processing, and manages context bundling
-for continuous conversations.
+The orchestrator uses an embedding router for clear-cut queries and an LLM to
+determine which specialist agent(s) should handle everything else, supports
+multi-agent processing, and manages context bundling for continuous
+conversations.
 """
 
 import os
 import asyncio
-from typing import Dict, Optional, List, Union
-from dataclasses import dataclass, field
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple, Union
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
 from langfuse import Langfuse, observe, get_client
-from langfuse.langchain import CallbackHandler
 
 # Load environment variables
 load_dotenv()
 
-from config import LLM_MODEL, DEFAULT_K
+from config import (
+    LLM_MODEL,
+    DEFAULT_K,
+    ROUTING_STRATEGY,
+    ROUTING_CACHE_ENABLED,
+    ROUTING_CACHE_MAX_DISTANCE,
+    ROUTING_CACHE_TTL_SECONDS,
+    ROUTING_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_DISTANCE,
+    RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    VECTOR_STORE_PATH,
+    INDEX_WATCH_INTERVAL_SECONDS,
+    EVALUATION_MODE,
+    EVALUATION_SAMPLE_RATE,
+    EVALUATION_QUEUE_MAX_SIZE,
+    EVALUATION_WORKERS,
+    EVALUATION_FLUSH_INTERVAL_SECONDS,
+    EVALUATION_FLUSH_BATCH_SIZE,
+    SPECULATIVE_RETRIEVAL,
+    SPECULATIVE_RETRIEVAL_K,
+    SINGLE_FLIGHT_ENABLED,
+    SHARED_INDEX_ENABLED,
+    SHARED_INDEX_PATH,
+    INDEX_VERSIONS_TO_KEEP,
+    UNIFIED_INDEX,
+    UNIFIED_INDEX_NAME,
+)
 from querying.agents.specialist_agents import create_agent, BaseAgent
 from querying.agents.base_agent import AgentResponse
+from querying.agents.embedding_router import EmbeddingRouter
+from querying.cache import SemanticCache, ResponseCache, SingleFlight
+from querying.session_store import ConversationContext, SessionLocks, create_session_store
 from querying.tools.vector_store_manager import VectorStoreManager
-from utils.llm import initialize_llm
+from indexing.embeddings import get_query_embedding_cache, get_query_embedding_batcher
+from indexing.embedding_cache import normalize_query
+from indexing.shared_index import publish_shared_index, prune_shared_indexes
+from utils.llm import initialize_llm, get_langfuse_handler, get_client_registry
+from utils.startup import StartupProfile
+from utils.storage import read_index_version, resolve_index_dir
 from evaluation.langfuse_evaluator import LangfuseEvaluator
+from evaluation.evaluation_queue import EvaluationQueue
+
+
+# Response metadata that belongs to the request that computed an answer and
+# is not carried over when the answer is reused
+PER_REQUEST_METADATA = frozenset({"evaluation_id", "timings", "session_id", "conversation_length"})
 
 
 class RoutingMode(Enum):
@@ -36,26 +87,6 @@ class RoutingMode(Enum):
     MULTI_SEQUENTIAL = "multi_sequential"
 
 
-@dataclass
-class ConversationContext:
-    """Context for maintaining conversation continuity."""
-    session_id: str
-    messages: List[Dict[str, str]] = field(default_factory=list)
-    agent_history: List[str] = field(default_factory=list)  # Which agents handled queries
-    last_agent: Optional[str] = None
-    
-    def add_message(self, role: str, content: str):
-        """Add a message to conversation history."""
-        self.messages.append({"role": role, "content": content})
-        # Keep last 20 messages for context
-        if len(self.messages) > 20:
-            self.messages = self.messages[-20:]
-    
-    def get_recent_history(self, limit: int = 10) -> List[Dict[str, str]]:
-        """Get recent conversation history."""
-        return self.messages[-limit:]
-
-
 @dataclass
 class AgentConfig:
     """Configuration for a specialist agent."""
@@ -120,6 +151,16 @@ class AgentRegistry:
             )
         return "\n".join(descriptions)
 
+    @classmethod
+    def fingerprint(cls) -> str:
+        """Hash of the registered agents; changes whenever AGENTS is edited."""
+        digest = hashlib.sha256()
+        for agent_name, agent_config in sorted(cls.AGENTS.items()):
+            digest.update(
+                f"{agent_name}\0{agent_config.description}\0{agent_config.handbook_name}\n".encode("utf-8")
+            )
+        return digest.hexdigest()
+
 
 @dataclass
 class OrchestratorResponse:
@@ -131,6 +172,120 @@ class OrchestratorResponse:
     metadata: Dict = field(default_factory=dict)
 
 
+class IndexGeneration:
+    """
+    One loaded index version: its vector stores, the embedding router built
+    from them and the agents searching them.
+    
+    Requests hold a generation for their whole duration (see
+    `Orchestrator._pin_index`). Once a newer generation replaces it, the
+    generation is retired and its stores are closed when the last request
+    using it completes.
+    """
+    
+    def __init__(
+        self,
+        version: Optional[str],
+        vector_store_manager: VectorStoreManager,
+        embedding_router: Optional[EmbeddingRouter] = None,
+    ):
+        self.version = version
+        self.vector_store_manager = vector_store_manager
+        self.embedding_router = embedding_router
+        self.agent_instances: Dict[str, BaseAgent] = {}
+        self._lock = threading.Lock()
+        self._active_requests = 0
+        self._retired = False
+    
+    def acquire(self) -> bool:
+        """
+        Register a request served by this generation.
+        
+        Returns:
+            False if the generation has been retired (the request must use the newer one).
+        """
+        with self._lock:
+            if self._retired:
+                return False
+            self._active_requests += 1
+            return True
+    
+    def release(self):
+        """Unregister a request, closing the generation if it was the last one of a retired generation."""
+        with self._lock:
+            self._active_requests -= 1
+            close = self._retired and self._active_requests == 0
+        if close:
+            self.vector_store_manager.close()
+    
+    def retire(self):
+        """Mark the generation as replaced, closing it now if no request is using it."""
+        with self._lock:
+            self._retired = True
+            close = self._active_requests == 0
+        if close:
+            self.vector_store_manager.close()
+
+
+# Index generation pinned by the request being processed (inherited by the tasks it starts)
+_request_index: ContextVar[Optional[IndexGeneration]] = ContextVar("request_index", default=None)
+
+
+def _pinned_index(method):
+    """Run an Orchestrator coroutine or async generator method on one index generation."""
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def generator_wrapper(self, *args, **kwargs):
+            with self._pin_index():
+                async for item in method(self, *args, **kwargs):
+                    yield item
+        return generator_wrapper
+    
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with self._pin_index():
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+def _one_turn_per_session(method):
+    """
+    Run an Orchestrator coroutine or async generator method under its session's turn lock.
+    
+    Turns of one session read and append to the same conversation history,
+    so they run in arrival order; other sessions are unaffected.
+    """
+    signature = inspect.signature(method)
+    
+    def session_of(self, args, kwargs) -> str:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        return bound.arguments["session_id"]
+    
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def generator_wrapper(self, *args, **kwargs):
+            async with self.session_locks.hold(session_of(self, args, kwargs)):
+                async for item in method(self, *args, **kwargs):
+                    yield item
+        return generator_wrapper
+    
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with self.session_locks.hold(session_of(self, args, kwargs)) as waited:
+            response = await method(self, *args, **kwargs)
+        # The response (and its metadata) may also be held by the response cache,
+        # so this request's wait is recorded on a copy
+        return replace(response, metadata={
+            **response.metadata,
+            "timings": {
+                **response.metadata.get("timings", {}),
+                "session_wait_ms": round(waited * 1000, 1),
+            },
+        })
+    return wrapper
+
+
 class Orchestrator:
     """
     Orchestrator that routes queries to appropriate specialist agents.
@@ -143,14 +298,27 @@ class Orchestrator:
     - Langfuse instrumentation
     """
     
-    def __init__(self, llm_model: str = None):
+    def __init__(
+        self,
+        llm_model: str = None,
+        evaluation_mode: str = None,
+        startup_profile: Optional[StartupProfile] = None,
+    ):
         """
         Initialize the orchestrator.
         
         Args:
             llm_model: LLM model to use for routing. Defaults to config LLM_MODEL.
+            evaluation_mode: "background", "inline" or "off". Defaults to config
+                           EVALUATION_MODE. Inline mode returns the quality score
+                           with the response (e.g., for golden dataset tests).
+            startup_profile: Profile to record the init time of each component in.
         """
+        profile = startup_profile or StartupProfile()
+        profile.restart()
+        self.startup_profile = profile
         self.llm_model = llm_model or LLM_MODEL
+        self.evaluation_mode = evaluation_mode or EVALUATION_MODE
         self.agent_registry = AgentRegistry()
         
         # Initialize Langfuse from environment variables only
@@ -160,9 +328,9 @@ class Orchestrator:
             host=os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com"),
         )
         
-        # Initialize Langfuse callback handler for LangChain
-        # CallbackHandler reads from environment variables automatically
-        self.langfuse_handler = CallbackHandler()
+        # Shared Langfuse callback handler for LangChain (reads from environment variables)
+        self.langfuse_handler = get_langfuse_handler()
+        profile.lap("langfuse")
         
         # Initialize LLM
         self._initialize_llm()
@@ -172,27 +340,238 @@ class Orchestrator:
         
         # Create LCEL chains for routing and multi-agent detection
         self._create_chains()
+        profile.lap("routing_llm")
+        
+        # Preload all vector stores of the current index version at startup
+        # (reload_index swaps in newer versions without a restart)
+        self._reload_lock = threading.Lock()
+        self.index_reloads = 0
+        self._index = self._load_index(profile)
         
-        # Preload all vector stores at startup
+        # Semantic caches for routing decisions of near-identical queries
+        self.detection_cache = None
+        self.routing_cache = None
+        if ROUTING_CACHE_ENABLED:
+            self.detection_cache = SemanticCache(
+                max_entries=ROUTING_CACHE_MAX_ENTRIES,
+                ttl_seconds=ROUTING_CACHE_TTL_SECONDS,
+                max_distance=ROUTING_CACHE_MAX_DISTANCE,
+            )
+            self.routing_cache = SemanticCache(
+                max_entries=ROUTING_CACHE_MAX_ENTRIES,
+                ttl_seconds=ROUTING_CACHE_TTL_SECONDS,
+                max_distance=ROUTING_CACHE_MAX_DISTANCE,
+            )
+        
+        # Identical context-free queries in flight at the same time share one computation
+        self.single_flight = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
+        
+        # Optional cache of complete answers to near-identical, context-free questions
+        self.response_cache = None
+        if RESPONSE_CACHE_ENABLED:
+            self.response_cache = ResponseCache(
+                VECTOR_STORE_PATH,
+                max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+                max_distance=RESPONSE_CACHE_MAX_DISTANCE,
+                max_bytes=RESPONSE_CACHE_MAX_BYTES,
+            )
+            self.response_cache.set_index_version(self._index.version)
+        profile.lap("caches")
+        
+        # Initialize Langfuse evaluator for automatic quality scoring
+        self.evaluator = LangfuseEvaluator(llm_model=self.llm_model)
+        
+        # Background evaluation keeps the judge LLM call off the request path
+        self.evaluation_queue = None
+        if self.evaluation_mode == "background":
+            self.evaluation_queue = EvaluationQueue(
+                self.evaluator,
+                sample_rate=EVALUATION_SAMPLE_RATE,
+                max_size=EVALUATION_QUEUE_MAX_SIZE,
+                workers=EVALUATION_WORKERS,
+                flush_interval_seconds=EVALUATION_FLUSH_INTERVAL_SECONDS,
+                flush_batch_size=EVALUATION_FLUSH_BATCH_SIZE,
+            )
+        profile.lap("evaluator")
+        
+        # Conversation contexts (session-based), bounded by count and idle time
+        self.session_store = create_session_store()
+        # Turns of one session run one at a time; sessions run concurrently
+        self.session_locks = SessionLocks()
+    
+    def _load_index(self, profile: Optional[StartupProfile] = None) -> IndexGeneration:
+        """Load the current index version: every vector store and the embedding router."""
+        profile = profile or StartupProfile()
+        index_dir, version = resolve_index_dir(VECTOR_STORE_PATH)
         handbook_names = [
             config.handbook_name 
             for config in self.agent_registry.AGENTS.values()
         ]
-        self.vector_store_manager = VectorStoreManager(handbook_names)
+        vector_store_type = None
+        if SHARED_INDEX_ENABLED:
+            index_dir, vector_store_type = self._attach_shared_index(index_dir, version, handbook_names)
+            profile.lap("shared_index")
+        vector_store_manager = VectorStoreManager(
+            handbook_names,
+            base_persist_directory=index_dir,
+            version=version,
+            vector_store_type=vector_store_type,
+        )
+        profile.lap("vector_stores")
         
-        # Initialize Langfuse evaluator for automatic quality scoring
-        self.evaluator = LangfuseEvaluator(llm_model=self.llm_model)
+        # Embedding router decides clear-cut queries without a routing LLM call
+        embedding_router = None
+        if ROUTING_STRATEGY == "hybrid":
+            embedding_router = EmbeddingRouter(
+                vector_store_manager,
+                {name: config.handbook_name for name, config in self.agent_registry.AGENTS.items()},
+            )
+        profile.lap("embedding_router")
+        
+        return IndexGeneration(version, vector_store_manager, embedding_router)
+    
+    def _attach_shared_index(
+        self,
+        index_dir: Path,
+        version: Optional[str],
+        handbook_names: List[str],
+    ) -> Tuple[Path, Optional[str]]:
+        """
+        Publish (first worker on the host) or attach to the shared-memory copy of an index version.
+        
+        Returns:
+            (directory to load the stores from, backend to load them with)
+        """
+        store_names = [UNIFIED_INDEX_NAME] if UNIFIED_INDEX else handbook_names
+        try:
+            shared_dir = publish_shared_index(index_dir, version, SHARED_INDEX_PATH, store_names=store_names)
+        except Exception as e:
+            print(f"Warning: Could not use the shared index ({e}); loading a private copy")
+            return index_dir, None
+        prune_shared_indexes(SHARED_INDEX_PATH, INDEX_VERSIONS_TO_KEEP, current=shared_dir.name)
+        return shared_dir, "numpy"
+    
+    @property
+    def index(self) -> IndexGeneration:
+        """Index generation of the request being processed (the latest one outside requests)."""
+        return _request_index.get() or self._index
+    
+    @property
+    def vector_store_manager(self) -> VectorStoreManager:
+        """Vector stores of the current index generation."""
+        return self.index.vector_store_manager
+    
+    @property
+    def embedding_router(self) -> Optional[EmbeddingRouter]:
+        """Embedding router of the current index generation."""
+        return self.index.embedding_router
+    
+    @contextmanager
+    def _pin_index(self):
+        """
+        Serve a request, including the tasks it starts, from one index generation.
+        
+        Queries in flight during a swap finish on the generation they started on.
+        """
+        pinned = _request_index.get()
+        if pinned is not None:
+            # Already pinned by the request this call belongs to
+            yield pinned
+            return
+        
+        # A reload may swap and retire the generation between reading and
+        # acquiring it; a retired generation refuses new requests, so re-read
+        while True:
+            generation = self._index
+            if generation.acquire():
+                break
+        token = _request_index.set(generation)
+        try:
+            yield generation
+        finally:
+            try:
+                _request_index.reset(token)
+            except ValueError:
+                # Closed from another context (e.g., an abandoned stream finalized by the event loop)
+                pass
+            generation.release()
+    
+    def reload_index(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Load the current index version and swap it in if it is new.
         
-        # Agent instances cache (lazy loading)
-        self._agent_instances: Dict[str, BaseAgent] = {}
+        The new stores, embedding router and agents are fully loaded before a
+        single reference swap makes them visible, so requests are never
+        dropped or served from a half-loaded index. The previous generation is
+        closed once the requests still using it complete. A version that loads
+        fewer stores than the one being served is not swapped in.
         
-        # Conversation contexts (session-based)
-        self._conversation_contexts: Dict[str, ConversationContext] = {}
+        Args:
+            force: Reload even if the version has not changed.
+        
+        Returns:
+            Dict with "status" ("swapped", "unchanged" or "rejected"), "version",
+            "previous_version" and "load_ms".
+        """
+        with self._reload_lock:
+            current = self._index
+            _, version = resolve_index_dir(VECTOR_STORE_PATH)
+            if version == current.version and not force:
+                return {"status": "unchanged", "version": version, "previous_version": current.version, "load_ms": 0.0}
+            
+            start = time.perf_counter()
+            generation = self._load_index()
+            for agent_name in self.agent_registry.AGENTS:
+                self._get_agent_instance(agent_name, generation)
+            load_ms = round((time.perf_counter() - start) * 1000, 1)
+            
+            loaded = len(generation.vector_store_manager.list_loaded_stores())
+            if loaded < len(current.vector_store_manager.list_loaded_stores()):
+                print(f"✗ Index version {generation.version} loaded only {loaded} stores; keeping {current.version}")
+                generation.retire()
+                return {"status": "rejected", "version": generation.version, "previous_version": current.version, "load_ms": load_ms}
+            
+            # Atomic pointer swap: new requests use the new generation from here on
+            self._index = generation
+            self.index_reloads += 1
+            if self.response_cache is not None:
+                self.response_cache.set_index_version(generation.version)
+            current.retire()
+            print(f"✓ Swapped index version {current.version} -> {generation.version} ({load_ms:.0f} ms)")
+            return {"status": "swapped", "version": generation.version, "previous_version": current.version, "load_ms": load_ms}
+    
+    async def areload_index(self, force: bool = False) -> Dict[str, Any]:
+        """Async variant of `reload_index` (loads in a worker thread)."""
+        return await asyncio.to_thread(self.reload_index, force)
+    
+    async def watch_index(self, interval_seconds: Optional[float] = None):
+        """
+        Reload the index whenever a build publishes a new version.
+        
+        Polls the version pointer (a small file read) every `interval_seconds`.
+        Runs until cancelled; returns immediately if watching is disabled.
+        
+        Args:
+            interval_seconds: Polling interval. Defaults to config INDEX_WATCH_INTERVAL_SECONDS
+                              (None or a non-positive interval disables watching).
+        """
+        if interval_seconds is None:
+            interval_seconds = INDEX_WATCH_INTERVAL_SECONDS
+        if interval_seconds is None or interval_seconds <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                if read_index_version(VECTOR_STORE_PATH) != self._index.version:
+                    await self.areload_index()
+            except Exception as e:
+                print(f"Warning: Index reload failed: {e}")
     
     def _initialize_llm(self):
         """Initialize the LLM with Langfuse instrumentation."""
         self.llm = initialize_llm(
-                model=self.llm_model,
+            model=self.llm_model,
             langfuse_handler=self.langfuse_handler
         )
     
@@ -300,40 +679,118 @@ Examples:
             | JsonOutputParser()
         )
     
-    def _get_agent_instance(self, agent_name: str) -> BaseAgent:
-        """Get or create an agent instance (lazy loading)."""
-        if agent_name not in self._agent_instances:
+    def _get_agent_instance(self, agent_name: str, generation: Optional[IndexGeneration] = None) -> BaseAgent:
+        """Get or create an agent instance of an index generation (lazy loading)."""
+        generation = generation or self.index
+        if agent_name not in generation.agent_instances:
             # Get preloaded vector store for this agent
             agent_config = self.agent_registry.get_agent(agent_name)
             if agent_config:
-                vector_store = self.vector_store_manager.get_store(agent_config.handbook_name)
+                vector_store = generation.vector_store_manager.get_store(agent_config.handbook_name)
             else:
                 vector_store = None
             
-            self._agent_instances[agent_name] = create_agent(
+            generation.agent_instances[agent_name] = create_agent(
                 agent_name, 
                 self.llm_model,
                 vector_store=vector_store
             )
-        return self._agent_instances[agent_name]
+        return generation.agent_instances[agent_name]
     
-    def _get_conversation_context(self, session_id: str) -> ConversationContext:
+    def warm_up(self):
+        """Create every agent (and its LLM client) now instead of on its first query."""
+        self.startup_profile.restart()
+        for agent_name in self.agent_registry.AGENTS:
+            self._get_agent_instance(agent_name)
+        self.startup_profile.lap("agents")
+    
+    async def _aget_conversation_context(self, session_id: str) -> ConversationContext:
         """Get or create conversation context for a session."""
-        if session_id not in self._conversation_contexts:
-            self._conversation_contexts[session_id] = ConversationContext(session_id=session_id)
-        return self._conversation_contexts[session_id]
+        return await self.session_store.aget_or_create(session_id)
+    
+    def _single_flight_key(self, query: str, min_similarity: float) -> Tuple:
+        """Identity of a context-free query for single-flight coalescing."""
+        return normalize_query(query), min_similarity, self.index.version
+    
+    def _get_cached_routing(self, cache: Optional[SemanticCache], query_embedding: Optional[List[float]]):
+        """Look up a routing decision for a near-identical earlier query."""
+        if cache is None or query_embedding is None:
+            return None
+        # Decisions made against a different set of agents are dropped
+        cache.set_version(self.agent_registry.fingerprint())
+        return cache.get(query_embedding)
+    
+    def _validate_detection(self, result: Dict, query_embedding: Optional[List[float]] = None) -> Dict:
+        """
+        Validate the multi-agent detection chain output and cache the decision.
+        
+        Args:
+            result: Parsed JSON from the detection chain
+            query_embedding: Query embedding the decision is cached under
+            
+        Returns:
+            Dict with requires_multiple_agents, agents, requires_sequential, and reasoning
+        """
+        # Validate agent names
+        valid_agents = []
+        for agent_name in result.get("agents", []):
+            agent_name = agent_name.lower()
+            if agent_name in self.agent_registry.AGENTS:
+                valid_agents.append(agent_name)
+            elif agent_name == "general":
+                valid_agents.append("general_knowledge")
+        
+        if not valid_agents:
+            # Fallback to general_knowledge
+            valid_agents = ["general_knowledge"]
+        
+        result["agents"] = valid_agents
+        result["requires_multiple_agents"] = len(valid_agents) > 1
+        
+        # Ensure requires_sequential is set (default to False if not present)
+        if "requires_sequential" not in result:
+            result["requires_sequential"] = False
+        
+        # If single agent, sequential doesn't apply
+        if not result["requires_multiple_agents"]:
+            result["requires_sequential"] = False
+        
+        if self.detection_cache is not None and query_embedding is not None:
+            self.detection_cache.put(query_embedding, {
+                "requires_multiple_agents": result["requires_multiple_agents"],
+                "agents": list(valid_agents),
+                "requires_sequential": result["requires_sequential"],
+                "reasoning": result.get("reasoning", ""),
+            })
+        
+        return result
+    
+    def _detection_error(self, error: Exception) -> Dict:
+        """Fallback detection result (single general_knowledge agent) on error."""
+        return {
+            "requires_multiple_agents": False,
+            "agents": ["general_knowledge"],
+            "requires_sequential": False,
+            "reasoning": f"Error in detection: {str(error)}",
+        }
     
     @observe(name="orchestrator_detect_multi_agent")
-    def _detect_multi_agent(self, query: str) -> Dict:
+    def _detect_multi_agent(self, query: str, query_embedding: Optional[List[float]] = None) -> Dict:
         """
         Detect if a query requires multiple agents and whether they need sequential processing.
         
         Args:
             query: User query
+            query_embedding: Query embedding. If given, a decision cached for a
+                           near-identical query is reused instead of calling the LLM.
             
         Returns:
             Dict with requires_multiple_agents, agents, requires_sequential, and reasoning
         """
+        cached = self._get_cached_routing(self.detection_cache, query_embedding)
+        if cached is not None:
+            return {**cached, "cached": True}
+        
         # Use multi-agent detection chain (with JSON parser)
         # @observe decorator automatically captures function inputs/outputs
         try:
@@ -342,75 +799,97 @@ Examples:
                 config={"callbacks": [self.langfuse_handler]}
             )
             
-            # Validate agent names
-            valid_agents = []
-            for agent_name in result.get("agents", []):
-                agent_name = agent_name.lower()
-                if agent_name in self.agent_registry.AGENTS:
-                    valid_agents.append(agent_name)
-                elif agent_name == "general":
-                    valid_agents.append("general_knowledge")
-            
-            if not valid_agents:
-                # Fallback to general_knowledge
-                valid_agents = ["general_knowledge"]
-            
-            result["agents"] = valid_agents
-            result["requires_multiple_agents"] = len(valid_agents) > 1
-            
-            # Ensure requires_sequential is set (default to False if not present)
-            if "requires_sequential" not in result:
-                result["requires_sequential"] = False
-            
-            # If single agent, sequential doesn't apply
-            if not result["requires_multiple_agents"]:
-                result["requires_sequential"] = False
-            
             # @observe decorator automatically captures return value and errors
-            return result
+            return self._validate_detection(result, query_embedding)
             
         except Exception as e:
             # @observe decorator automatically captures exceptions
             # Fallback to single agent routing
-            return {
-                "requires_multiple_agents": False,
-                "agents": ["general_knowledge"],
-                "requires_sequential": False,
-                "reasoning": f"Error in detection: {str(e)}",
-            }
+            return self._detection_error(e)
+    
+    @observe(name="orchestrator_detect_multi_agent")
+    async def _adetect_multi_agent(self, query: str, query_embedding: Optional[List[float]] = None) -> Dict:
+        """Async variant of `_detect_multi_agent` using `ainvoke`."""
+        cached = self._get_cached_routing(self.detection_cache, query_embedding)
+        if cached is not None:
+            return {**cached, "cached": True}
+        
+        try:
+            result = await self.multi_agent_chain.ainvoke(
+                {"query": query},
+                config={"callbacks": [self.langfuse_handler]}
+            )
+            return self._validate_detection(result, query_embedding)
+        except Exception as e:
+            return self._detection_error(e)
+    
+    def _validate_route(self, result: str, query_embedding: Optional[List[float]] = None) -> str:
+        """
+        Normalize the routing chain output to a registered agent name and cache it.
+        
+        Args:
+            result: Raw routing chain output
+            query_embedding: Query embedding the decision is cached under
+            
+        Returns:
+            The name of the agent that should handle the query.
+        """
+        # Extract agent name from chain output (StrOutputParser returns string)
+        agent_name = str(result).strip().lower()
+        
+        # Normalize agent name
+        if agent_name == "general":
+            agent_name = "general_knowledge"
+        
+        # Validate agent name
+        if agent_name not in self.agent_registry.AGENTS:
+            agent_name = "general_knowledge"
+        
+        if self.routing_cache is not None and query_embedding is not None:
+            self.routing_cache.put(query_embedding, agent_name)
+        
+        return agent_name
     
     @observe(name="orchestrator_route_single")
-    def _route_single_agent(self, query: str) -> str:
+    def _route_single_agent(self, query: str, query_embedding: Optional[List[float]] = None) -> str:
         """
         Route a query to a single agent.
         
         Args:
             query: The customer query to route.
+            query_embedding: Query embedding. If given, a decision cached for a
+                           near-identical query is reused instead of calling the LLM.
         
         Returns:
             The name of the agent that should handle the query.
         """
         # @observe decorator automatically captures function inputs
         
+        cached = self._get_cached_routing(self.routing_cache, query_embedding)
+        if cached is not None:
+            return cached
+        
         # Use LCEL chain for routing decision
         result = self.routing_chain.invoke(
             {"query": query},
             config={"callbacks": [self.langfuse_handler]}
         )
         
-        # Extract agent name from chain output (StrOutputParser returns string)
-        agent_name = str(result).strip().lower()
-        
-        # Normalize agent name
-        if agent_name == "general":
-            agent_name = "general_knowledge"
+        # @observe decorator automatically captures return value
+        return self._validate_route(result, query_embedding)
         
-        # Validate agent name
-        if agent_name not in self.agent_registry.AGENTS:
-            agent_name = "general_knowledge"
+    @observe(name="orchestrator_route_single")
+    async def _aroute_single_agent(self, query: str, query_embedding: Optional[List[float]] = None) -> str:
+        """Async variant of `_route_single_agent` using `ainvoke`."""
+        cached = self._get_cached_routing(self.routing_cache, query_embedding)
+        if cached is not None:
+            return cached
         
-        # @observe decorator automatically captures return value
-        return agent_name
+        result = await self.routing_chain.ainvoke(
+            {"query": query},
+            config={"callbacks": [self.langfuse_handler]}
+        )
+        return self._validate_route(result, query_embedding)
     
     async def _process_agent_async(
         self,
@@ -418,19 +897,19 @@ Examples:
         query: str,
         conversation_history: List[Dict[str, str]],
         min_similarity: float = None,
+        search_results: Optional[List] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> AgentResponse:
         """Process a query with an agent asynchronously."""
         try:
             agent = self._get_agent_instance(agent_name)
-            # Run in thread pool since process_query is synchronous
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                agent.process_query,
+            response = await agent.aprocess_query(
                 query,
                 conversation_history,
-                4,  # k parameter
-                min_similarity,  # min_similarity parameter
+                k=4,
+                min_similarity=min_similarity,
+                search_results=search_results,  # pre-retrieved results (unified index)
+                query_embedding=query_embedding,  # shared across agents
             )
             return response
         except Exception as e:
@@ -442,16 +921,136 @@ Examples:
                 metadata={"error": str(e), "error_type": type(e).__name__},
             )
     
+    async def _embed_query_async(self, query: str) -> Optional[List[float]]:
+        """
+        Embed the query once per request so every agent can search by vector.
+        
+        Args:
+            query: User query
+            
+        Returns:
+            Query embedding, or None if embedding failed (agents then embed on their own)
+        """
+        try:
+            return await self.vector_store_manager.aembed_query(query)
+        except Exception as e:
+            print(f"Warning: Query embedding failed, agents will embed individually: {e}")
+            return None
+    
+    async def _search_handbooks_async(
+        self,
+        agent_names: List[str],
+        query: str,
+        k: int,
+        query_embedding: Optional[List[float]] = None,
+    ) -> Dict[str, List]:
+        """
+        Retrieve raw search results for several agents in one pass.
+        
+        Args:
+            agent_names: Agents whose handbooks should be searched
+            query: User query
+            k: Number of results per handbook
+            query_embedding: Precomputed query embedding
+            
+        Returns:
+            Dict mapping agent name to (document, distance) tuples.
+            Agents whose search failed are omitted (they search on their own).
+        """
+        handbooks = {
+            agent_name: self.agent_registry.get_agent(agent_name).handbook_name
+            for agent_name in agent_names
+            if self.agent_registry.get_agent(agent_name)
+        }
+        try:
+            loop = asyncio.get_event_loop()
+            results = await loop.run_in_executor(
+                None,
+                self.vector_store_manager.search_handbooks,
+                query,
+                list(handbooks.values()),
+                k,
+                query_embedding,
+            )
+        except Exception as e:
+            print(f"Warning: Multi-handbook search failed, agents will search individually: {e}")
+            return {}
+        
+        return {
+            agent_name: results[handbook_name]
+            for agent_name, handbook_name in handbooks.items()
+            if handbook_name in results
+        }
+    
+    async def _prefetch_search_results(
+        self,
+        agent_names: List[str],
+        query: str,
+        k: int,
+        query_embedding: Optional[List[float]] = None,
+        search_results: Optional[Dict[str, List]] = None,
+    ) -> Dict[str, List]:
+        """
+        Retrieve up front, concurrently, for every agent that has no results yet.
+        
+        Retrieval does not depend on earlier agents' answers, so a sequential
+        chain only has to wait for the slowest search instead of all of them.
+        
+        Args:
+            agent_names: Agents in the chain
+            query: User query
+            k: Number of raw results per handbook
+            query_embedding: Precomputed query embedding
+            search_results: Results already retrieved (e.g., speculatively)
+        
+        Returns:
+            Dict mapping agent name to (document, distance) tuples
+        """
+        search_results = dict(search_results or {})
+        missing = [agent_name for agent_name in agent_names if agent_name not in search_results]
+        if not missing:
+            return search_results
+        
+        if self.vector_store_manager.unified:
+            # One grouped search covers every handbook
+            batches = [missing]
+        else:
+            batches = [[agent_name] for agent_name in missing]
+        
+        for results in await asyncio.gather(*(
+            self._search_handbooks_async(batch, query, k=k, query_embedding=query_embedding)
+            for batch in batches
+        )):
+            search_results.update(results)
+        return search_results
+    
     async def _process_multi_agent_parallel(
         self,
         agent_names: List[str],
         query: str,
         conversation_history: List[Dict[str, str]],
         min_similarity: float = None,
+        query_embedding: Optional[List[float]] = None,
+        search_results: Optional[Dict[str, List]] = None,
     ) -> List[AgentResponse]:
         """Process query with multiple agents in parallel."""
+        # With the unified index, one search covers every agent's handbook
+        if search_results is None:
+            search_results = {}
+            if self.vector_store_manager.unified:
+                search_results = await self._search_handbooks_async(
+                    agent_names, query, k=4 * 2, query_embedding=query_embedding
+                )
+        
         tasks = [
-            self._process_agent_async(agent_name, query, conversation_history, min_similarity)
+            self._process_agent_async(
+                agent_name,
+                query,
+                conversation_history,
+                min_similarity,
+                search_results.get(agent_name),
+                query_embedding,
+            )
             for agent_name in agent_names
         ]
         responses = await asyncio.gather(*tasks, return_exceptions=True)
@@ -480,15 +1079,33 @@ Examples:
         query: str,
         conversation_history: List[Dict[str, str]],
         min_similarity: float = None,
+        query_embedding: Optional[List[float]] = None,
+        search_results: Optional[Dict[str, List]] = None,
     ) -> List[AgentResponse]:
-        """Process query with multiple agents sequentially with context handoff."""
+        """
+        Process query with multiple agents sequentially with context handoff.
+        
+        Retrieval for the whole chain runs concurrently before the first
+        agent generates; only generation is sequential, since each agent's
+        prompt includes the previous agents' answers.
+        """
         responses = []
         current_history = conversation_history.copy()
+        search_results = await self._prefetch_search_results(
+            agent_names, query, k=DEFAULT_K * 2, query_embedding=query_embedding, search_results=search_results
+        )
         
         for agent_name in agent_names:
             try:
                 agent = self._get_agent_instance(agent_name)
-                response = agent.process_query(query, current_history, k=DEFAULT_K, min_similarity=min_similarity)
+                response = await agent.aprocess_query(
+                    query,
+                    current_history,
+                    k=DEFAULT_K,
+                    min_similarity=min_similarity,
+                    search_results=search_results.get(agent_name),
+                    query_embedding=query_embedding,
+                )
                 responses.append(response)
                 
                 # Add response to history for next agent
@@ -541,6 +1158,8 @@ Examples:
         return "\n\n".join(bundled_parts)
     
     @observe(name="orchestrator_process_query")
+    @_one_turn_per_session
+    @_pinned_index
     async def process_query_async(
         self,
         query: str,
@@ -570,117 +1189,632 @@ Examples:
         if min_similarity is None:
             min_similarity = DEFAULT_MIN_SIMILARITY
         # Get conversation context
-        context = self._get_conversation_context(session_id)
+        context = await self._aget_conversation_context(session_id)
+        # Follow-up turns depend on the conversation so far and bypass the response cache
+        context_free = not context.messages
+        use_response_cache = self.response_cache is not None and context_free
         context.add_message("user", query)
         
+        # Identical context-free queries being processed right now share one computation
+        if context_free and self.single_flight is not None:
+            # Error fallbacks are not shared; waiting queries compute their own answer
+            response, shared = await self.single_flight.run(
+                self._single_flight_key(query, min_similarity),
+                lambda: self._aprocess_turn(query, context, min_similarity, use_response_cache),
+                shareable=ResponseCache.is_cacheable,
+            )
+            if shared:
+                return await self._areuse_cached_response(response, context, coalesced=True)
+            return response
+        
+        return await self._aprocess_turn(query, context, min_similarity, use_response_cache)
+    
+    async def _aprocess_turn(
+        self,
+        query: str,
+        context: ConversationContext,
+        min_similarity: float,
+        use_response_cache: bool,
+    ) -> OrchestratorResponse:
+        """Route, retrieve, generate and evaluate one turn (the body of `process_query_async`)."""
+        request_start = time.perf_counter()
+        timings = {}
+        
+        # Embed the query once; every agent searches with the same vector
+        query_embedding = await self._embed_query_async(query)
+        timings["embedding_ms"] = (time.perf_counter() - request_start) * 1000
+        
+        if use_response_cache and query_embedding is not None:
+            cached_response = self.response_cache.get(query_embedding, min_similarity, index_version=self.index.version)
+            if cached_response is not None:
+                timings["total_ms"] = (time.perf_counter() - request_start) * 1000
+                return await self._areuse_cached_response(cached_response, context, timings=timings)
+        
+        # Search every handbook while the routing decision is being made
+        speculative_tasks = self._start_speculative_retrieval(query, query_embedding)
+        
         # @observe decorator automatically captures function inputs/outputs and errors
         try:
             # Step 1: Detect if multi-agent is needed and processing mode
-            detection_result = self._detect_multi_agent(query)
-            requires_multi = detection_result["requires_multiple_agents"]
-            agent_names = detection_result["agents"]
-            requires_sequential = detection_result.get("requires_sequential", False)
+            stage_start = time.perf_counter()
+            detection_result, agent_names, routing_mode = await self._aresolve_routing(query, query_embedding)
+            timings["routing_ms"] = (time.perf_counter() - stage_start) * 1000
+            
+            # Keep the chosen agents' speculative results, discard the rest
+            search_results = await self._collect_speculative_retrieval(speculative_tasks, agent_names, timings)
             
             # Get conversation history
             conversation_history = context.get_recent_history()
             
             # Step 2: Process with appropriate mode (automatically determined by LLM)
-            if requires_multi and len(agent_names) > 1:
-                # Multi-agent processing - use sequential if dependencies exist, parallel otherwise
-                if requires_sequential:
-                    routing_mode = RoutingMode.MULTI_SEQUENTIAL
-                    responses = await self._process_multi_agent_sequential(
-                        agent_names, query, conversation_history, min_similarity
-                    )
-                else:
-                    routing_mode = RoutingMode.MULTI_PARALLEL
-                    responses = await self._process_multi_agent_parallel(
-                        agent_names, query, conversation_history, min_similarity
-                    )
+            stage_start = time.perf_counter()
+            if routing_mode == RoutingMode.MULTI_SEQUENTIAL:
+                responses = await self._process_multi_agent_sequential(
+                    agent_names, query, conversation_history, min_similarity, query_embedding, search_results
+                )
+            elif routing_mode == RoutingMode.MULTI_PARALLEL:
+                responses = await self._process_multi_agent_parallel(
+                    agent_names, query, conversation_history, min_similarity, query_embedding,
+                    search_results if speculative_tasks else None,
+                )
             else:
                 # Single agent processing
-                routing_mode = RoutingMode.SINGLE
-                if not agent_names:
-                    agent_name = self._route_single_agent(query)
-                else:
-                    agent_name = agent_names[0]
-                
-                agent = self._get_agent_instance(agent_name)
-                response = agent.process_query(query, conversation_history, k=DEFAULT_K, min_similarity=min_similarity)
-                responses = [response]
-                agent_names = [agent_name]
-            
-            # Step 3: Bundle responses
-            bundled_content = self._bundle_responses(responses, routing_mode)
-            
-            # Step 4: Automatically evaluate response quality using Langfuse evaluator
-            try:
-                # Evaluate response quality (1-10 scale)
-                # The @observe decorator on evaluate_response will create a trace
-                # and the score will be automatically linked to it
-                quality_score = self.evaluator.evaluate_response(
-                    query=query,
-                    response=bundled_content,
+                agent = self._get_agent_instance(agent_names[0])
+                response = await agent.aprocess_query(
+                    query,
+                    conversation_history,
+                    k=DEFAULT_K,
+                    min_similarity=min_similarity,
+                    search_results=search_results.get(agent_names[0]),
+                    query_embedding=query_embedding,
                 )
-                
-                # Add quality score to metadata
-                evaluation_metadata = {
-                    "quality_score": quality_score.score,
-                    "quality_reasoning": quality_score.reasoning,
-                    "quality_dimensions": quality_score.dimensions,
-                }
-            except Exception as eval_error:
-                # Don't fail if evaluation fails, just log it
-                print(f"Warning: Quality evaluation failed: {eval_error}")
-                evaluation_metadata = {}
-            
-            # Step 5: Update conversation context
-            context.add_message("assistant", bundled_content)
-            context.agent_history.extend(agent_names)
-            context.last_agent = agent_names[-1] if agent_names else None
+                responses = [response]
+            timings["agents_ms"] = (time.perf_counter() - stage_start) * 1000
             
-            # Step 6: Create orchestrator response
-            orchestrator_response = OrchestratorResponse(
-                content=bundled_content,
-                agents_used=agent_names,
-                responses=responses,
-                routing_mode=routing_mode,
-                metadata={
-                    "session_id": session_id,
-                    "detection_result": detection_result,
-                    "conversation_length": len(context.messages),
-                    "processing_mode": "sequential" if requires_sequential else "parallel",
-                    **evaluation_metadata,  # Include quality evaluation results
-                }
+            # Steps 3-6: Bundle, evaluate, update context, build the response
+            orchestrator_response = await self._acomplete_response(
+                query,
+                context,
+                responses,
+                agent_names,
+                routing_mode,
+                detection_result,
             )
+            timings["total_ms"] = (time.perf_counter() - request_start) * 1000
+            orchestrator_response.metadata["timings"] = {
+                stage: round(value, 1) for stage, value in timings.items()
+            }
+            
+            if use_response_cache and query_embedding is not None:
+                self.response_cache.put(query_embedding, min_similarity, orchestrator_response, index_version=self.index.version)
             
             # @observe decorator automatically captures return value
             return orchestrator_response
             
         except Exception as e:
             # @observe decorator automatically captures exceptions
+            self._cancel_speculative_retrieval(speculative_tasks)
             # Fallback response
             fallback_agent = self._get_agent_instance("general_knowledge")
-            fallback_response = fallback_agent.process_query(
+            fallback_response = await fallback_agent.aprocess_query(
                 query,
                 context.get_recent_history(),
                 k=DEFAULT_K,
                 min_similarity=min_similarity,
+                query_embedding=query_embedding,
+            )
+            
+            return await self._afallback_response(context, fallback_response, e)
+    
+    async def _aresolve_routing(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None,
+    ) -> Tuple[Dict, List[str], RoutingMode]:
+        """
+        Decide which agents handle a query and how.
+        
+        The embedding router is tried first; LLM detection runs only when its
+        margin is ambiguous.
+        
+        Args:
+            query: User query
+            query_embedding: Query embedding
+            
+        Returns:
+            Tuple of (detection result, agent names, routing mode)
+        """
+        detection_result = None
+        if self.embedding_router is not None and query_embedding is not None:
+            detection_result = self.embedding_router.route(query_embedding)
+        if detection_result is None:
+            detection_result = await self._adetect_multi_agent(query, query_embedding)
+        
+        agent_names = detection_result["agents"]
+        if detection_result["requires_multiple_agents"] and len(agent_names) > 1:
+            # Multi-agent processing - use sequential if dependencies exist, parallel otherwise
+            if detection_result.get("requires_sequential", False):
+                return detection_result, agent_names, RoutingMode.MULTI_SEQUENTIAL
+            return detection_result, agent_names, RoutingMode.MULTI_PARALLEL
+        
+        if not agent_names:
+            agent_names = [await self._aroute_single_agent(query, query_embedding)]
+        return detection_result, agent_names[:1], RoutingMode.SINGLE
+    
+    def _start_speculative_retrieval(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+    ) -> Dict[str, asyncio.Task]:
+        """
+        Start searching every agent's handbook before the route is known.
+        
+        Runs concurrently with the routing decision so the chosen agents'
+        context is already in memory when it is made.
+        
+        Args:
+            query: User query
+            query_embedding: Query embedding (speculation is skipped without one)
+        
+        Returns:
+            Dict mapping agent name to a task resolving to
+            ({handbook_name: [(document, distance), ...]}, elapsed_ms)
+        """
+        if not SPECULATIVE_RETRIEVAL or query_embedding is None:
+            return {}
+        
+        handbooks = {
+            agent_name: agent_config.handbook_name
+            for agent_name, agent_config in self.agent_registry.AGENTS.items()
+            if self.vector_store_manager.has_store(agent_config.handbook_name)
+        }
+        
+        async def search(handbook_names: List[str]):
+            start = time.perf_counter()
+            loop = asyncio.get_event_loop()
+            results = await loop.run_in_executor(
+                None,
+                self.vector_store_manager.search_handbooks,
+                query,
+                handbook_names,
+                SPECULATIVE_RETRIEVAL_K,
+                query_embedding,
+            )
+            return results, (time.perf_counter() - start) * 1000
+        
+        if self.vector_store_manager.unified:
+            # One grouped search covers every handbook
+            task = asyncio.create_task(search(list(handbooks.values())))
+            tasks = {agent_name: task for agent_name in handbooks}
+        else:
+            tasks = {
+                agent_name: asyncio.create_task(search([handbook_name]))
+                for agent_name, handbook_name in handbooks.items()
+            }
+        
+        for task in set(tasks.values()):
+            # Failures are handled by agents searching on their own
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return tasks
+    
+    def _cancel_speculative_retrieval(self, tasks: Dict[str, asyncio.Task], keep: Optional[List[str]] = None):
+        """Cancel speculative searches for agents that were not selected."""
+        keep_tasks = {tasks[agent_name] for agent_name in keep or [] if agent_name in tasks}
+        for task in set(tasks.values()) - keep_tasks:
+            task.cancel()
+    
+    async def _collect_speculative_retrieval(
+        self,
+        tasks: Dict[str, asyncio.Task],
+        agent_names: List[str],
+        timings: Dict[str, float],
+    ) -> Dict[str, List]:
+        """
+        Wait for the selected agents' speculative results and discard the rest.
+        
+        Args:
+            tasks: Tasks from `_start_speculative_retrieval`
+            agent_names: Agents chosen by routing
+            timings: Per-stage timings; retrieval_wait_ms (time spent waiting after
+                     routing), speculative_retrieval_ms and retrieval_hidden_ms
+                     (retrieval time overlapped with routing) are added
+        
+        Returns:
+            Dict mapping agent name to (document, distance) tuples. Agents
+            without results search on their own.
+        """
+        if not tasks:
+            return {}
+        
+        self._cancel_speculative_retrieval(tasks, keep=agent_names)
+        
+        wait_start = time.perf_counter()
+        search_results = {}
+        retrieval_ms = 0.0
+        for agent_name in agent_names:
+            task = tasks.get(agent_name)
+            if task is None:
+                continue
+            try:
+                results, elapsed_ms = await task
+            except Exception as e:
+                print(f"Warning: Speculative retrieval failed for {agent_name}, agent will search on its own: {e}")
+                continue
+            handbook_name = self.agent_registry.get_agent(agent_name).handbook_name
+            if handbook_name in results:
+                search_results[agent_name] = results[handbook_name]
+            retrieval_ms = max(retrieval_ms, elapsed_ms)
+        
+        wait_ms = (time.perf_counter() - wait_start) * 1000
+        timings["retrieval_wait_ms"] = wait_ms
+        timings["speculative_retrieval_ms"] = retrieval_ms
+        timings["retrieval_hidden_ms"] = max(0.0, retrieval_ms - wait_ms)
+        return search_results
+    
+    async def _acomplete_response(
+        self,
+        query: str,
+        context: ConversationContext,
+        responses: List[AgentResponse],
+        agent_names: List[str],
+        routing_mode: RoutingMode,
+        detection_result: Dict,
+    ) -> OrchestratorResponse:
+        """Bundle agent responses, evaluate, update the conversation and build the response."""
+        # Step 3: Bundle responses
+        bundled_content = self._bundle_responses(responses, routing_mode)
+        
+        # Step 4: Evaluate response quality (queued in background mode)
+        evaluation_metadata = await self._evaluate_response(query, bundled_content)
+        
+        # Step 5: Update conversation context
+        context.add_message("assistant", bundled_content)
+        context.add_agents(agent_names)
+        await self.session_store.asave(context)
+        
+        # Step 6: Create orchestrator response
+        requires_sequential = routing_mode == RoutingMode.MULTI_SEQUENTIAL
+        return OrchestratorResponse(
+            content=bundled_content,
+            agents_used=agent_names,
+            responses=responses,
+            routing_mode=routing_mode,
+            metadata={
+                "session_id": context.session_id,
+                "detection_result": detection_result,
+                "conversation_length": len(context.messages),
+                "processing_mode": "sequential" if requires_sequential else "parallel",
+                **evaluation_metadata,  # Include quality evaluation results
+            }
+        )
+    
+    async def _afallback_response(
+        self,
+        context: ConversationContext,
+        fallback_response: AgentResponse,
+        error: Exception,
+    ) -> OrchestratorResponse:
+        """Response built from the general_knowledge agent after a processing error."""
+        context.add_message("assistant", fallback_response.content)
+        await self.session_store.asave(context)
+        
+        return OrchestratorResponse(
+            content=fallback_response.content,
+            agents_used=["general_knowledge"],
+            responses=[fallback_response],
+            routing_mode=RoutingMode.SINGLE,
+            metadata={
+                "error": str(error),
+                "error_type": type(error).__name__,
+                "fallback_used": True,
+            }
+        )
+    
+    async def _astream_agent(
+        self,
+        agent_name: str,
+        query: str,
+        conversation_history: List[Dict[str, str]],
+        min_similarity: float = None,
+        k: int = DEFAULT_K,
+        search_results: Optional[List] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream one agent's events (see `BaseAgent.astream_query`), never raising."""
+        try:
+            agent = self._get_agent_instance(agent_name)
+            async for event in agent.astream_query(
+                query,
+                conversation_history,
+                k=k,
+                min_similarity=min_similarity,
+                search_results=search_results,
+                query_embedding=query_embedding,
+            ):
+                yield event
+        except Exception as e:
+            yield {
+                "event": "agent_done",
+                "agent": agent_name,
+                "response": AgentResponse(
+                    content=f"I encountered an error while processing your query with the {agent_name} agent. Please try again.",
+                    agent_name=agent_name,
+                    sources=[],
+                    metadata={"error": str(e), "error_type": type(e).__name__},
+                ),
+            }
+    
+    async def _merge_streams(self, streams: List[AsyncIterator[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """Interleave several event streams, yielding each event as soon as it arrives."""
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def pump(stream):
+            try:
+                async for event in stream:
+                    await queue.put(event)
+            finally:
+                await queue.put(None)
+        
+        tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @observe(name="orchestrator_stream_query")
+    @_one_turn_per_session
+    @_pinned_index
+    async def astream_query(
+        self,
+        query: str,
+        session_id: str = "default",
+        min_similarity: float = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a query like `process_query_async`, streaming events as they happen.
+        
+        Yields, in order:
+        - {"event": "routing", "agents": [...], "routing_mode": "...", "detection_result": {...}}
+        - {"event": "sources", "agent": name, "sources": [...]} per agent, once it has retrieved
+        - {"event": "token", "agent": name, "content": "..."} as each agent generates;
+          agents running in parallel are interleaved, every token tagged with its agent
+        - {"event": "done", "response": OrchestratorResponse} with the bundled answer
+        
+        Args:
+            query: User query
+            session_id: Session ID for conversation continuity
+            min_similarity: Minimum similarity threshold (0.0 to 1.0) for retrieved context.
+                          Defaults to config MIN_SIMILARITY if None.
+        """
+        from config import MIN_SIMILARITY as DEFAULT_MIN_SIMILARITY
+        
+        if min_similarity is None:
+            min_similarity = DEFAULT_MIN_SIMILARITY
+        context = await self._aget_conversation_context(session_id)
+        context_free = not context.messages
+        use_response_cache = self.response_cache is not None and context_free
+        context.add_message("user", query)
+        
+        # An identical context-free query being processed right now is replayed once it finishes
+        shared_response = None
+        if context_free and self.single_flight is not None:
+            shared_response = await self.single_flight.join(self._single_flight_key(query, min_similarity))
+        coalesced = shared_response is not None
+        
+        query_embedding = None
+        if not coalesced:
+            query_embedding = await self._embed_query_async(query)
+            if use_response_cache and query_embedding is not None:
+                shared_response = self.response_cache.get(query_embedding, min_similarity, index_version=self.index.version)
+        
+        if shared_response is not None:
+            response = await self._areuse_cached_response(shared_response, context, coalesced=coalesced)
+            yield {
+                "event": "routing",
+                "agents": response.agents_used,
+                "routing_mode": response.routing_mode.value,
+                "detection_result": response.metadata.get("detection_result"),
+            }
+            for agent_response in response.responses:
+                yield {"event": "sources", "agent": agent_response.agent_name, "sources": agent_response.sources}
+                yield {"event": "token", "agent": agent_response.agent_name, "content": agent_response.content}
+            yield {"event": "done", "response": response}
+            return
+        
+        speculative_tasks = self._start_speculative_retrieval(query, query_embedding)
+        
+        try:
+            detection_result, agent_names, routing_mode = await self._aresolve_routing(query, query_embedding)
+            speculative_results = await self._collect_speculative_retrieval(speculative_tasks, agent_names, {})
+            yield {
+                "event": "routing",
+                "agents": agent_names,
+                "routing_mode": routing_mode.value,
+                "detection_result": detection_result,
+            }
+            
+            conversation_history = context.get_recent_history()
+            responses: Dict[str, AgentResponse] = {}
+            
+            if routing_mode == RoutingMode.MULTI_SEQUENTIAL:
+                # Each agent streams in turn and sees the previous agents' answers
+                current_history = conversation_history.copy()
+                speculative_results = await self._prefetch_search_results(
+                    agent_names,
+                    query,
+                    k=DEFAULT_K * 2,
+                    query_embedding=query_embedding,
+                    search_results=speculative_results,
+                )
+                for agent_name in agent_names:
+                    async for event in self._astream_agent(
+                        agent_name,
+                        query,
+                        current_history,
+                        min_similarity,
+                        search_results=speculative_results.get(agent_name),
+                        query_embedding=query_embedding,
+                    ):
+                        if event["event"] == "agent_done":
+                            responses[agent_name] = event["response"]
+                        else:
+                            yield event
+                    current_history.append({
+                        "role": "assistant",
+                        "content": f"[{agent_name.upper()} Agent]: {responses[agent_name].content}",
+                    })
+            else:
+                k = DEFAULT_K
+                search_results = speculative_results
+                if routing_mode == RoutingMode.MULTI_PARALLEL:
+                    k = 4
+                    if not speculative_tasks and self.vector_store_manager.unified:
+                        search_results = await self._search_handbooks_async(
+                            agent_names, query, k=k * 2, query_embedding=query_embedding
+                        )
+                streams = [
+                    self._astream_agent(
+                        agent_name,
+                        query,
+                        conversation_history,
+                        min_similarity,
+                        k=k,
+                        search_results=search_results.get(agent_name),
+                        query_embedding=query_embedding,
+                    )
+                    for agent_name in agent_names
+                ]
+                async for event in self._merge_streams(streams):
+                    if event["event"] == "agent_done":
+                        responses[event["agent"]] = event["response"]
+                    else:
+                        yield event
+            
+            orchestrator_response = await self._acomplete_response(
+                query,
+                context,
+                [responses[agent_name] for agent_name in agent_names],
+                agent_names,
+                routing_mode,
+                detection_result,
             )
             
-            context.add_message("assistant", fallback_response.content)
+            if use_response_cache and query_embedding is not None:
+                self.response_cache.put(query_embedding, min_similarity, orchestrator_response, index_version=self.index.version)
+            
+        except Exception as e:
+            self._cancel_speculative_retrieval(speculative_tasks)
+            # Fallback: stream the general_knowledge agent's answer instead
+            yield {"event": "error", "message": str(e), "error_type": type(e).__name__}
+            fallback_response = None
+            async for event in self._astream_agent(
+                "general_knowledge", query, context.get_recent_history(), min_similarity, query_embedding=query_embedding
+            ):
+                if event["event"] == "agent_done":
+                    fallback_response = event["response"]
+                else:
+                    yield event
+            orchestrator_response = await self._afallback_response(context, fallback_response, e)
+        
+        yield {"event": "done", "response": orchestrator_response}
+    
+    async def _evaluate_response(self, query: str, response: str) -> Dict:
+        """
+        Score a response according to the evaluation mode.
+        
+        Args:
+            query: User query
+            response: Bundled response content
             
-            return OrchestratorResponse(
-                content=fallback_response.content,
-                agents_used=["general_knowledge"],
-                responses=[fallback_response],
-                routing_mode=RoutingMode.SINGLE,
-                metadata={
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                    "fallback_used": True,
-                }
+        Returns:
+            Metadata to merge into the response: quality_score/quality_reasoning/
+            quality_dimensions (inline), evaluation_id (background) or nothing
+        """
+        if self.evaluation_mode == "off":
+            return {}
+        
+        if self.evaluation_queue is not None:
+            # Attach the score to this request's trace once the judge has run
+            try:
+                trace_id = self.langfuse.get_current_trace_id()
+            except Exception:
+                trace_id = None
+            evaluation_id = self.evaluation_queue.submit(query, response, trace_id=trace_id)
+            return {"evaluation_id": evaluation_id} if evaluation_id else {}
+        
+        try:
+            # Evaluate response quality (1-10 scale)
+            # The @observe decorator on evaluate_response will create a trace
+            # and the score will be automatically linked to it
+            quality_score = await self.evaluator.aevaluate_response(
+                query=query,
+                response=response,
             )
+            
+            # Add quality score to metadata
+            return {
+                "quality_score": quality_score.score,
+                "quality_reasoning": quality_score.reasoning,
+                "quality_dimensions": quality_score.dimensions,
+            }
+        except Exception as eval_error:
+            # Don't fail if evaluation fails, just log it
+            print(f"Warning: Quality evaluation failed: {eval_error}")
+            return {}
+    
+    def get_evaluation(self, evaluation_id: str) -> Optional[Dict]:
+        """Get the status/result of a background evaluation."""
+        if self.evaluation_queue is None:
+            return None
+        return self.evaluation_queue.get_result(evaluation_id)
+    
+    async def aclose(self):
+        """Finish background work (queued evaluations and score uploads)."""
+        if self.evaluation_queue is not None:
+            await self.evaluation_queue.aclose()
+    
+    async def _areuse_cached_response(
+        self,
+        cached_response: OrchestratorResponse,
+        context: ConversationContext,
+        coalesced: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> OrchestratorResponse:
+        """
+        Answer from the response cache, recording the turn in the conversation context.
+        
+        With `coalesced`, the response was computed for an identical query
+        that was in flight (see `SingleFlight`) rather than cached. Metadata
+        describing the original request (its evaluation and timings) is not
+        carried over; `timings` are this request's own.
+        """
+        context.add_message("assistant", cached_response.content)
+        context.add_agents(cached_response.agents_used)
+        await self.session_store.asave(context)
+        
+        return OrchestratorResponse(
+            content=cached_response.content,
+            agents_used=list(cached_response.agents_used),
+            responses=cached_response.responses,
+            routing_mode=cached_response.routing_mode,
+            metadata={
+                **{
+                    key: value for key, value in cached_response.metadata.items()
+                    if key not in PER_REQUEST_METADATA
+                },
+                "session_id": context.session_id,
+                "conversation_length": len(context.messages),
+                **({"coalesced": True} if coalesced else {"response_cache_hit": True}),
+                **({"timings": {stage: round(value, 1) for stage, value in timings.items()}} if timings else {}),
+            }
+        )
     
     def process_query(
         self,
@@ -723,9 +1857,32 @@ Examples:
 
     def get_conversation_context(self, session_id: str) -> Optional[ConversationContext]:
         """Get conversation context for a session."""
-        return self._conversation_contexts.get(session_id)
+        return self.session_store.get(session_id)
     
     def clear_conversation_context(self, session_id: str):
         """Clear conversation context for a session."""
-        if session_id in self._conversation_contexts:
-            del self._conversation_contexts[session_id]
+        self.session_store.delete(session_id)
+    
+    def get_metrics(self) -> Dict:
+        """Get runtime metrics (cache hit rates, etc.)."""
+        batcher = get_query_embedding_batcher()
+        query_cache = get_query_embedding_cache()
+        return {
+            "startup": self.startup_profile.as_dict(),
+            "index": {
+                "version": self._index.version,
+                "loaded_stores": self._index.vector_store_manager.list_loaded_stores(),
+                "reloads": self.index_reloads,
+            },
+            "query_embedding_cache": query_cache.stats() if query_cache else None,
+            "query_embedding_batcher": batcher.stats() if batcher else None,
+            "embedding_router": self.embedding_router.stats() if self.embedding_router else None,
+            "detection_cache": self.detection_cache.stats() if self.detection_cache else None,
+            "routing_cache": self.routing_cache.stats() if self.routing_cache else None,
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "evaluation_queue": self.evaluation_queue.stats() if self.evaluation_queue else None,
+            "single_flight": self.single_flight.stats() if self.single_flight else None,
+            "sessions": self.session_store.stats(),
+            "session_locks": self.session_locks.stats(),
+            "llm_clients": get_client_registry().stats(),
+        }
@@ -1,11 +1,13 @@
 """Specialist agent implementations."""
 
-from typing import Optional, Union
-from langchain_chroma import Chroma
-from langchain_community.vectorstores import FAISS
+from typing import TYPE_CHECKING, Optional, Union
 
 from .base_agent import BaseAgent
 
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_community.vectorstores import FAISS
+
 
 class FinanceAgent(BaseAgent):
     """Finance specialist agent for billing, payments, and financial queries."""
@@ -13,7 +15,7 @@ class FinanceAgent(BaseAgent):
     def __init__(
         self, 
         llm_model: str = None,
-        vector_store: Optional[Union[Chroma, FAISS]] = None,
+        vector_store: Optional[Union["Chroma", "FAISS"]] = None,
     ):
         super().__init__(
             name="finance",
@@ -30,7 +32,7 @@ class HRAgent(BaseAgent):
     def __init__(
         self, 
         llm_model: str = None,
-        vector_store: Optional[Union[Chroma, FAISS]] = None,
+        vector_store: Optional[Union["Chroma", "FAISS"]] = None,
     ):
         super().__init__(
             name="hr",
@@ -47,7 +49,7 @@ class LegalAgent(BaseAgent):
     def __init__(
         self, 
         llm_model: str = None,
-        vector_store: Optional[Union[Chroma, FAISS]] = None,
+        vector_store: Optional[Union["Chroma", "FAISS"]] = None,
     ):
         super().__init__(
             name="legal",
@@ -64,7 +66,7 @@ class TechAgent(BaseAgent):
     def __init__(
         self, 
         llm_model: str = None,
-        vector_store: Optional[Union[Chroma, FAISS]] = None,
+        vector_store: Optional[Union["Chroma", "FAISS"]] = None,
     ):
         super().__init__(
             name="tech",
@@ -81,7 +83,7 @@ class GeneralKnowledgeAgent(BaseAgent):
     def __init__(
         self, 
         llm_model: str = None,
-        vector_store: Optional[Union[Chroma, FAISS]] = None,
+        vector_store: Optional[Union["Chroma", "FAISS"]] = None,
     ):
         super().__init__(
             name="general_knowledge",
@@ -0,0 +1,11 @@
+"""Caches for query processing."""
+
+from .semantic_cache import SemanticCache
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+
+__all__ = [
+    "SemanticCache",
+    "ResponseCache",
+    "SingleFlight",
+]
@@ -0,0 +1,177 @@
+"""Semantic cache of final orchestrator answers, invalidated by index rebuilds."""
+
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from querying.cache.semantic_cache import SemanticCache
+from utils.storage import read_index_version
+
+
+class ResponseCache:
+    """
+    Cache of complete answers keyed by query embedding and min_similarity.
+    
+    Near-duplicate, context-free questions are answered from the cache without
+    retrieval or generation. Entries are tagged with the vector store build
+    version (see `utils.storage.write_index_version`), so rebuilding the index
+    drops every cached answer. The version is read once from `index_dir`; a
+    server that swaps index versions while running pins the version it
+    serves with `set_index_version`, and lookups and answers from requests
+    still running on another version bypass the cache. Memory is bounded by
+    `max_bytes` using an estimate of each answer's size, least recently used
+    answers first.
+    
+    Values are OrchestratorResponse objects; they are duck-typed here to avoid
+    a circular import with the orchestrator.
+    """
+    
+    def __init__(
+        self,
+        index_dir: Path,
+        max_entries: int = 2048,
+        ttl_seconds: float = 3600.0,
+        max_distance: float = 0.02,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            index_dir: Vector store directory holding the INDEX_VERSION file.
+            max_entries: Maximum number of cached answers.
+            ttl_seconds: Lifetime of a cached answer in seconds.
+            max_distance: Maximum cosine distance between queries for a hit.
+            max_bytes: Approximate memory bound for cached answers.
+        """
+        self.index_dir = Path(index_dir)
+        self._cache = SemanticCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_distance=max_distance,
+            max_bytes=max_bytes,
+        )
+        self._index_version: Optional[str] = None
+        self._stats_lock = threading.Lock()
+        self._agent_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+    
+    def set_index_version(self, version: Optional[str]):
+        """Pin the index version being served (instead of reading it from `index_dir`)."""
+        self._index_version = version or "unversioned"
+        self._cache.set_version(self._index_version)
+    
+    def _sync_index_version(self, index_version: Optional[str] = None) -> bool:
+        """
+        Check that a request runs on the index version being served.
+        
+        Until a version is pinned, the one in `index_dir` is read and pinned.
+        
+        Returns:
+            False if `index_version` is not the version being served.
+        """
+        if self._index_version is None:
+            self.set_index_version(read_index_version(self.index_dir))
+        return index_version is None or (index_version or "unversioned") == self._index_version
+    
+    @staticmethod
+    def _key(min_similarity: float) -> float:
+        """Cache partition for a min_similarity value."""
+        return round(float(min_similarity), 4)
+    
+    @staticmethod
+    def is_cacheable(response: Any) -> bool:
+        """Only successful answers are cached (no errors or fallbacks)."""
+        if response.metadata.get("error") or response.metadata.get("fallback_used"):
+            return False
+        return all(not agent_response.metadata.get("error") for agent_response in response.responses)
+    
+    @staticmethod
+    def _estimate_size(response: Any, dimensions: int) -> int:
+        """Approximate memory footprint of a cached answer in bytes."""
+        size = dimensions * 4 + len(response.content.encode("utf-8"))
+        for agent_response in response.responses:
+            size += len(agent_response.content.encode("utf-8"))
+            for source in agent_response.sources:
+                # Content plus a rough allowance for metadata
+                size += len(source.get("content", "").encode("utf-8")) + 256
+        return size
+    
+    def get(
+        self,
+        query_embedding: List[float],
+        min_similarity: float,
+        index_version: Optional[str] = None,
+    ) -> Optional[Any]:
+        """
+        Look up the answer to a near-identical earlier query.
+        
+        Args:
+            query_embedding: Query embedding
+            min_similarity: Retrieval threshold the answer must have been produced with
+            index_version: Index version serving the request, if pinned
+        
+        Returns:
+            Cached OrchestratorResponse, or None
+        """
+        if not self._sync_index_version(index_version):
+            return None
+        response = self._cache.get(query_embedding, key=self._key(min_similarity))
+        if response is not None:
+            with self._stats_lock:
+                for agent_name in response.agents_used:
+                    self._agent_stats[agent_name]["hits"] += 1
+        return response
+    
+    def put(
+        self,
+        query_embedding: List[float],
+        min_similarity: float,
+        response: Any,
+        index_version: Optional[str] = None,
+    ):
+        """
+        Record a cache miss that was answered by the agents, caching the answer if it succeeded.
+        
+        Args:
+            query_embedding: Query embedding
+            min_similarity: Retrieval threshold used for the answer
+            response: OrchestratorResponse produced for the query
+            index_version: Index version the answer was produced from, if pinned
+        """
+        with self._stats_lock:
+            for agent_name in response.agents_used:
+                self._agent_stats[agent_name]["misses"] += 1
+        
+        if not self.is_cacheable(response):
+            return
+        
+        if not self._sync_index_version(index_version):
+            return
+        self._cache.put(
+            query_embedding,
+            response,
+            key=self._key(min_similarity),
+            size=self._estimate_size(response, len(query_embedding)),
+        )
+    
+    def clear(self):
+        """Drop every cached answer."""
+        self._cache.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Overall and per-agent hit rates, sizes and the current index version."""
+        with self._stats_lock:
+            by_agent = {
+                agent_name: {
+                    **counts,
+                    "hit_rate": counts["hits"] / (counts["hits"] + counts["misses"])
+                    if counts["hits"] + counts["misses"] else 0.0,
+                }
+                for agent_name, counts in self._agent_stats.items()
+            }
+        return {
+            **self._cache.stats(),
+            "index_version": self._index_version,
+            "by_agent": by_agent,
+        }
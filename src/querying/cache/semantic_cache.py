@@ -0,0 +1,208 @@
+"""Embedding-keyed cache that serves near-duplicate queries from earlier results."""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Cache keyed by query embedding instead of exact query text.
+    
+    A lookup returns the value stored for the most similar previous query if
+    its cosine distance is within `max_distance`, so paraphrased questions
+    share one entry. Entries expire after `ttl_seconds`; when the cache is
+    full (by entry count or, if `max_bytes` is set, by the caller-supplied
+    entry sizes) the least recently used entries are replaced.
+    
+    Embeddings live in a preallocated float32 matrix, so a lookup is a single
+    matrix-vector product over at most `max_entries` rows.
+    
+    Entries can be stored under an optional key (e.g., a request parameter
+    that changes the result); a lookup only matches entries with the same key.
+    
+    The cache can be tagged with a version (e.g., a fingerprint of the data the
+    cached values were derived from). Changing the version drops every entry.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        max_distance: float = 0.02,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached queries.
+            ttl_seconds: Lifetime of an entry in seconds.
+            max_distance: Maximum cosine distance (1 - cosine similarity)
+                          between a query and a cached query for a hit.
+            max_bytes: Optional bound on the summed sizes passed to `put`.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # allocated on first store
+        self._values: List[Any] = [None] * max_entries
+        self._expires_at = np.full(max_entries, -np.inf)
+        self._last_used = np.zeros(max_entries)
+        self._key_ids = np.full(max_entries, -1, dtype=np.int64)
+        self._sizes = np.zeros(max_entries, dtype=np.int64)
+        self._key_index: Dict[Any, int] = {}
+        self._version: Optional[str] = None
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """L2-normalize an embedding as float32."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0.0 else vector
+    
+    def set_version(self, version: str):
+        """
+        Tag the cache with a version, clearing it if the version changed.
+        
+        Args:
+            version: Identifier of the data cached values depend on.
+        """
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._clear_locked()
+                self.invalidations += 1
+            self._version = version
+    
+    def get(self, embedding: List[float], key: Any = None) -> Optional[Any]:
+        """
+        Look up the value stored for the nearest cached query.
+        
+        Args:
+            embedding: Query embedding.
+            key: Only entries stored under this key can match.
+        
+        Returns:
+            Cached value, or None if no live entry is within `max_distance`.
+        """
+        query = self._normalize(embedding)
+        now = time.monotonic()
+        
+        with self._lock:
+            if self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+                self.misses += 1
+                return None
+            
+            similarities = self._vectors @ query
+            similarities[self._expires_at <= now] = -np.inf
+            similarities[self._key_ids != self._key_index.get(key, -2)] = -np.inf
+            best = int(np.argmax(similarities))
+            
+            if 1.0 - similarities[best] > self.max_distance:
+                self.misses += 1
+                return None
+            
+            self._last_used[best] = now
+            self.hits += 1
+            return self._values[best]
+    
+    def put(self, embedding: List[float], value: Any, key: Any = None, size: int = 0):
+        """
+        Store a value for a query embedding.
+        
+        Args:
+            embedding: Query embedding.
+            value: Value to return for this and similar queries.
+            key: Key the entry is stored under (see `get`).
+            size: Approximate size of the entry in bytes (counted against `max_bytes`).
+        """
+        if self.max_entries <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        
+        vector = self._normalize(embedding)
+        now = time.monotonic()
+        
+        with self._lock:
+            if self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._clear_locked()
+            
+            # Reuse an expired slot if there is one, otherwise evict the LRU entry
+            expired = np.flatnonzero(self._expires_at <= now)
+            if expired.size:
+                slot = int(expired[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+            
+            self._release_locked(slot)
+            
+            # Evict expired, then least recently used, entries until the new entry fits
+            if self.max_bytes is not None:
+                while int(self._sizes.sum()) + size > self.max_bytes:
+                    occupied = np.flatnonzero(self._sizes > 0)
+                    recency = np.where(self._expires_at[occupied] <= now, -np.inf, self._last_used[occupied])
+                    self._release_locked(int(occupied[np.argmin(recency)]))
+                    self.evictions += 1
+            
+            self._vectors[slot] = vector
+            self._values[slot] = value
+            self._expires_at[slot] = now + self.ttl_seconds
+            self._last_used[slot] = now
+            self._key_ids[slot] = self._key_index.setdefault(key, len(self._key_index))
+            self._sizes[slot] = size
+    
+    def _release_locked(self, slot: int):
+        """Empty one slot (caller holds the lock)."""
+        self._values[slot] = None
+        self._expires_at[slot] = -np.inf
+        self._last_used[slot] = 0.0
+        self._key_ids[slot] = -1
+        self._sizes[slot] = 0
+    
+    def _clear_locked(self):
+        """Drop every entry (caller holds the lock)."""
+        self._values = [None] * self.max_entries
+        self._expires_at[:] = -np.inf
+        self._last_used[:] = 0.0
+        self._key_ids[:] = -1
+        self._sizes[:] = 0
+        self._key_index.clear()
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._clear_locked()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return int(np.count_nonzero(self._expires_at > time.monotonic()))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizes."""
+        size = len(self)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": size,
+                "bytes": int(self._sizes.sum()),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "max_distance": self.max_distance,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,87 @@
+"""Single-flight execution: concurrent identical requests share one computation."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Table of in-flight computations keyed by request.
+    
+    The first caller for a key runs the computation; callers arriving while
+    it runs wait for it and receive the same result. Nothing is kept once
+    the computation finishes, so a result is only shared with requests that
+    overlapped it. If the computation fails, is cancelled or produces a
+    result that must not be shared (see `run`), a waiting caller runs it
+    again itself.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+    
+    async def join(self, key: Hashable) -> Optional[Any]:
+        """
+        Wait for an in-flight computation of `key`.
+        
+        Returns:
+            Its result, or None if there is none (or it did not complete).
+        """
+        flight = self._flights.get(key)
+        # Futures belong to one event loop (e.g., the sync wrapper's asyncio.run)
+        if flight is None or flight.get_loop() is not asyncio.get_running_loop():
+            return None
+        await asyncio.wait({flight})
+        if flight.cancelled():
+            return None
+        self.coalesced += 1
+        return flight.result()
+    
+    async def run(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        shareable: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        Run `compute` unless an identical computation is in flight.
+        
+        Args:
+            key: Identity of the request.
+            compute: Produces the result when this caller leads.
+            shareable: Whether a result may be handed to waiting callers
+                       (e.g., not an error fallback). Defaults to always.
+        
+        Returns:
+            (result, whether it was shared from another caller's computation)
+        """
+        while key in self._flights:
+            result = await self.join(key)
+            if result is not None:
+                return result, True
+            flight = self._flights.get(key)
+            if flight is not None and flight.get_loop() is not asyncio.get_running_loop():
+                break
+        
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders += 1
+        try:
+            result = await compute()
+            if shareable is None or shareable(result):
+                flight.set_result(result)
+            return result, False
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if not flight.done():
+                flight.cancel()
+    
+    def stats(self) -> Dict[str, int]:
+        """Computations in flight, led and shared."""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
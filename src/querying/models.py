@@ -56,4 +56,14 @@ class QueryResponse(BaseModel):
     session_id: str = Field(..., description="Session ID for this conversation")
     quality_score: Optional[float] = Field(None, ge=1.0, le=10.0, description="Automatic quality score (1-10) from Langfuse evaluator")
     quality_reasoning: Optional[str] = Field(None, description="Reasoning for the quality score")
+    evaluation_id: Optional[str] = Field(None, description="ID of the background quality evaluation; fetch the score from GET /api/v1/evaluations/{evaluation_id}")
+
+
+class EvaluationResponse(BaseModel):
+    """Response model for a background quality evaluation."""
+    evaluation_id: str
+    status: str = Field(..., description="pending, completed or failed")
+    quality_score: Optional[float] = Field(None, ge=1.0, le=10.0, description="Automatic quality score (1-10) from Langfuse evaluator")
+    quality_reasoning: Optional[str] = Field(None, description="Reasoning for the quality score")
+    quality_dimensions: Dict[str, Any] = Field(default_factory=dict, description="Score breakdown by dimension")
 
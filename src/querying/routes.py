@@ -1,13 +1,22 @@
 """API routes for query endpoints."""
 
 import hashlib
-from fastapi import APIRouter, HTTPException, Request
+import hmac
+import json
+import os
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict
 
-from querying.agents import Orchestrator, OrchestratorResponse
-from .models import QueryRequest, QueryResponse, SourceResponse
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
-# Create router
-router = APIRouter(prefix="/api/v1", tags=["query"])
+from utils.startup import BackgroundInitializer
+from .models import QueryRequest, QueryResponse, SourceResponse, EvaluationResponse
+from .session_store import SessionBusyError
+
+# The orchestrator stack (langchain, langfuse, openai, vector stores) is slow to
+# import; it is loaded by the background initializer, not when routes are set up
+if TYPE_CHECKING:
+    from querying.agents import Orchestrator, OrchestratorResponse
 
 
 def get_client_ip(request: Request) -> str:
@@ -59,13 +68,84 @@ def generate_session_id_from_ip(ip: str) -> str:
     return f"ip_{session_hash}"
 
 
-def setup_query_routes(orchestrator: Orchestrator):
+def build_query_response(response: "OrchestratorResponse", session_id: str) -> QueryResponse:
     """
-    Setup query routes with orchestrator instance.
+    Convert an orchestrator response into the API response model.
     
     Args:
-        orchestrator: Orchestrator instance to use for processing queries
+        response: Orchestrator response
+        session_id: Session ID of the request
+        
+    Returns:
+        QueryResponse with flattened sources and quality fields at the top level
     """
+    # Extract all sources from agent responses
+    all_sources = []
+    for agent_response in response.responses:
+        if agent_response.sources:
+            for source in agent_response.sources:
+                all_sources.append(
+                    SourceResponse(
+                        content=source.get("content", ""),
+                        metadata=source.get("metadata", {}),
+                        similarity=source.get("similarity", 0.0),
+                        distance=source.get("distance"),
+                    )
+                )
+    
+    # Extract quality score from metadata if available
+    quality_score = response.metadata.get("quality_score")
+    quality_reasoning = response.metadata.get("quality_reasoning")
+    
+    # Background evaluation: the score is fetched later by evaluation_id
+    evaluation_id = response.metadata.get("evaluation_id")
+    
+    # Build metadata without duplicates (remove quality_score, quality_reasoning, routing_mode from metadata)
+    # since they're at the top level
+    metadata_clean = {k: v for k, v in response.metadata.items() 
+                    if k not in ["quality_score", "quality_reasoning", "routing_mode", "evaluation_id"]}
+    
+    # Build response
+    return QueryResponse(
+        content=response.content,
+        agents_used=response.agents_used,
+        routing_mode=response.routing_mode.value,
+        sources=all_sources,
+        metadata=metadata_clean,
+        session_id=session_id,  # Use auto-generated session_id
+        quality_score=quality_score,
+        quality_reasoning=quality_reasoning,
+        evaluation_id=evaluation_id,
+    )
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def setup_query_routes(orchestrator_initializer: BackgroundInitializer):
+    """
+    Setup query routes with the orchestrator initializer.
+    
+    Requests that arrive while the orchestrator is still being built wait for
+    it; if building it failed they get a 503.
+    
+    Args:
+        orchestrator_initializer: Builds the Orchestrator instance used to process queries
+    """
+    # Create router (one per app, so each app's routes use its own orchestrator)
+    router = APIRouter(prefix="/api/v1", tags=["query"])
+    
+    async def get_orchestrator() -> "Orchestrator":
+        """Return the orchestrator, waiting for it to be built."""
+        try:
+            return await orchestrator_initializer.get()
+        except Exception as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Service unavailable: {str(e)}"
+            )
     
     @router.post("/query", response_model=QueryResponse)
     async def query(request: QueryRequest, http_request: Request):
@@ -81,62 +161,77 @@ def setup_query_routes(orchestrator: Orchestrator):
         3. Bundle responses into a coherent answer
         4. Maintain conversation context for the session
         """
+        orchestrator = await get_orchestrator()
         try:
             # Generate session ID from client IP address
             client_ip = get_client_ip(http_request)
             session_id = generate_session_id_from_ip(client_ip)
             
             # Process query through orchestrator
-            response: OrchestratorResponse = await orchestrator.process_query_async(
+            response: "OrchestratorResponse" = await orchestrator.process_query_async(
                 query=request.query,
                 session_id=session_id,
                 min_similarity=request.min_similarity,
             )
             
-            # Extract all sources from agent responses
-            all_sources = []
-            for agent_response in response.responses:
-                if agent_response.sources:
-                    for source in agent_response.sources:
-                        all_sources.append(
-                            SourceResponse(
-                                content=source.get("content", ""),
-                                metadata=source.get("metadata", {}),
-                                similarity=source.get("similarity", 0.0),
-                                distance=source.get("distance"),
-                            )
-                        )
-            
-            # Extract quality score from metadata if available
-            quality_score = response.metadata.get("quality_score")
-            quality_reasoning = response.metadata.get("quality_reasoning")
-            
-            # Build metadata without duplicates (remove quality_score, quality_reasoning, routing_mode from metadata)
-            # since they're at the top level
-            metadata_clean = {k: v for k, v in response.metadata.items() 
-                            if k not in ["quality_score", "quality_reasoning", "routing_mode"]}
-            
-            # Build response
-            return QueryResponse(
-                content=response.content,
-                agents_used=response.agents_used,
-                routing_mode=response.routing_mode.value,
-                sources=all_sources,
-                metadata=metadata_clean,
-                session_id=session_id,  # Use auto-generated session_id
-                quality_score=quality_score,
-                quality_reasoning=quality_reasoning,
-            )
+            return build_query_response(response, session_id)
             
+        except SessionBusyError as e:
+            # Too many queries of this session already waiting for their turn
+            raise HTTPException(status_code=429, detail=str(e))
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Error processing query: {str(e)}"
             )
     
+    @router.post("/query/stream")
+    async def query_stream(request: QueryRequest, http_request: Request):
+        """
+        Process a user query, streaming the answer as server-sent events.
+        
+        Events, in order:
+        - routing: selected agents and routing mode
+        - sources: retrieved sources, once per agent
+        - token: answer chunks tagged with their agent (parallel agents interleave)
+        - done: the complete response, same shape as POST /query
+        - error: emitted if processing failed (a fallback answer follows)
+        """
+        orchestrator = await get_orchestrator()
+        client_ip = get_client_ip(http_request)
+        session_id = generate_session_id_from_ip(client_ip)
+        if orchestrator.session_locks.is_busy(session_id):
+            raise HTTPException(
+                status_code=429,
+                detail=f"Session {session_id} already has {orchestrator.session_locks.pending(session_id)} queries waiting",
+            )
+        
+        async def event_stream() -> AsyncIterator[str]:
+            try:
+                async for event in orchestrator.astream_query(
+                    query=request.query,
+                    session_id=session_id,
+                    min_similarity=request.min_similarity,
+                ):
+                    event_type = event["event"]
+                    if event_type == "done":
+                        data = build_query_response(event["response"], session_id).model_dump()
+                    else:
+                        data = {k: v for k, v in event.items() if k != "event"}
+                    yield format_sse(event_type, data)
+            except Exception as e:
+                yield format_sse("error", {"message": f"Error processing query: {str(e)}"})
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    
     @router.get("/agents")
-    def list_agents():
+    async def list_agents():
         """List all available agents."""
+        orchestrator = await get_orchestrator()
         agents = orchestrator.list_available_agents()
         return {
             "agents": [
@@ -150,8 +245,9 @@ def setup_query_routes(orchestrator: Orchestrator):
         }
     
     @router.get("/sessions/{session_id}/history")
-    def get_conversation_history(session_id: str):
+    async def get_conversation_history(session_id: str):
         """Get conversation history for a session."""
+        orchestrator = await get_orchestrator()
         context = orchestrator.get_conversation_context(session_id)
         
         if not context:
@@ -162,17 +258,67 @@ def setup_query_routes(orchestrator: Orchestrator):
         
         return {
             "session_id": session_id,
-            "messages": context.messages,
-            "agent_history": context.agent_history,
+            "messages": list(context.messages),
+            "agent_history": list(context.agent_history),
             "last_agent": context.last_agent,
             "message_count": len(context.messages),
         }
     
     @router.delete("/sessions/{session_id}")
-    def clear_session(session_id: str):
+    async def clear_session(session_id: str):
         """Clear conversation history for a session."""
+        orchestrator = await get_orchestrator()
         orchestrator.clear_conversation_context(session_id)
         return {"message": f"Session {session_id} cleared successfully"}
     
+    @router.get("/evaluations/{evaluation_id}", response_model=EvaluationResponse)
+    async def get_evaluation(evaluation_id: str):
+        """Get the quality score of a response evaluated in the background."""
+        orchestrator = await get_orchestrator()
+        result = orchestrator.get_evaluation(evaluation_id)
+        
+        if not result:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No evaluation found: {evaluation_id}"
+            )
+        
+        return EvaluationResponse(
+            evaluation_id=evaluation_id,
+            status=result["status"],
+            quality_score=result.get("quality_score"),
+            quality_reasoning=result.get("quality_reasoning") or result.get("error"),
+            quality_dimensions=result.get("quality_dimensions") or {},
+        )
+    
+    @router.post("/admin/reload-index")
+    async def reload_index(force: bool = False, x_admin_key: str = Header(default="")):
+        """
+        Load the latest index version in the background and swap it in.
+        
+        Requires the ADMIN_API_KEY environment variable to be set and sent in
+        the X-Admin-Key header. Queries keep being served during the reload.
+        """
+        admin_key = os.getenv("ADMIN_API_KEY")
+        if not admin_key:
+            raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_API_KEY is not set)")
+        if not hmac.compare_digest(x_admin_key.encode("utf-8"), admin_key.encode("utf-8")):
+            raise HTTPException(status_code=401, detail="Invalid admin key")
+        
+        orchestrator = await get_orchestrator()
+        try:
+            return await orchestrator.areload_index(force=force)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error reloading index: {str(e)}"
+            )
+    
+    @router.get("/metrics")
+    async def get_metrics():
+        """Get runtime metrics (cache hit/miss counters, startup profile, etc.)."""
+        orchestrator = await get_orchestrator()
+        return orchestrator.get_metrics()
+    
     return router
 
@@ -0,0 +1,521 @@
+"""Conversation session stores (bounded in-memory LRU with idle TTL, or SQLite) and per-session turn locks."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from config import (
+    CONVERSATION_MAX_MESSAGES,
+    SESSION_STORE_BACKEND,
+    SESSION_STORE_PATH,
+    SESSION_MAX_SESSIONS,
+    SESSION_TTL_SECONDS,
+    SESSION_MAX_PENDING_TURNS,
+)
+
+
+def _ring(items=(), maxlen: int = CONVERSATION_MAX_MESSAGES) -> Deque:
+    """Fixed-size buffer that drops its oldest item on append once full."""
+    return deque(items, maxlen=maxlen)
+
+
+@dataclass
+class ConversationContext:
+    """Context for maintaining conversation continuity."""
+    session_id: str
+    # Ring buffers: appending past the limit drops the oldest entry in O(1)
+    messages: Deque[Dict[str, str]] = field(default_factory=_ring)
+    agent_history: Deque[str] = field(default_factory=_ring)  # Which agents handled queries
+    last_agent: Optional[str] = None
+    # Stored version the context was loaded from (0 if never stored) and
+    # entries added since, for stores that detect concurrent writers
+    version: int = 0
+    unsaved_messages: int = 0
+    unsaved_agents: int = 0
+    
+    def add_message(self, role: str, content: str):
+        """Add a message to conversation history (the last CONVERSATION_MAX_MESSAGES are kept)."""
+        self.messages.append({"role": role, "content": content})
+        self.unsaved_messages += 1
+    
+    def add_agents(self, agent_names: List[str]):
+        """Record the agents that answered the latest query."""
+        self.agent_history.extend(agent_names)
+        self.unsaved_agents += len(agent_names)
+        self.last_agent = agent_names[-1] if agent_names else None
+    
+    def mark_saved(self, version: int):
+        """Record that the context was stored as `version`."""
+        self.version = version
+        self.unsaved_messages = 0
+        self.unsaved_agents = 0
+    
+    def rebase(self, stored: "ConversationContext"):
+        """
+        Re-apply the entries added since loading on top of a newer stored copy.
+        
+        Used when another worker saved the session in the meantime, so that
+        neither turn is lost.
+        """
+        new_messages = list(self.messages)[max(len(self.messages) - self.unsaved_messages, 0):]
+        new_agents = list(self.agent_history)[max(len(self.agent_history) - self.unsaved_agents, 0):]
+        self.messages = _ring([*stored.messages, *new_messages])
+        self.agent_history = _ring([*stored.agent_history, *new_agents])
+        if not new_agents:
+            self.last_agent = stored.last_agent
+        self.version = stored.version
+    
+    def get_recent_history(self, limit: int = 10) -> List[Dict[str, str]]:
+        """Get recent conversation history."""
+        return list(islice(self.messages, max(len(self.messages) - limit, 0), None))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the context (e.g., for a persistent session store)."""
+        return {
+            "session_id": self.session_id,
+            "messages": list(self.messages),
+            "agent_history": list(self.agent_history),
+            "last_agent": self.last_agent,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationContext":
+        """Rebuild a context serialized with `to_dict`."""
+        return cls(
+            session_id=data["session_id"],
+            messages=_ring(data.get("messages", [])),
+            agent_history=_ring(data.get("agent_history", [])),
+            last_agent=data.get("last_agent"),
+        )
+
+
+class SessionStore(ABC):
+    """
+    Interface of conversation session stores.
+    
+    `get_or_create` returns the context of a session; callers modify it and
+    then call `save` so that stores keeping serialized copies persist the
+    turn. Sessions idle for longer than the TTL are dropped, and when the
+    store is full the least recently used sessions are evicted.
+    
+    The `a`-prefixed variants are used on the event loop; stores doing I/O
+    run them in a worker thread.
+    """
+    
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[ConversationContext]:
+        """Return the context of a live session, or None."""
+    
+    @abstractmethod
+    def get_or_create(self, session_id: str) -> ConversationContext:
+        """Return the context of a session, starting a new one if needed."""
+    
+    @abstractmethod
+    def save(self, context: ConversationContext):
+        """Persist a modified context."""
+    
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Forget a session."""
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Live sessions and eviction counters."""
+    
+    async def aget_or_create(self, session_id: str) -> ConversationContext:
+        """Async variant of `get_or_create`."""
+        return self.get_or_create(session_id)
+    
+    async def asave(self, context: ConversationContext):
+        """Async variant of `save`."""
+        self.save(context)
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Sessions held in process memory, bounded by count and idle time.
+    
+    Sessions are kept in least-recently-used order, so both expired and
+    evicted sessions are found at the front without scanning the store.
+    Thread-safe.
+    """
+    
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Initialize the store.
+        
+        Args:
+            max_sessions: Maximum number of live sessions.
+            ttl_seconds: Sessions idle for longer than this are dropped.
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, ConversationContext]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def _expire(self, now: float):
+        """Drop sessions idle for longer than the TTL (oldest first)."""
+        while self._sessions:
+            session_id = next(iter(self._sessions))
+            if now - self._last_used[session_id] <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            del self._last_used[session_id]
+            self.expirations += 1
+    
+    def _touch(self, session_id: str, now: float):
+        """Mark a session as the most recently used."""
+        self._sessions.move_to_end(session_id)
+        self._last_used[session_id] = now
+    
+    def get(self, session_id: str) -> Optional[ConversationContext]:
+        """Return the context of a live session, or None."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            context = self._sessions.get(session_id)
+            if context is not None:
+                self._touch(session_id, now)
+            return context
+    
+    def get_or_create(self, session_id: str) -> ConversationContext:
+        """Return the context of a session, starting a new one if needed."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            context = self._sessions.get(session_id)
+            if context is None:
+                while len(self._sessions) >= self.max_sessions:
+                    evicted, _ = self._sessions.popitem(last=False)
+                    del self._last_used[evicted]
+                    self.evictions += 1
+                context = ConversationContext(session_id=session_id)
+                self._sessions[session_id] = context
+                self.created += 1
+            self._touch(session_id, now)
+            return context
+    
+    def save(self, context: ConversationContext):
+        """Contexts are modified in place; saving only marks the session as used."""
+        with self._lock:
+            if context.session_id in self._sessions:
+                self._touch(context.session_id, time.monotonic())
+            context.mark_saved(context.version)
+    
+    def delete(self, session_id: str):
+        """Forget a session."""
+        with self._lock:
+            if self._sessions.pop(session_id, None) is not None:
+                del self._last_used[session_id]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Live sessions and eviction counters."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions persisted in SQLite, so history survives restarts and is shared by workers.
+    
+    Each session is one row holding the serialized context, when it was last
+    used and a version incremented by every save. A save only succeeds if the
+    row still has the version the context was loaded from; otherwise another
+    worker saved a turn of the same session in the meantime, and the turn is
+    re-applied on top of the stored copy and saved again, so neither turn is
+    lost. Expired and surplus (least recently used) sessions are deleted
+    every `sweep_interval` writes.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 3600.0,
+        sweep_interval: int = 100,
+    ):
+        """
+        Open (or create) the store.
+        
+        Args:
+            path: SQLite database file.
+            max_sessions: Maximum number of stored sessions.
+            ttl_seconds: Sessions idle for longer than this are dropped.
+            sweep_interval: Writes between two clean-ups.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, last_used REAL NOT NULL, "
+            "version INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions (last_used)")
+        self._conn.commit()
+        self._writes = 0
+        
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.conflicts = 0
+    
+    def get(self, session_id: str) -> Optional[ConversationContext]:
+        """Return the context of a live session, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, version FROM sessions WHERE session_id = ? AND last_used >= ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        if row is None:
+            return None
+        context = ConversationContext.from_dict(json.loads(row[0]))
+        context.version = row[1]
+        return context
+    
+    def get_or_create(self, session_id: str) -> ConversationContext:
+        """Return the context of a session, starting a new one if needed."""
+        context = self.get(session_id)
+        if context is None:
+            context = ConversationContext(session_id=session_id)
+            self.created += 1
+        return context
+    
+    def save(self, context: ConversationContext):
+        """Write the context and mark the session as used, merging concurrent turns."""
+        # Every conflict means another save went through, so this terminates
+        while True:
+            with self._lock:
+                version = self._write(context)
+                if version is not None:
+                    self._writes += 1
+                    if self._writes % self.sweep_interval == 0:
+                        self._sweep()
+            if version is not None:
+                context.mark_saved(version)
+                return
+            self.conflicts += 1
+            context.rebase(self.get(context.session_id) or ConversationContext(session_id=context.session_id))
+    
+    def _write(self, context: ConversationContext) -> Optional[int]:
+        """
+        Store the context if the row still has the version it was loaded from.
+        
+        Returns:
+            The new version, or None if the session was saved by someone else.
+        """
+        data = json.dumps(context.to_dict(), ensure_ascii=False)
+        now = time.time()
+        # Plain statements and rowcount (no UPSERT/RETURNING), so any SQLite works
+        if context.version == 0:
+            # New session; an expired row left by an earlier one is replaced
+            cursor = self._conn.execute(
+                "UPDATE sessions SET data = ?, last_used = ?, version = version + 1 "
+                "WHERE session_id = ? AND last_used < ?",
+                (data, now, context.session_id, now - self.ttl_seconds),
+            )
+            if cursor.rowcount == 0:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, data, last_used, version) "
+                    "VALUES (?, ?, ?, 1)",
+                    (context.session_id, data, now),
+                )
+            version = None
+            if cursor.rowcount:
+                # Read inside the write transaction, before any other writer
+                (version,) = self._conn.execute(
+                    "SELECT version FROM sessions WHERE session_id = ?", (context.session_id,)
+                ).fetchone()
+        else:
+            cursor = self._conn.execute(
+                "UPDATE sessions SET data = ?, last_used = ?, version = version + 1 "
+                "WHERE session_id = ? AND version = ?",
+                (data, now, context.session_id, context.version),
+            )
+            version = context.version + 1 if cursor.rowcount else None
+        self._conn.commit()
+        return version
+    
+    async def aget_or_create(self, session_id: str) -> ConversationContext:
+        """Async variant of `get_or_create` (reads in a worker thread)."""
+        return await asyncio.to_thread(self.get_or_create, session_id)
+    
+    async def asave(self, context: ConversationContext):
+        """Async variant of `save` (writes in a worker thread)."""
+        await asyncio.to_thread(self.save, context)
+    
+    def _sweep(self):
+        """Delete expired sessions, then the least recently used beyond `max_sessions`."""
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE last_used < ?", (time.time() - self.ttl_seconds,)
+        )
+        self.expirations += cursor.rowcount
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE session_id IN ("
+            "SELECT session_id FROM sessions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        )
+        self.evictions += cursor.rowcount
+        self._conn.commit()
+    
+    def delete(self, session_id: str):
+        """Forget a session."""
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Live sessions and eviction counters (evictions counted by this process)."""
+        with self._lock:
+            (sessions,) = self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE last_used >= ?",
+                (time.time() - self.ttl_seconds,),
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "sessions": sessions,
+            "max_sessions": self.max_sessions,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "conflicts": self.conflicts,
+        }
+
+
+class SessionBusyError(Exception):
+    """Raised when a session already has the maximum number of turns waiting."""
+
+
+class SessionLocks:
+    """
+    One lock per session, so the turns of a session run one at a time.
+    
+    Turns of the same session wait for each other in arrival order (asyncio
+    locks are fair), while different sessions stay fully concurrent. A lock
+    only exists while a turn holds or waits for it. A session that already
+    has `max_pending` turns waiting rejects new ones, so a client flooding
+    one session cannot queue unbounded work on the worker.
+    """
+    
+    def __init__(self, max_pending: int = SESSION_MAX_PENDING_TURNS):
+        """
+        Initialize the locks.
+        
+        Args:
+            max_pending: Turns allowed to wait per session (behind the running one).
+        """
+        self.max_pending = max_pending
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._turns: Dict[str, int] = {}  # Running plus waiting turns per session
+        
+        self.turns = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.rejected = 0
+    
+    def pending(self, session_id: str) -> int:
+        """Number of turns of a session waiting behind the running one."""
+        return max(self._turns.get(session_id, 0) - 1, 0)
+    
+    def is_busy(self, session_id: str) -> bool:
+        """Whether a new turn of the session would be rejected."""
+        return self._turns.get(session_id, 0) > self.max_pending
+    
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[float]:
+        """
+        Run one turn of a session, waiting for its earlier turns first.
+        
+        Yields:
+            Seconds spent waiting for the session.
+        
+        Raises:
+            SessionBusyError: If `max_pending` turns of the session are already waiting.
+        """
+        if self.is_busy(session_id):
+            self.rejected += 1
+            raise SessionBusyError(
+                f"Session {session_id} already has {self.pending(session_id)} queries waiting"
+            )
+        
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._turns[session_id] = self._turns.get(session_id, 0) + 1
+        try:
+            start = time.perf_counter()
+            contended = lock.locked()
+            async with lock:
+                waited = time.perf_counter() - start
+                self.turns += 1
+                if contended:
+                    self.waits += 1
+                    self.wait_seconds += waited
+                    self.max_wait_seconds = max(self.max_wait_seconds, waited)
+                yield waited
+        finally:
+            self._turns[session_id] -= 1
+            if not self._turns[session_id]:
+                del self._turns[session_id]
+                del self._locks[session_id]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Sessions with turns in progress, and how long turns waited for their session."""
+        return {
+            "active_sessions": len(self._turns),
+            "waiting_turns": sum(count - 1 for count in self._turns.values()),
+            "turns": self.turns,
+            "waited_turns": self.waits,
+            "avg_wait_ms": round(self.wait_seconds / self.waits * 1000, 1) if self.waits else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            "rejected": self.rejected,
+            "max_pending": self.max_pending,
+        }
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """
+    Create the session store selected in config.
+    
+    Args:
+        backend: "memory" or "sqlite". Defaults to config SESSION_STORE_BACKEND.
+    
+    Returns:
+        Session store bounded by SESSION_MAX_SESSIONS and SESSION_TTL_SECONDS.
+    """
+    backend = backend or SESSION_STORE_BACKEND
+    if backend == "memory":
+        return InMemorySessionStore(max_sessions=SESSION_MAX_SESSIONS, ttl_seconds=SESSION_TTL_SECONDS)
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            SESSION_STORE_PATH,
+            max_sessions=SESSION_MAX_SESSIONS,
+            ttl_seconds=SESSION_TTL_SECONDS,
+        )
+    raise ValueError(f"Unknown session store backend: {backend}. Use 'memory' or 'sqlite'")
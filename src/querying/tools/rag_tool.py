@@ -1,9 +1,7 @@
 """LangChain Tools for specialist agents."""
 
-from typing import List, Dict, Any, Optional, Union
-from langchain.agents import Tool
-from langchain_chroma import Chroma
-from langchain_community.vectorstores import FAISS
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union
+from langchain_core.tools import Tool
 try:
     from langchain_core.pydantic_v1 import BaseModel, Field
 except ImportError:
@@ -11,6 +9,10 @@ except ImportError:
 
 from config import MIN_SIMILARITY, DEFAULT_K
 
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_community.vectorstores import FAISS
+
 
 class RAGToolInput(BaseModel):
     """Input schema for RAG tool."""
@@ -21,7 +23,7 @@ def create_rag_tool(
     handbook_name: str,
     agent_name: str,
     description: str,
-    vector_store: Optional[Union[Chroma, FAISS]] = None,
+    vector_store: Optional[Union["Chroma", "FAISS"]] = None,
 ) -> Tool:
     """
     Create a RAG (Retrieval Augmented Generation) tool for a specialist agent.
@@ -119,7 +121,7 @@ def create_rag_tool(
 def get_rag_tools_for_agent(
     agent_name: str, 
     handbook_name: str,
-    vector_store: Optional[Union[Chroma, FAISS]] = None,
+    vector_store: Optional[Union["Chroma", "FAISS"]] = None,
 ) -> List[Tool]:
     """
     Get RAG tools for a specific agent.
@@ -1,24 +1,171 @@
 """Vector store manager for preloading and caching vector stores."""
 
-from typing import Dict, Optional, Union, List
-from langchain_chroma import Chroma
-from langchain_community.vectorstores import FAISS
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union, List, Tuple
 
-from indexing.embeddings import load_vector_store
+import numpy as np
+from langchain_core.documents import Document
+
+from config import UNIFIED_INDEX, UNIFIED_INDEX_NAME
+from indexing.embeddings import load_vector_store, get_query_embeddings_model, is_vector_store
+from indexing.numpy_store import NumpyVectorStore
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_community.vectorstores import FAISS
+
+
+def _handbook_filter(handbook_names: List[str]) -> Dict[str, Any]:
+    """Build a metadata filter matching one or more handbooks."""
+    if len(handbook_names) == 1:
+        return {"handbook": handbook_names[0]}
+    return {"handbook": {"$in": list(handbook_names)}}
+
+
+def _filtered_search_kwargs(store: Union["Chroma", "FAISS", NumpyVectorStore], handbook_names: List[str]) -> Dict[str, Any]:
+    """Search kwargs restricting a unified store to the given handbooks."""
+    kwargs: Dict[str, Any] = {"filter": _handbook_filter(handbook_names)}
+    if is_vector_store(store, "faiss"):
+        # FAISS filters after retrieving fetch_k candidates; scan the whole index
+        kwargs["fetch_k"] = store.index.ntotal
+    return kwargs
+
+
+def similarity_search_by_vector_with_score(
+    store,
+    embedding: List[float],
+    k: int = 4,
+    **kwargs,
+) -> List[Tuple[Document, float]]:
+    """
+    Search any supported vector store with a precomputed query embedding.
+    
+    Returns the same (document, distance) tuples as `similarity_search_with_score`,
+    so callers can embed a query once and reuse the vector across stores.
+    
+    Args:
+        store: Chroma, FAISS, NumpyVectorStore or HandbookStoreView instance
+        embedding: Query embedding
+        k: Number of documents to return
+        
+    Returns:
+        List of (document, distance) tuples, nearest first
+    """
+    if is_vector_store(store, "chroma"):
+        # Chroma's "relevance scores" for by-vector search are raw distances
+        return store.similarity_search_by_vector_with_relevance_scores(embedding, k=k, **kwargs)
+    return store.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)
+
+
+def get_store_embeddings(store, handbook_name: Optional[str] = None) -> np.ndarray:
+    """
+    Read every stored chunk embedding from a vector store.
+    
+    Args:
+        store: Chroma, FAISS, NumpyVectorStore or HandbookStoreView instance
+        handbook_name: Only return rows whose `handbook` metadata matches
+        
+    Returns:
+        float32 matrix with one row per chunk (may be empty)
+    """
+    if isinstance(store, HandbookStoreView):
+        return get_store_embeddings(store.store, store.handbook_name)
+    
+    if isinstance(store, NumpyVectorStore):
+        if handbook_name is None:
+            return np.asarray(store.matrix, dtype=np.float32)
+        rows = store._rows_for_value("handbook", handbook_name)
+        if rows.shape[0] and rows[-1] - rows[0] + 1 == rows.shape[0]:
+            # Contiguous rows (e.g., a shared index grouped by handbook) are a view, not a copy
+            return np.asarray(store.matrix[rows[0]:rows[-1] + 1], dtype=np.float32)
+        return np.asarray(store.matrix[rows], dtype=np.float32)
+    
+    if is_vector_store(store, "faiss"):
+        vectors = store.index.reconstruct_n(0, store.index.ntotal)
+        if handbook_name is None:
+            return np.asarray(vectors, dtype=np.float32)
+        rows = [
+            i for i, doc_id in store.index_to_docstore_id.items()
+            if store.docstore.search(doc_id).metadata.get("handbook") == handbook_name
+        ]
+        return np.asarray(vectors[rows], dtype=np.float32)
+    
+    where = {"handbook": handbook_name} if handbook_name else None
+    result = store._collection.get(include=["embeddings"], where=where)
+    embeddings = result.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+class HandbookStoreView:
+    """
+    Read-only view of a unified index restricted to one handbook.
+    
+    Exposes the same `similarity_search_with_score` interface as the
+    per-handbook stores, so agents work unchanged with either layout.
+    """
+    
+    def __init__(self, store: Union["Chroma", "FAISS", NumpyVectorStore], handbook_name: str):
+        self.store = store
+        self.handbook_name = handbook_name
+    
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        **kwargs,
+    ) -> List[Tuple[Document, float]]:
+        """Search the unified index, filtered to this view's handbook."""
+        kwargs.update(_filtered_search_kwargs(self.store, [self.handbook_name]))
+        return self.store.similarity_search_with_score(query, k=k, **kwargs)
+    
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        **kwargs,
+    ) -> List[Tuple[Document, float]]:
+        """Search the unified index by vector, filtered to this view's handbook."""
+        kwargs.update(_filtered_search_kwargs(self.store, [self.handbook_name]))
+        return similarity_search_by_vector_with_score(self.store, embedding, k=k, **kwargs)
 
 
 class VectorStoreManager:
     """Manages preloaded vector stores for all handbooks."""
     
-    def __init__(self, handbook_names: List[str]):
+    def __init__(
+        self,
+        handbook_names: List[str],
+        unified: Optional[bool] = None,
+        base_persist_directory: Optional[Path] = None,
+        version: Optional[str] = None,
+        vector_store_type: Optional[str] = None,
+    ):
         """
         Initialize and preload all vector stores.
         
         Args:
             handbook_names: List of handbook names to preload
+            unified: Load the single cross-handbook index instead of one store
+                     per handbook. Defaults to config UNIFIED_INDEX.
+            base_persist_directory: Directory of the index version to load.
+                                    Defaults to the current version.
+            version: Index version the stores belong to (for reporting)
+            vector_store_type: Backend of the stores (e.g., "numpy" for a shared
+                               index). Defaults to config VECTOR_STORE_TYPE.
         """
-        self._stores: Dict[str, Union[Chroma, FAISS]] = {}
-        self._preload_stores(handbook_names)
+        self.unified = UNIFIED_INDEX if unified is None else unified
+        self.base_persist_directory = base_persist_directory
+        self.version = version
+        self.vector_store_type = vector_store_type
+        self._stores: Dict[str, Union["Chroma", "FAISS", NumpyVectorStore, HandbookStoreView]] = {}
+        self._unified_store: Optional[Union["Chroma", "FAISS", NumpyVectorStore]] = None
+        
+        if self.unified:
+            self._preload_unified_store(handbook_names)
+        else:
+            self._preload_stores(handbook_names)
     
     def _preload_stores(self, handbook_names: List[str]):
         """Preload all vector stores."""
@@ -29,7 +176,11 @@ class VectorStoreManager:
         for handbook_name in handbook_names:
             try:
                 print(f"Loading vector store for {handbook_name}...")
-                store = load_vector_store(handbook_name)
+                store = load_vector_store(
+                    handbook_name,
+                    vector_store_type=self.vector_store_type,
+                    base_persist_directory=self.base_persist_directory,
+                )
                 self._stores[handbook_name] = store
                 print(f"✓ Loaded {handbook_name}")
             except Exception as e:
@@ -39,7 +190,30 @@ class VectorStoreManager:
         print(f"\n✓ Preloaded {len(self._stores)}/{len(handbook_names)} vector stores")
         print("=" * 60)
     
-    def get_store(self, handbook_name: str) -> Optional[Union[Chroma, FAISS]]:
+    def _preload_unified_store(self, handbook_names: List[str]):
+        """Preload the unified index and expose one filtered view per handbook."""
+        print("=" * 60)
+        print(f"Preloading unified vector store ({UNIFIED_INDEX_NAME})...")
+        print("=" * 60)
+        
+        try:
+            self._unified_store = load_vector_store(
+                UNIFIED_INDEX_NAME,
+                vector_store_type=self.vector_store_type,
+                base_persist_directory=self.base_persist_directory,
+            )
+        except Exception as e:
+            print(f"✗ Error loading {UNIFIED_INDEX_NAME}: {e}")
+            print("=" * 60)
+            return
+        
+        for handbook_name in handbook_names:
+            self._stores[handbook_name] = HandbookStoreView(self._unified_store, handbook_name)
+        
+        print(f"\n✓ Preloaded unified store serving {len(self._stores)} handbooks")
+        print("=" * 60)
+    
+    def get_store(self, handbook_name: str) -> Optional[Union["Chroma", "FAISS", NumpyVectorStore, HandbookStoreView]]:
         """
         Get a preloaded vector store.
         
@@ -59,3 +233,99 @@ class VectorStoreManager:
         """List all loaded vector store names."""
         return list(self._stores.keys())
 
+    def close(self):
+        """Release the stores (e.g., once a newer index version has replaced them)."""
+        stores = [self._unified_store] if self._unified_store is not None else list(self._stores.values())
+        for store in stores:
+            if is_vector_store(store, "chroma"):
+                try:
+                    store._client.close()
+                except Exception as e:
+                    print(f"Warning: Could not close Chroma client: {e}")
+        self._stores = {}
+        self._unified_store = None
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query once so the vector can be shared by every store search.
+        
+        Args:
+            query: User query
+            
+        Returns:
+            Query embedding
+        """
+        return get_query_embeddings_model().embed_query(query)
+    
+    async def aembed_query(self, query: str) -> List[float]:
+        """Async variant of `embed_query` (does not block the event loop)."""
+        return await get_query_embeddings_model().aembed_query(query)
+    
+    def search_handbooks(
+        self,
+        query: str,
+        handbook_names: List[str],
+        k: int,
+        query_embedding: Optional[List[float]] = None,
+    ) -> Dict[str, List[Tuple[Document, float]]]:
+        """
+        Search several handbooks and return the top k results for each.
+        
+        With the unified index this is a single search: the NumPy backend
+        scores every handbook in one matrix-vector product, while Chroma and
+        FAISS run one filtered query that ranks every candidate of the
+        requested handbooks (a few hundred chunks each), and the hits are
+        grouped by their `handbook` metadata. Without the unified index each
+        handbook store is searched in turn.
+        
+        Args:
+            query: User query
+            handbook_names: Handbooks to search
+            k: Number of results per handbook
+            query_embedding: Precomputed query embedding (the query is embedded if None)
+        
+        Returns:
+            Dict mapping handbook name to (document, distance) tuples
+        """
+        if not self.unified or self._unified_store is None:
+            results = {}
+            for handbook_name in handbook_names:
+                store = self._stores.get(handbook_name)
+                if store is None:
+                    continue
+                if query_embedding is not None:
+                    results[handbook_name] = similarity_search_by_vector_with_score(store, query_embedding, k=k)
+                else:
+                    results[handbook_name] = store.similarity_search_with_score(query, k=k)
+            return results
+        
+        store = self._unified_store
+        if isinstance(store, NumpyVectorStore):
+            embedding = query_embedding
+            if embedding is None:
+                embedding = store.embeddings.embed_query(query)
+            return store.grouped_similarity_search_with_score_by_vector(
+                embedding, group_key="handbook", groups=handbook_names, k=k
+            )
+        
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        
+        # Rank all candidates so that no handbook is crowded out by another
+        if is_vector_store(store, "faiss"):
+            candidate_count = store.index.ntotal
+        else:
+            candidate_count = store._collection.count()
+        
+        docs = similarity_search_by_vector_with_score(
+            store,
+            query_embedding,
+            k=max(candidate_count, k),
+            **_filtered_search_kwargs(store, handbook_names),
+        )
+        results: Dict[str, List[Tuple[Document, float]]] = {name: [] for name in handbook_names}
+        for doc, distance in docs:
+            handbook_results = results.get(doc.metadata.get("handbook"))
+            if handbook_results is not None and len(handbook_results) < k:
+                handbook_results.append((doc, distance))
+        return results
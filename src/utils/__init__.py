@@ -1,11 +1,54 @@
 """Utility functions package."""
 
-from .storage import save_chunks_to_jsonl, load_chunks_from_jsonl
-from .llm import initialize_llm
+from importlib import import_module
+
+from .storage import (
+    save_chunks_to_jsonl,
+    load_chunks_from_jsonl,
+    write_index_version,
+    read_index_version,
+    new_index_version,
+    index_version_dir,
+    resolve_index_dir,
+    publish_index_version,
+    prune_index_versions,
+)
+from .startup import StartupProfile, BackgroundInitializer
+
+# Imported on first access: langchain_openai is slow to import and most
+# importers of this package (e.g., the app module at startup) do not need it
+_LAZY_ATTRIBUTES = {
+    "ChunkStore": ".chunk_store",
+    "LazyDocuments": ".chunk_store",
+    "initialize_llm": ".llm",
+    "LLMClientRegistry": ".llm",
+    "get_client_registry": ".llm",
+    "get_langfuse_handler": ".llm",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "save_chunks_to_jsonl",
     "load_chunks_from_jsonl",
+    "write_index_version",
+    "read_index_version",
+    "new_index_version",
+    "index_version_dir",
+    "resolve_index_dir",
+    "publish_index_version",
+    "prune_index_versions",
+    "ChunkStore",
+    "LazyDocuments",
+    "StartupProfile",
+    "BackgroundInitializer",
     "initialize_llm",
+    "LLMClientRegistry",
+    "get_client_registry",
+    "get_langfuse_handler",
 ]
-
@@ -0,0 +1,260 @@
+"""Binary columnar chunk store: memory-mapped texts, metadata and embeddings with lookup by ID."""
+
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+from langchain_core.documents import Document
+
+from utils.storage import save_chunks_to_jsonl, load_chunks_from_jsonl
+
+HEADER_FILE = "chunk_store.json"
+TEXTS_FILE = "texts.bin"
+TEXT_OFFSETS_FILE = "text_offsets.npy"
+METADATA_FILE = "metadata.bin"
+METADATA_OFFSETS_FILE = "metadata_offsets.npy"
+IDS_FILE = "ids.npy"
+ID_ROWS_FILE = "id_rows.npy"
+EMBEDDINGS_FILE = "embeddings.npy"
+FORMAT_VERSION = 1
+
+
+def _replace_file(path: Path, write: Callable[[BinaryIO], None]):
+    """
+    Write a file under a temporary name, then move it into place.
+    
+    Replacing the file rather than truncating it keeps memory maps of the
+    previous version (e.g., in a serving process) valid.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _write_blob(path: Path, values: List[bytes]) -> np.ndarray:
+    """Write byte strings back to back and return their (n + 1) offsets."""
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    
+    def write(f):
+        for i, value in enumerate(values):
+            f.write(value)
+            offsets[i + 1] = offsets[i] + len(value)
+    
+    _replace_file(path, write)
+    return offsets
+
+
+def _save_array(path: Path, array: np.ndarray):
+    """Save a `.npy` file in place of any previous version."""
+    _replace_file(path, lambda f: np.save(f, array))
+
+
+def _map_blob(path: Path, mmap: bool) -> np.ndarray:
+    """Memory-map (or read) a blob file as bytes."""
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    if mmap:
+        return np.memmap(path, dtype=np.uint8, mode="r")
+    return np.fromfile(path, dtype=np.uint8)
+
+
+class LazyDocuments(Sequence):
+    """Read-only sequence that builds each Document from the chunk store when accessed."""
+    
+    def __init__(self, store: "ChunkStore"):
+        self._store = store
+    
+    def __len__(self) -> int:
+        return len(self._store)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Document, List[Document]]:
+        if isinstance(index, slice):
+            return [self._store.document(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return self._store.document(index)
+    
+    def __iter__(self) -> Iterator[Document]:
+        for i in range(len(self)):
+            yield self._store.document(i)
+    
+    def iter_metadata(self) -> Iterator[Dict[str, Any]]:
+        """Metadata of every chunk, without decoding the texts."""
+        for i in range(len(self)):
+            yield self._store.metadata(i)
+
+
+class ChunkStore:
+    """
+    Compact, memory-mapped store of chunks.
+    
+    A store is a directory of columns: the chunk texts as one UTF-8 blob with
+    an offset table, the metadata as a blob of JSON objects with its own
+    offset table, the chunk IDs as a sorted fixed-width array (looked up by
+    binary search) and, optionally, an embedding matrix aligned with the
+    chunks. Everything is memory-mapped on open, so opening is constant-time,
+    fetching one chunk only touches its own bytes, and several processes
+    share the same pages. Documents are built on access (see `documents`)
+    rather than all held in the Python heap.
+    
+    JSONL remains available as an export format (`export_jsonl`).
+    """
+    
+    def __init__(self, path: Path, mmap: bool = True):
+        """
+        Open a store written by `write`.
+        
+        Args:
+            path: Store directory.
+            mmap: Memory-map the columns read-only (default: True).
+        
+        Raises:
+            FileNotFoundError: If the directory does not contain a chunk store.
+            ValueError: If the store was written by an unsupported format version.
+        """
+        self.path = Path(path)
+        header_file = self.path / HEADER_FILE
+        if not header_file.exists():
+            raise FileNotFoundError(f"Chunk store not found in {self.path}")
+        with open(header_file, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported chunk store version: {header.get('version')}")
+        
+        mmap_mode = "r" if mmap else None
+        self._count = header["count"]
+        self._texts = _map_blob(self.path / TEXTS_FILE, mmap)
+        self._text_offsets = np.load(self.path / TEXT_OFFSETS_FILE, mmap_mode=mmap_mode)
+        self._metadata = _map_blob(self.path / METADATA_FILE, mmap)
+        self._metadata_offsets = np.load(self.path / METADATA_OFFSETS_FILE, mmap_mode=mmap_mode)
+        self._ids = np.load(self.path / IDS_FILE, mmap_mode=mmap_mode)
+        self._id_rows = np.load(self.path / ID_ROWS_FILE, mmap_mode=mmap_mode)
+        embeddings_file = self.path / EMBEDDINGS_FILE
+        self._embeddings = (
+            np.load(embeddings_file, mmap_mode=mmap_mode) if embeddings_file.exists() else None
+        )
+    
+    @classmethod
+    def write(
+        cls,
+        path: Path,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray] = None,
+        ids: Optional[List[str]] = None,
+    ) -> "ChunkStore":
+        """
+        Write documents (and optionally their embeddings) as a chunk store.
+        
+        Args:
+            path: Store directory (created if needed; existing columns are replaced).
+            documents: Chunks to store.
+            embeddings: Optional matrix with one row per document.
+            ids: Chunk IDs. Defaults to each document's `chunk_id` metadata,
+                 falling back to `{handbook}_{i}` like the JSONL files.
+        
+        Returns:
+            The store, opened memory-mapped.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        if embeddings is not None and len(embeddings) != len(documents):
+            raise ValueError(
+                f"Document count ({len(documents)}) does not match embedding rows ({len(embeddings)})"
+            )
+        if ids is None:
+            ids = [
+                doc.metadata.get("chunk_id") or f"{doc.metadata.get('handbook', 'unknown')}_{i}"
+                for i, doc in enumerate(documents)
+            ]
+        
+        text_offsets = _write_blob(path / TEXTS_FILE, [doc.page_content.encode("utf-8") for doc in documents])
+        metadata_offsets = _write_blob(
+            path / METADATA_FILE,
+            [json.dumps(doc.metadata, ensure_ascii=False).encode("utf-8") for doc in documents],
+        )
+        _save_array(path / TEXT_OFFSETS_FILE, text_offsets)
+        _save_array(path / METADATA_OFFSETS_FILE, metadata_offsets)
+        
+        # Sorted IDs with their rows, so an ID is found by binary search
+        encoded_ids = np.array([chunk_id.encode("utf-8") for chunk_id in ids], dtype=bytes)
+        order = np.argsort(encoded_ids, kind="stable")
+        _save_array(path / IDS_FILE, encoded_ids[order])
+        _save_array(path / ID_ROWS_FILE, order.astype(np.int64))
+        
+        embeddings_file = path / EMBEDDINGS_FILE
+        if embeddings is not None:
+            _save_array(embeddings_file, np.ascontiguousarray(embeddings, dtype=np.float32))
+        elif embeddings_file.exists():
+            embeddings_file.unlink()
+        
+        # The header is written last; a store without one is incomplete
+        header = {
+            "version": FORMAT_VERSION,
+            "count": len(documents),
+            "dimensions": int(embeddings.shape[1]) if embeddings is not None and len(embeddings) else None,
+        }
+        _replace_file(path / HEADER_FILE, lambda f: f.write(json.dumps(header).encode("utf-8")))
+        
+        return cls(path)
+    
+    @classmethod
+    def from_jsonl(cls, jsonl_file: Path, path: Path) -> "ChunkStore":
+        """Convert a chunks JSONL file into a chunk store."""
+        return cls.write(path, load_chunks_from_jsonl(jsonl_file))
+    
+    @staticmethod
+    def exists(path: Path) -> bool:
+        """Check if a directory holds a chunk store."""
+        return (Path(path) / HEADER_FILE).exists()
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def text(self, row: int) -> str:
+        """Text of the chunk at a row."""
+        start, end = self._text_offsets[row], self._text_offsets[row + 1]
+        return self._texts[start:end].tobytes().decode("utf-8")
+    
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """Metadata of the chunk at a row."""
+        start, end = self._metadata_offsets[row], self._metadata_offsets[row + 1]
+        return json.loads(self._metadata[start:end].tobytes().decode("utf-8"))
+    
+    def document(self, row: int) -> Document:
+        """Build the Document for the chunk at a row."""
+        return Document(page_content=self.text(row), metadata=self.metadata(row))
+    
+    def row(self, chunk_id: str) -> Optional[int]:
+        """Row of a chunk ID, or None if it is not in the store."""
+        if self._count == 0:
+            return None
+        key = np.array(chunk_id.encode("utf-8"), dtype=bytes)
+        position = int(np.searchsorted(self._ids, key))
+        if position < self._count and self._ids[position] == key:
+            return int(self._id_rows[position])
+        return None
+    
+    def get(self, chunk_id: str) -> Optional[Document]:
+        """Fetch a chunk by ID without reading any other chunk."""
+        row = self.row(chunk_id)
+        return None if row is None else self.document(row)
+    
+    @property
+    def documents(self) -> LazyDocuments:
+        """All chunks as a lazily built, read-only sequence of Documents."""
+        return LazyDocuments(self)
+    
+    @property
+    def embeddings(self) -> Optional[np.ndarray]:
+        """Embedding matrix aligned with the rows (read-only when memory-mapped), if stored."""
+        return self._embeddings
+    
+    def export_jsonl(self, output_file: Path):
+        """Export the chunks (without embeddings) in the JSONL format of `save_chunks_to_jsonl`."""
+        save_chunks_to_jsonl(list(self.documents), Path(output_file))
@@ -1,11 +1,362 @@
-"""Utility functions for LLM initialization."""
+"""Utility functions for LLM initialization, and the shared, pooled LLM and embedding clients."""
 
+import asyncio
 import os
-from typing import Optional, List
+import threading
+import weakref
+from typing import Any, Dict, Iterator, AsyncIterator, Optional, Tuple
 
-from langchain_openai import ChatOpenAI
+import httpx
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langfuse.langchain import CallbackHandler
 
+from config import (
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_HTTP_KEEPALIVE_SECONDS,
+    LLM_HTTP_TIMEOUT_SECONDS,
+)
+
+
+class PoolUsage:
+    """
+    Connection usage of one HTTP client.
+    
+    A request is in flight from when it is sent until its response body is
+    closed (streamed responses included). Beyond `max_connections` in-flight
+    requests the pool is saturated: the extra requests wait for a connection
+    to be released, and are counted as saturated.
+    """
+    
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.saturated = 0
+    
+    def start(self):
+        """Record a request being sent."""
+        with self._lock:
+            if self.in_flight >= self.max_connections:
+                self.saturated += 1
+            self.in_flight += 1
+            self.requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    def finish(self):
+        """Record a request releasing its connection."""
+        with self._lock:
+            self.in_flight -= 1
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Requests in flight (now and at peak), and how many found the pool full."""
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": max(self.in_flight - self.max_connections, 0),
+                "peak_in_flight": self.peak_in_flight,
+                "peak_utilization": round(min(self.peak_in_flight / self.max_connections, 1.0), 3),
+                "requests": self.requests,
+                "saturated_requests": self.saturated,
+            }
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    """Response body that reports to its PoolUsage once closed."""
+    
+    def __init__(self, stream: httpx.SyncByteStream, usage: PoolUsage):
+        self._stream = stream
+        self._usage = usage
+        self._closed = False
+    
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+    
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._usage.finish()
+
+
+class _AsyncTrackedStream(httpx.AsyncByteStream):
+    """Async response body that reports to its PoolUsage once closed."""
+    
+    def __init__(self, stream: httpx.AsyncByteStream, usage: PoolUsage):
+        self._stream = stream
+        self._usage = usage
+        self._closed = False
+    
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+    
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._usage.finish()
+
+
+class _TrackedTransport(httpx.BaseTransport):
+    """Pooled transport that records connection usage."""
+    
+    def __init__(self, transport: httpx.BaseTransport, usage: PoolUsage):
+        self._transport = transport
+        self._usage = usage
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._usage.start()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self._usage.finish()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self._usage),
+            extensions=response.extensions,
+        )
+    
+    def close(self):
+        self._transport.close()
+
+
+class _AsyncTrackedTransport(httpx.AsyncBaseTransport):
+    """
+    Async pooled transport that records connection usage.
+    
+    Connections belong to the event loop that opened them, so each loop
+    (e.g., the server's and an indexing run's `asyncio.run`) gets its own
+    pool with the same limits.
+    """
+    
+    def __init__(self, limits: httpx.Limits, usage: PoolUsage):
+        self._limits = limits
+        self._usage = usage
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+    
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = self._transports[loop] = httpx.AsyncHTTPTransport(limits=self._limits)
+        return transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = self._transport()
+        self._usage.start()
+        try:
+            response = await transport.handle_async_request(request)
+        except BaseException:
+            self._usage.finish()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_AsyncTrackedStream(response.stream, self._usage),
+            extensions=response.extensions,
+        )
+    
+    async def aclose(self):
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class LLMClientRegistry:
+    """
+    Process-wide chat and embedding clients sharing one pooled HTTP client.
+    
+    Chat clients are created once per (model, temperature, base URL, API
+    key) and embedding clients once per (model, base URL, API key), so
+    callers with different credentials never share a client. Every client
+    sends its requests through the same sync and async `httpx` clients, so
+    keep-alive connections to the provider are reused across agents, the
+    router, the evaluator and query embedding instead of each client
+    opening its own pool. Thread-safe.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_seconds: float = LLM_HTTP_KEEPALIVE_SECONDS,
+        timeout_seconds: float = LLM_HTTP_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize the registry (HTTP clients are created on first use).
+        
+        Args:
+            max_connections: Maximum concurrent connections per HTTP client.
+            max_keepalive_connections: Idle connections kept open for reuse.
+            keepalive_seconds: How long an idle connection is kept open.
+            timeout_seconds: Request timeout.
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_seconds,
+        )
+        self.timeout = httpx.Timeout(timeout_seconds)
+        self.sync_usage = PoolUsage(max_connections)
+        self.async_usage = PoolUsage(max_connections)
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self._chat_models: Dict[Tuple, ChatOpenAI] = {}
+        self._embeddings: Dict[Tuple, OpenAIEmbeddings] = {}
+    
+    @property
+    def http_client(self) -> httpx.Client:
+        """Shared pooled HTTP client for sync requests."""
+        with self._lock:
+            if self._http_client is None:
+                transport = httpx.HTTPTransport(limits=self.limits)
+                self._http_client = httpx.Client(
+                    transport=_TrackedTransport(transport, self.sync_usage),
+                    timeout=self.timeout,
+                )
+            return self._http_client
+    
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client for async requests."""
+        with self._lock:
+            if self._async_http_client is None:
+                self._async_http_client = httpx.AsyncClient(
+                    transport=_AsyncTrackedTransport(self.limits, self.async_usage),
+                    timeout=self.timeout,
+                )
+            return self._async_http_client
+    
+    def chat_model(
+        self,
+        model: str,
+        temperature: float = 0.0,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ) -> ChatOpenAI:
+        """
+        Get the shared chat client for a model and temperature.
+        
+        Args:
+            model: LLM model name (e.g., "gpt-4o-mini")
+            temperature: Sampling temperature
+            api_key: API key. If None, the client reads OPENAI_API_KEY.
+            base_url: OpenAI-compatible endpoint (e.g., OpenRouter). If None, OpenAI.
+        
+        Returns:
+            Shared ChatOpenAI instance (without callbacks; bind them per use).
+        """
+        key = (model, temperature, base_url, api_key)
+        with self._lock:
+            llm = self._chat_models.get(key)
+        if llm is not None:
+            return llm
+        
+        kwargs: Dict[str, Any] = {}
+        if base_url:
+            kwargs.update(openai_api_key=api_key, openai_api_base=base_url)
+        elif api_key:
+            kwargs.update(openai_api_key=api_key)
+        llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            http_client=self.http_client,
+            http_async_client=self.async_http_client,
+            **kwargs,
+        )
+        with self._lock:
+            return self._chat_models.setdefault(key, llm)
+    
+    def embeddings(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ) -> OpenAIEmbeddings:
+        """
+        Get the shared embeddings client for a model.
+        
+        Args:
+            model: Embedding model name
+            api_key: API key. If None, the client reads OPENAI_API_KEY.
+            base_url: OpenAI-compatible endpoint. If None, OpenAI.
+        
+        Returns:
+            Shared OpenAIEmbeddings instance.
+        """
+        key = (model, base_url, api_key)
+        with self._lock:
+            embeddings = self._embeddings.get(key)
+        if embeddings is not None:
+            return embeddings
+        
+        kwargs: Dict[str, Any] = {}
+        if base_url:
+            kwargs.update(openai_api_key=api_key, openai_api_base=base_url)
+        elif api_key:
+            kwargs.update(openai_api_key=api_key)
+        embeddings = OpenAIEmbeddings(
+            model=model,
+            http_client=self.http_client,
+            http_async_client=self.async_http_client,
+            **kwargs,
+        )
+        with self._lock:
+            return self._embeddings.setdefault(key, embeddings)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Shared clients and connection pool usage (sync and async)."""
+        with self._lock:
+            chat_models = sorted({f"{key[0]}@{key[1]}" for key in self._chat_models})
+            embedding_models = sorted({key[0] for key in self._embeddings})
+        return {
+            "chat_models": chat_models,
+            "embedding_models": embedding_models,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "sync_pool": self.sync_usage.as_dict(),
+            "async_pool": self.async_usage.as_dict(),
+        }
+
+
+_client_registry: Optional[LLMClientRegistry] = None
+_langfuse_handler: Optional[CallbackHandler] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Get the process-wide client registry (created on first use)."""
+    global _client_registry
+    with _registry_lock:
+        if _client_registry is None:
+            _client_registry = LLMClientRegistry()
+        return _client_registry
+
+
+def get_langfuse_handler() -> CallbackHandler:
+    """
+    Get the shared Langfuse callback handler.
+    
+    The handler keeps its state per run, so one instance traces every agent.
+    CallbackHandler reads its settings from environment variables.
+    """
+    global _langfuse_handler
+    with _registry_lock:
+        if _langfuse_handler is None:
+            _langfuse_handler = CallbackHandler()
+        return _langfuse_handler
+
 
 def initialize_llm(
     model: str,
@@ -13,21 +364,22 @@ def initialize_llm(
     temperature: float = 0.0,
     api_key: Optional[str] = None,
     base_url: Optional[str] = None,
-) -> ChatOpenAI:
+) -> Runnable:
     """
-    Initialize a ChatOpenAI LLM instance with Langfuse instrumentation.
+    Get an LLM with Langfuse instrumentation, backed by the shared client registry.
     
     Supports both OpenAI and OpenRouter (via OPENAI_API_BASE).
     
     Args:
         model: LLM model name (e.g., "gpt-4o-mini")
-        langfuse_handler: Optional Langfuse callback handler. If None, creates a new one.
+        langfuse_handler: Optional Langfuse callback handler. Defaults to the shared one.
         temperature: Temperature for the LLM (default: 0.0)
         api_key: Optional API key. If None, reads from OPENAI_API_KEY env var.
         base_url: Optional base URL. If None, reads from OPENAI_API_BASE env var.
     
     Returns:
-        Initialized ChatOpenAI instance.
+        The shared ChatOpenAI client for (model, temperature, base_url), bound
+        to the Langfuse handler.
     
     Raises:
         ValueError: If OPENAI_API_KEY is not found.
@@ -45,28 +397,8 @@ def initialize_llm(
     if base_url is None:
         base_url = os.getenv("OPENAI_API_BASE")
     
-    # Initialize Langfuse handler if not provided
-    # CallbackHandler reads from environment variables automatically
     if langfuse_handler is None:
-        langfuse_handler = CallbackHandler()
-    
-    # Initialize LLM
-    if base_url:
-        # Using OpenRouter or custom OpenAI-compatible endpoint
-        llm = ChatOpenAI(
-            model=model,
-            openai_api_key=api_key,
-            openai_api_base=base_url,
-            callbacks=[langfuse_handler],
-            temperature=temperature,
-        )
-    else:
-        # Using standard OpenAI API
-        llm = ChatOpenAI(
-            model=model,
-            callbacks=[langfuse_handler],
-            temperature=temperature,
-        )
+        langfuse_handler = get_langfuse_handler()
     
-    return llm
-
+    llm = get_client_registry().chat_model(model, temperature=temperature, api_key=api_key, base_url=base_url)
+    return llm.with_config(callbacks=[langfuse_handler])
@@ -0,0 +1,117 @@
+"""Startup profiling and background initialization of slow-to-build services."""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class StartupProfile:
+    """
+    Wall-clock profile of process startup.
+    
+    Steps are recorded as laps: `lap(name)` stores the time elapsed since the
+    previous lap (or since the profile was created), so a constructor can be
+    profiled by calling `lap` after each component without restructuring it.
+    """
+    
+    def __init__(self, started: Optional[float] = None):
+        """
+        Initialize the profile.
+        
+        Args:
+            started: `time.perf_counter()` value to measure from (e.g., taken
+                     before the first import). Defaults to now.
+        """
+        self.started = time.perf_counter() if started is None else started
+        self._last = self.started
+        self.steps: Dict[str, float] = {}
+        self.ready_ms: Optional[float] = None
+    
+    def lap(self, name: str) -> float:
+        """
+        Record the time since the previous lap under `name`.
+        
+        Returns:
+            Duration of the step in milliseconds.
+        """
+        now = time.perf_counter()
+        elapsed_ms = round((now - self._last) * 1000, 1)
+        self.steps[name] = self.steps.get(name, 0.0) + elapsed_ms
+        self._last = now
+        return elapsed_ms
+    
+    def restart(self):
+        """Start the next lap now (e.g., when work resumes on another thread)."""
+        self._last = time.perf_counter()
+    
+    def mark_ready(self):
+        """Record the time from process start until the service is ready."""
+        self.ready_ms = round((time.perf_counter() - self.started) * 1000, 1)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Steps (ms) in the order they ran, plus the time to ready."""
+        return {"steps_ms": dict(self.steps), "ready_ms": self.ready_ms}
+
+
+class BackgroundInitializer:
+    """
+    Build a service in a worker thread while the event loop keeps serving.
+    
+    `start()` schedules the build; `await get()` returns the service, waiting
+    for the build if it is still running (and starting it if `start()` was
+    never called). A failed build is reported by `status()` and re-raised by
+    `get()`.
+    """
+    
+    def __init__(self, factory: Callable[[], Any], name: str = "service"):
+        """
+        Initialize the initializer.
+        
+        Args:
+            factory: Builds the service (runs in a worker thread).
+            name: Name used in log messages.
+        """
+        self.factory = factory
+        self.name = name
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start building the service (must be called from the event loop)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def _run(self):
+        try:
+            self.value = await asyncio.to_thread(self.factory)
+        except Exception as e:
+            self.error = e
+            print(f"✗ Failed to initialize {self.name}: {e}")
+    
+    @property
+    def ready(self) -> bool:
+        """Whether the service has been built."""
+        return self._task is not None and self._task.done() and self.error is None
+    
+    async def get(self) -> Any:
+        """
+        Return the service, waiting for it to be built.
+        
+        Raises:
+            Exception: The error raised by the factory if the build failed.
+        """
+        self.start()
+        # Shielded so a cancelled request does not cancel the build
+        await asyncio.shield(self._task)
+        if self.error is not None:
+            raise self.error
+        return self.value
+    
+    def status(self) -> str:
+        """Build state: pending, starting, ready or failed."""
+        if self._task is None:
+            return "pending"
+        if not self._task.done():
+            return "starting"
+        return "failed" if self.error is not None else "ready"
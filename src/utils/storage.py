@@ -1,8 +1,20 @@
-"""File operations for saving and loading chunks to/from JSONL."""
+"""
+File operations for chunks and versioned vector store directories.
+
+Chunks are saved to and loaded from JSONL. Each index build writes a new
+version directory (`new_index_version`, `index_version_dir`) and publishes it
+by atomically updating the version pointer (`publish_index_version`); readers
+find the served version with `resolve_index_dir` / `read_index_version`, and
+old versions are deleted with `prune_index_versions`.
+"""
 
 import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from langchain_core.documents import Document
 
@@ -20,7 +32,7 @@ def save_chunks_to_jsonl(chunks: List[Document], output_file: Path):
     with open(output_file, "w", encoding="utf-8") as f:
         for i, chunk in enumerate(chunks):
             record = {
-                "id": f"{chunk.metadata.get('handbook', 'unknown')}_{i}",
+                "id": chunk.metadata.get("chunk_id") or f"{chunk.metadata.get('handbook', 'unknown')}_{i}",
                 "text": chunk.page_content,
                 "metadata": chunk.metadata
             }
@@ -52,3 +64,125 @@ def load_chunks_from_jsonl(input_file: Path) -> List[Document]:
     
     return chunks
 
+
+INDEX_VERSION_FILE = "INDEX_VERSION"
+CURRENT_INDEX_FILE = "CURRENT"
+INDEX_VERSIONS_DIR = "versions"
+
+
+def new_index_version() -> str:
+    """Create a build version string (UTC timestamp plus a random suffix, sortable by time)."""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:8]}"
+
+
+def write_index_version(vector_store_dir: Path, version: Optional[str] = None) -> str:
+    """
+    Stamp a vector store directory with a new build version.
+    
+    Called at the end of every index build so that anything derived from the
+    previous index (e.g., cached answers) can detect the rebuild.
+    
+    Args:
+        vector_store_dir: Root directory of the vector stores (or of one index version).
+        version: Version to write. Defaults to a new version string.
+    
+    Returns:
+        The version string.
+    """
+    version = version or new_index_version()
+    vector_store_dir.mkdir(parents=True, exist_ok=True)
+    (vector_store_dir / INDEX_VERSION_FILE).write_text(version + "\n", encoding="utf-8")
+    return version
+
+
+def read_index_version(vector_store_dir: Path) -> Optional[str]:
+    """
+    Read the build version of a vector store directory.
+    
+    For a versioned root (see `publish_index_version`) this is the version
+    CURRENT points to.
+    
+    Args:
+        vector_store_dir: Root directory of the vector stores (or of one index version).
+    
+    Returns:
+        The version string, or None if the index predates versioning.
+    """
+    for file_name in (CURRENT_INDEX_FILE, INDEX_VERSION_FILE):
+        try:
+            return (vector_store_dir / file_name).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def index_version_dir(vector_store_dir: Path, version: str) -> Path:
+    """Directory holding the stores of one index version."""
+    return vector_store_dir / INDEX_VERSIONS_DIR / version
+
+
+def resolve_index_dir(vector_store_dir: Path) -> Tuple[Path, Optional[str]]:
+    """
+    Find the directory of the index to serve.
+    
+    Indexes built as versions are served from `versions/<CURRENT>/`; an index
+    built before versioning is served from the root directory itself.
+    
+    Args:
+        vector_store_dir: Root directory of the vector stores.
+    
+    Returns:
+        (directory holding the stores, version string or None)
+    """
+    try:
+        current = (vector_store_dir / CURRENT_INDEX_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        current = ""
+    if current:
+        return index_version_dir(vector_store_dir, current), current
+    return vector_store_dir, read_index_version(vector_store_dir)
+
+
+def publish_index_version(vector_store_dir: Path, version: str):
+    """
+    Point CURRENT at a fully built index version.
+    
+    The pointer file is replaced atomically, so readers see either the old
+    or the new version, never a partial write.
+    
+    Args:
+        vector_store_dir: Root directory of the vector stores.
+        version: Version directory (under `versions/`) to serve from now on.
+    """
+    tmp = vector_store_dir / f"{CURRENT_INDEX_FILE}.tmp"
+    tmp.write_text(version + "\n", encoding="utf-8")
+    os.replace(tmp, vector_store_dir / CURRENT_INDEX_FILE)
+
+
+def prune_index_versions(vector_store_dir: Path, keep: int) -> List[str]:
+    """
+    Delete old index versions, keeping the current one and the newest others.
+    
+    Older versions are kept for a while because servers still serve from
+    them until they have loaded the current version.
+    
+    Args:
+        vector_store_dir: Root directory of the vector stores.
+        keep: Number of versions to keep, including the current one.
+    
+    Returns:
+        The deleted versions.
+    """
+    versions_dir = vector_store_dir / INDEX_VERSIONS_DIR
+    if not versions_dir.exists():
+        return []
+    current = read_index_version(vector_store_dir)
+    others = sorted(
+        (path for path in versions_dir.iterdir() if path.is_dir() and path.name != current),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    deleted = [path.name for path in others[max(keep - 1, 0):]]
+    for version in deleted:
+        shutil.rmtree(versions_dir / version, ignore_errors=True)
+    return deleted
@@ -0,0 +1,7 @@
+"""Shared pytest setup: make the `src` packages importable."""
+
+import sys
+from pathlib import Path
+
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
@@ -0,0 +1,69 @@
+"""Tests for the binary columnar ChunkStore."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from utils.chunk_store import ChunkStore
+
+DOCUMENTS = [
+    Document(page_content="Expenses are reimbursed monthly.", metadata={"handbook": "finance", "chunk_id": "finance_b"}),
+    Document(page_content="Congés: 25 jours — ünïcode", metadata={"handbook": "hr", "chunk_id": "hr_a"}),
+    Document(page_content="", metadata={"handbook": "general", "chunk_id": "general_c"}),
+]
+
+
+def test_roundtrip_and_lookup_by_id(tmp_path):
+    embeddings = np.arange(6, dtype=np.float64).reshape(3, 2)
+    ChunkStore.write(tmp_path, DOCUMENTS, embeddings=embeddings)
+    
+    store = ChunkStore(tmp_path)
+    
+    assert len(store) == 3
+    assert list(store.documents) == DOCUMENTS
+    assert store.documents[-1] == DOCUMENTS[2]
+    assert store.documents[1:] == DOCUMENTS[1:]
+    assert store.get("hr_a") == DOCUMENTS[1]
+    assert store.row("finance_b") == 0
+    assert store.get("missing") is None
+    assert store.embeddings.dtype == np.float32
+    np.testing.assert_array_equal(store.embeddings, embeddings)
+    assert list(store.documents.iter_metadata())[1] == DOCUMENTS[1].metadata
+
+
+def test_rewrite_replaces_columns_and_drops_embeddings(tmp_path):
+    ChunkStore.write(tmp_path, DOCUMENTS, embeddings=np.zeros((3, 2)))
+    old = ChunkStore(tmp_path)
+    
+    store = ChunkStore.write(tmp_path, DOCUMENTS[:1])
+    
+    assert len(store) == 1
+    assert store.embeddings is None
+    assert store.get("hr_a") is None
+    # Memory maps of the previous version stay readable
+    assert old.get("hr_a") == DOCUMENTS[1]
+
+
+def test_default_ids_and_empty_store(tmp_path):
+    documents = [Document(page_content="Text", metadata={"handbook": "finance"})]
+    assert ChunkStore.write(tmp_path / "one", documents).get("finance_0") == documents[0]
+    
+    empty = ChunkStore.write(tmp_path / "empty", [])
+    assert len(empty) == 0
+    assert empty.get("finance_0") is None
+
+
+def test_jsonl_roundtrip(tmp_path):
+    ChunkStore.write(tmp_path / "store", DOCUMENTS).export_jsonl(tmp_path / "chunks.jsonl")
+    
+    store = ChunkStore.from_jsonl(tmp_path / "chunks.jsonl", tmp_path / "copy")
+    
+    assert [doc.page_content for doc in store.documents] == [doc.page_content for doc in DOCUMENTS]
+
+
+def test_invalid_stores_are_rejected(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ChunkStore(tmp_path)
+    with pytest.raises(ValueError):
+        ChunkStore.write(tmp_path, DOCUMENTS, embeddings=np.zeros((2, 2)))
+    assert not ChunkStore.exists(tmp_path)
@@ -0,0 +1,73 @@
+"""Tests for the micro-batching query embedding dispatcher."""
+
+import asyncio
+import threading
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from indexing.embedding_batcher import BatchingEmbeddings
+
+
+class RecordingEmbeddings(Embeddings):
+    """Embeds a text as [len(text)] and records every batch it receives."""
+    
+    def __init__(self, fail: bool = False):
+        self.batches: List[List[str]] = []
+        self.fail = fail
+        self._lock = threading.Lock()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding service unavailable")
+        return [[float(len(text))] for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_request():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_wait_ms=50, max_batch_size=16)
+    
+    texts = ["a", "bb", "ccc", "bb"]
+    vectors = await asyncio.gather(*(batcher.aembed_query(text) for text in texts))
+    
+    assert vectors == [[1.0], [2.0], [3.0], [2.0]]
+    assert len(inner.batches) == 1
+    # Identical texts in one batch are embedded once
+    assert sorted(inner.batches[0]) == ["a", "bb", "ccc"]
+    assert batcher.stats()["requests"] == 4
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch_size():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_wait_ms=50, max_batch_size=2)
+    
+    await asyncio.gather(*(batcher.aembed_query("q" * n) for n in range(1, 6)))
+    
+    assert all(len(batch) <= 2 for batch in inner.batches)
+    assert sum(len(batch) for batch in inner.batches) == 5
+    assert batcher.stats()["largest_batch"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_every_caller():
+    batcher = BatchingEmbeddings(RecordingEmbeddings(fail=True), max_wait_ms=20)
+    
+    results = await asyncio.gather(
+        batcher.aembed_query("a"), batcher.aembed_query("b"), return_exceptions=True
+    )
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_sync_embed_query_waits_for_its_batch():
+    batcher = BatchingEmbeddings(RecordingEmbeddings(), max_wait_ms=1)
+    
+    assert batcher.embed_query("four") == [4.0]
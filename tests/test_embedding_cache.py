@@ -0,0 +1,93 @@
+"""Tests for the query embedding cache (in-memory LRU plus SQLite tier)."""
+
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+import indexing.embeddings as embeddings_module
+from indexing.embedding_cache import QueryEmbeddingCache, CachedQueryEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that count how often they are called."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        return [float(len(text)), 1.0]
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = QueryEmbeddingCache(max_size=2)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    assert cache.get("m", "a") == [1.0]
+    cache.put("m", "c", [3.0])
+    
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.get("m", "c") == [3.0]
+
+
+def test_keys_use_normalized_text_and_model():
+    cache = QueryEmbeddingCache(max_size=4)
+    cache.put("m", "  How do I Reset my password? ", [1.0])
+    
+    assert cache.get("m", "how do i reset my password?") == [1.0]
+    assert cache.get("other-model", "how do i reset my password?") is None
+
+
+def test_persistent_tier_survives_restart_and_is_promoted(tmp_path):
+    path = tmp_path / "queries.sqlite3"
+    QueryEmbeddingCache(max_size=4, persistent_path=path).put("m", "q", [0.5, 0.5])
+    
+    cache = QueryEmbeddingCache(max_size=4, persistent_path=path)
+    assert cache.get("m", "q") == [0.5, 0.5]
+    assert cache.get("m", "q") == [0.5, 0.5]
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_use_both_tiers(tmp_path):
+    path = tmp_path / "queries.sqlite3"
+    cache = QueryEmbeddingCache(max_size=4, persistent_path=path)
+    await cache.aput("m", "q", [1.0, 2.0])
+    
+    assert await cache.aget("m", "q") == [1.0, 2.0]
+    restarted = QueryEmbeddingCache(max_size=4, persistent_path=path)
+    assert await restarted.aget("m", "q") == [1.0, 2.0]
+    assert await restarted.aget("m", "missing") is None
+    assert restarted.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_query_embeddings_embed_once():
+    inner = CountingEmbeddings()
+    embeddings = CachedQueryEmbeddings(inner, QueryEmbeddingCache(max_size=4), model="m")
+    
+    first = await embeddings.aembed_query("refund policy")
+    second = await embeddings.aembed_query("Refund policy")
+    
+    assert first == second
+    assert inner.calls == 1
+
+
+def test_disabled_cache_does_not_touch_disk(tmp_path, monkeypatch):
+    path = tmp_path / "queries.sqlite3"
+    monkeypatch.setattr(embeddings_module, "QUERY_EMBEDDING_CACHE_SIZE", 0)
+    monkeypatch.setattr(embeddings_module, "QUERY_EMBEDDING_CACHE_PATH", path)
+    monkeypatch.setattr(embeddings_module, "_query_embedding_cache", None)
+    
+    assert embeddings_module.get_query_embedding_cache() is None
+    assert not path.exists()
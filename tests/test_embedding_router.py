@@ -0,0 +1,78 @@
+"""Tests for the embedding router's scoring and its margin/threshold decisions."""
+
+from typing import Dict
+
+import numpy as np
+from langchain_core.documents import Document
+
+from indexing.numpy_store import NumpyVectorStore
+from querying.agents.embedding_router import EmbeddingRouter
+
+
+class FakeStoreManager:
+    """Stands in for VectorStoreManager: one NumPy store per handbook."""
+    
+    def __init__(self, stores: Dict[str, NumpyVectorStore]):
+        self._stores = stores
+    
+    def get_store(self, handbook_name: str):
+        return self._stores.get(handbook_name)
+
+
+def _store(rows) -> NumpyVectorStore:
+    matrix = np.asarray(rows, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    documents = [Document(page_content=f"chunk {i}") for i in range(len(rows))]
+    return NumpyVectorStore(embedding=None, documents=documents, matrix=matrix)
+
+
+def _router(**kwargs) -> EmbeddingRouter:
+    manager = FakeStoreManager({
+        "finance_handbook": _store([[1.0, 0.0, 0.0], [0.9, 0.1, 0.0]]),
+        "tech_handbook": _store([[0.0, 1.0, 0.0], [0.1, 0.9, 0.0]]),
+    })
+    return EmbeddingRouter(
+        manager,
+        {"finance": "finance_handbook", "tech": "tech_handbook"},
+        top_m=2,
+        **kwargs,
+    )
+
+
+def test_scores_are_mean_of_top_m_similarities():
+    router = _router(margin=0.1, min_similarity=0.5)
+    scores = router.score([1.0, 0.0, 0.0])
+    
+    assert scores["finance"] > 0.99
+    assert scores["tech"] < 0.1
+
+
+def test_clear_winner_is_routed_without_llm():
+    router = _router(margin=0.1, min_similarity=0.5)
+    result = router.route([1.0, 0.05, 0.0])
+    
+    assert result["agents"] == ["finance"]
+    assert result["requires_multiple_agents"] is False
+    assert result["router"] == "embedding"
+    assert router.stats()["decided"] == 1
+
+
+def test_ambiguous_query_is_deferred():
+    router = _router(margin=0.1, min_similarity=0.5)
+    
+    assert router.route([1.0, 1.0, 0.0]) is None
+    assert router.stats()["deferred_to_llm"] == 1
+
+
+def test_low_similarity_is_deferred_even_with_a_margin():
+    router = _router(margin=0.01, min_similarity=0.99)
+    
+    assert router.route([1.0, 0.2, 1.0]) is None
+
+
+def test_router_needs_two_agents():
+    manager = FakeStoreManager({"finance_handbook": _store([[1.0, 0.0]])})
+    router = EmbeddingRouter(manager, {"finance": "finance_handbook", "tech": "tech_handbook"})
+    
+    assert not router.ready
+    assert router.route([1.0, 0.0]) is None
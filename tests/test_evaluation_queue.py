@@ -0,0 +1,85 @@
+"""Tests for the background EvaluationQueue."""
+
+import asyncio
+
+import pytest
+
+from evaluation.evaluation_queue import EvaluationQueue
+from evaluation.langfuse_evaluator import QualityScore
+
+
+class FakeEvaluator:
+    """Scores every response 8 (or fails), recording uploaded batches."""
+    
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.fail = fail
+        self.delay = delay
+        self.batches = []
+    
+    async def aevaluate_response(self, query, response, trace_id=None, store_score=True):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return QualityScore(score=0.0, reasoning="", dimensions={}, error="judge unavailable")
+        return QualityScore(score=8.0, reasoning="Grounded", dimensions={"accuracy": 8.0})
+    
+    def store_scores(self, scores):
+        self.batches.append(list(scores))
+
+
+@pytest.mark.asyncio
+async def test_completed_scores_are_uploaded_in_a_batch():
+    evaluator = FakeEvaluator()
+    queue = EvaluationQueue(evaluator, workers=2, flush_interval_seconds=60)
+    
+    evaluation_ids = [queue.submit(f"Question {i}", "Answer", trace_id=f"trace-{i}") for i in range(3)]
+    assert queue.get_result(evaluation_ids[0]) == {"status": "pending"}
+    await queue.aclose()
+    
+    assert all(queue.get_result(evaluation_id)["quality_score"] == 8.0 for evaluation_id in evaluation_ids)
+    assert len(evaluator.batches) == 1
+    assert sorted(trace_id for _, trace_id in evaluator.batches[0]) == ["trace-0", "trace-1", "trace-2"]
+    assert queue.stats()["completed"] == 3
+    assert queue.stats()["uploaded"] == 3
+
+
+@pytest.mark.asyncio
+async def test_judge_errors_are_recorded_as_failed():
+    evaluator = FakeEvaluator(fail=True)
+    queue = EvaluationQueue(evaluator, flush_interval_seconds=60)
+    
+    evaluation_id = queue.submit("Question", "Answer")
+    await queue.aclose()
+    
+    assert queue.get_result(evaluation_id) == {"status": "failed", "error": "judge unavailable"}
+    assert evaluator.batches == []
+    assert queue.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_submissions_beyond_max_size_are_dropped():
+    queue = EvaluationQueue(FakeEvaluator(delay=0.01), max_size=2, workers=1, flush_interval_seconds=60)
+    
+    evaluation_ids = [queue.submit("Question", "Answer") for _ in range(4)]
+    await queue.aclose()
+    
+    assert evaluation_ids[2:] == [None, None]
+    assert queue.stats()["dropped"] == 2
+    assert queue.stats()["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unsampled_responses_are_not_queued():
+    queue = EvaluationQueue(FakeEvaluator(), sample_rate=0.0)
+    
+    assert queue.submit("Question", "Answer") is None
+    assert queue.stats()["sampled_out"] == 1
+    await queue.aclose()
+
+
+def test_results_are_bounded():
+    queue = EvaluationQueue(FakeEvaluator(), max_results=2)
+    for evaluation_id in ("a", "b", "c"):
+        queue._set_result(evaluation_id, {"status": "pending"})
+    
+    assert queue.get_result("a") is None
+    assert queue.get_result("c") == {"status": "pending"}
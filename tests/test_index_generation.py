@@ -0,0 +1,90 @@
+"""Tests for index generations and hot swapping them under load."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from querying.agents import orchestrator as orchestrator_module
+from querying.agents.orchestrator import IndexGeneration, Orchestrator
+
+
+class FakeStoreManager:
+    """Stand-in for VectorStoreManager that records when it is closed."""
+    
+    def __init__(self):
+        self.closed = False
+    
+    def list_loaded_stores(self):
+        return ["finance", "hr"]
+    
+    def close(self):
+        self.closed = True
+
+
+class SlowGeneration(IndexGeneration):
+    """Generation that gives a reload time to swap it out before it is acquired."""
+    
+    def acquire(self) -> bool:
+        time.sleep(0.0001)
+        return super().acquire()
+
+
+def test_retired_generation_refuses_new_requests():
+    generation = IndexGeneration("v1", FakeStoreManager())
+    assert generation.acquire()
+    
+    generation.retire()
+    
+    assert not generation.acquire()
+    assert not generation.vector_store_manager.closed
+    generation.release()
+    assert generation.vector_store_manager.closed
+
+
+def test_reload_while_requests_are_admitted(monkeypatch):
+    versions = iter(f"v{i}" for i in range(1, 10_000))
+    monkeypatch.setattr(orchestrator_module, "resolve_index_dir", lambda path: (path, None))
+    
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator._reload_lock = threading.Lock()
+    orchestrator.index_reloads = 0
+    orchestrator.response_cache = None
+    orchestrator.agent_registry = type("Registry", (), {"AGENTS": {}})()
+    orchestrator._load_index = lambda: SlowGeneration(next(versions), FakeStoreManager())
+    orchestrator._index = orchestrator._load_index()
+    
+    stop = threading.Event()
+    closed_while_pinned = []
+    admitted = []
+    
+    def admit():
+        while not stop.is_set():
+            with orchestrator._pin_index() as generation:
+                admitted.append(generation.version)
+                if generation.vector_store_manager.closed:
+                    closed_while_pinned.append(generation.version)
+    
+    workers = [threading.Thread(target=admit) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for _ in range(300):
+        assert orchestrator.reload_index(force=True)["status"] == "swapped"
+    stop.set()
+    for worker in workers:
+        worker.join()
+    
+    assert admitted
+    assert closed_while_pinned == []
+    assert orchestrator.index_reloads == 300
+    assert not orchestrator._index.vector_store_manager.closed
+
+
+@pytest.mark.asyncio
+async def test_watch_index_returns_when_disabled(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "INDEX_WATCH_INTERVAL_SECONDS", None)
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    
+    await asyncio.wait_for(orchestrator.watch_index(), timeout=1)
+    await asyncio.wait_for(orchestrator.watch_index(0), timeout=1)
@@ -0,0 +1,25 @@
+"""Tests for the shared LLM client registry."""
+
+from utils.llm import LLMClientRegistry
+
+
+def test_clients_are_shared_per_model_and_credentials():
+    registry = LLMClientRegistry()
+    
+    chat = registry.chat_model("gpt-4o-mini", temperature=0.0, api_key="key-a")
+    
+    assert registry.chat_model("gpt-4o-mini", temperature=0.0, api_key="key-a") is chat
+    assert registry.chat_model("gpt-4o-mini", temperature=0.0, api_key="key-b") is not chat
+    assert registry.chat_model("gpt-4o-mini", temperature=0.7, api_key="key-a") is not chat
+    assert registry.embeddings("text-embedding-ada-002", api_key="key-a") is not registry.embeddings(
+        "text-embedding-ada-002", api_key="key-b"
+    )
+
+
+def test_clients_share_one_http_client():
+    registry = LLMClientRegistry()
+    
+    first = registry.chat_model("gpt-4o-mini", api_key="key-a")
+    second = registry.chat_model("gpt-4o", api_key="key-a")
+    
+    assert first.http_client is second.http_client is registry.http_client
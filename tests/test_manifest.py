@@ -0,0 +1,64 @@
+"""Tests for content-hash chunk IDs and the re-indexing manifest."""
+
+from langchain_core.documents import Document
+
+from indexing.manifest import (
+    assign_chunk_ids,
+    diff_manifest,
+    load_manifest,
+    moved_chunks,
+    save_manifest,
+)
+
+
+def make_chunk(text, start_byte=0, handbook="finance"):
+    return Document(
+        page_content=text,
+        metadata={"handbook": handbook, "start_byte": start_byte, "end_byte": start_byte + len(text)},
+    )
+
+
+def test_chunk_ids_ignore_position_and_number_duplicates():
+    first, moved, duplicate = make_chunk("Expenses"), make_chunk("Expenses", start_byte=500), make_chunk("Expenses")
+    
+    ids = assign_chunk_ids([first, duplicate])
+    
+    assert ids[0].startswith("finance_")
+    assert ids[1] == f"{ids[0]}_2"
+    assert assign_chunk_ids([moved]) == ids[:1]
+    assert assign_chunk_ids([make_chunk("Travel")]) != ids[:1]
+
+
+def test_diff_manifest_splits_added_removed_and_unchanged(tmp_path):
+    old_chunks = [make_chunk("Expenses"), make_chunk("Travel", start_byte=10)]
+    old_ids = assign_chunk_ids(old_chunks)
+    save_manifest(tmp_path, "numpy", old_chunks)
+    manifest = load_manifest(tmp_path)
+    
+    new_chunks = [make_chunk("Expenses"), make_chunk("Payroll", start_byte=10)]
+    new_ids = assign_chunk_ids(new_chunks)
+    added, removed, unchanged = diff_manifest(manifest, new_ids)
+    
+    assert manifest["vector_store_type"] == "numpy"
+    assert added == [new_ids[1]]
+    assert removed == [old_ids[1]]
+    assert unchanged == [old_ids[0]]
+
+
+def test_moved_chunks_need_only_a_metadata_refresh(tmp_path):
+    old_chunks = [make_chunk("Expenses"), make_chunk("Travel", start_byte=10)]
+    assign_chunk_ids(old_chunks)
+    save_manifest(tmp_path, "faiss", old_chunks)
+    manifest = load_manifest(tmp_path)
+    
+    # A new section before "Travel" shifts it without changing its content
+    new_chunks = [make_chunk("Expenses"), make_chunk("Travel", start_byte=40)]
+    new_ids = assign_chunk_ids(new_chunks)
+    _, _, unchanged = diff_manifest(manifest, new_ids)
+    
+    assert unchanged == new_ids
+    assert moved_chunks(manifest, new_chunks, unchanged) == [new_chunks[1]]
+
+
+def test_missing_manifest_is_none(tmp_path):
+    assert load_manifest(tmp_path) is None
@@ -0,0 +1,77 @@
+"""Tests for the index build RateLimiter."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from indexing import pipeline
+from indexing.pipeline import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock that `asyncio.sleep` in the pipeline advances."""
+    clock = SimpleNamespace(now=0.0, sleeps=[])
+    
+    async def sleep(seconds):
+        clock.sleeps.append(seconds)
+        clock.now += seconds
+    
+    monkeypatch.setattr(pipeline, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(pipeline, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=sleep))
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_burst_up_to_the_budget_does_not_wait(clock):
+    limiter = RateLimiter(requests_per_minute=3, tokens_per_minute=1000)
+    for _ in range(3):
+        await limiter.acquire(100)
+    
+    assert clock.sleeps == []
+    assert limiter.waited_seconds == 0.0
+
+
+@pytest.mark.asyncio
+async def test_request_budget_refills_continuously(clock):
+    limiter = RateLimiter(requests_per_minute=2)
+    await limiter.acquire(1)
+    await limiter.acquire(1)
+    await limiter.acquire(1)
+    
+    assert clock.sleeps == [pytest.approx(30.0)]
+    
+    # Half a minute later one more request fits without waiting
+    clock.now += 30.0
+    await limiter.acquire(1)
+    assert len(clock.sleeps) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_budget_waits_for_the_missing_tokens(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    await limiter.acquire(500)
+    await limiter.acquire(400)
+    
+    # 100 tokens left, 300 more accrue in 30 seconds
+    assert clock.sleeps == [pytest.approx(30.0)]
+    assert limiter.waited_seconds == pytest.approx(30.0)
+
+
+@pytest.mark.asyncio
+async def test_oversized_request_waits_for_a_full_bucket(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    await limiter.acquire(300)
+    await limiter.acquire(5000)
+    
+    assert clock.sleeps == [pytest.approx(30.0)]
+
+
+@pytest.mark.asyncio
+async def test_unlimited_limiter_never_waits(clock):
+    limiter = RateLimiter()
+    for _ in range(100):
+        await limiter.acquire(10_000)
+    
+    assert clock.sleeps == []
@@ -0,0 +1,92 @@
+"""Tests for the index-versioned ResponseCache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from querying.cache import ResponseCache
+from utils.storage import write_index_version
+
+
+def make_response(content="Answer", **metadata):
+    return SimpleNamespace(
+        content=content,
+        agents_used=["finance"],
+        responses=[SimpleNamespace(content=content, sources=[], metadata={})],
+        metadata=metadata,
+    )
+
+
+def test_hit_requires_matching_min_similarity(tmp_path):
+    cache = ResponseCache(tmp_path)
+    response = make_response()
+    cache.put([1.0, 0.0], 0.7, response)
+    
+    assert cache.get([1.0, 0.0], 0.7) is response
+    assert cache.get([1.0, 0.0], 0.5) is None
+
+
+def test_failed_answers_are_not_cached(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put([1.0, 0.0], 0.7, make_response(error="timeout", fallback_used=True))
+    
+    assert cache.get([1.0, 0.0], 0.7) is None
+    assert cache.stats()["by_agent"]["finance"]["misses"] == 1
+
+
+def test_index_version_is_read_once(tmp_path):
+    write_index_version(tmp_path, "v1")
+    cache = ResponseCache(tmp_path)
+    cache.put([1.0, 0.0], 0.7, make_response())
+    
+    # A rebuild on disk does not change the version being served until it is pinned
+    write_index_version(tmp_path, "v2")
+    assert cache.get([1.0, 0.0], 0.7) is not None
+    assert cache.stats()["index_version"] == "v1"
+    
+    cache.set_index_version("v2")
+    assert cache.get([1.0, 0.0], 0.7) is None
+
+
+def test_requests_on_another_version_bypass_the_cache(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.set_index_version("v2")
+    cache.put([1.0, 0.0], 0.7, make_response(), index_version="v1")
+    
+    assert cache.get([1.0, 0.0], 0.7, index_version="v2") is None
+    
+    cache.put([1.0, 0.0], 0.7, make_response(), index_version="v2")
+    assert cache.get([1.0, 0.0], 0.7, index_version="v1") is None
+    assert cache.get([1.0, 0.0], 0.7, index_version="v2") is not None
+
+
+@pytest.mark.asyncio
+async def test_reused_answer_drops_per_request_metadata():
+    from querying.agents.orchestrator import Orchestrator, OrchestratorResponse
+    from querying.session_store import ConversationContext, InMemorySessionStore
+    
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.session_store = InMemorySessionStore()
+    cached = OrchestratorResponse(
+        content="Answer",
+        agents_used=["finance"],
+        metadata={
+            "session_id": "first",
+            "conversation_length": 2,
+            "evaluation_id": "eval-1",
+            "timings": {"total_ms": 900.0},
+            "processing_mode": "single",
+        },
+    )
+    context = ConversationContext(session_id="second")
+    context.add_message("user", "Question")
+    
+    response = await orchestrator._areuse_cached_response(cached, context, timings={"total_ms": 12.34})
+    
+    assert "evaluation_id" not in response.metadata
+    assert response.metadata["session_id"] == "second"
+    assert response.metadata["conversation_length"] == 2
+    assert response.metadata["timings"] == {"total_ms": 12.3}
+    assert response.metadata["processing_mode"] == "single"
+    assert response.metadata["response_cache_hit"] is True
+    assert cached.metadata["evaluation_id"] == "eval-1"
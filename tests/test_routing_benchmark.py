@@ -0,0 +1,17 @@
+"""Tests for the routing benchmark's routing-cache margin report."""
+
+from evaluation.routing_benchmark import _closest_conflicting_queries
+
+
+def test_closest_conflicting_queries_ignores_same_route_pairs():
+    embeddings = [[1.0, 0.0], [1.0, 0.01], [1.0, 0.2], [0.0, 1.0]]
+    expected = [["finance"], ["finance"], ["tech"], ["hr"]]
+    
+    distance, i, j = _closest_conflicting_queries(embeddings, expected)
+    
+    assert {i, j} == {1, 2}
+    assert 0.0 < distance < 0.05
+
+
+def test_closest_conflicting_queries_none_without_conflicts():
+    assert _closest_conflicting_queries([[1.0, 0.0], [0.0, 1.0]], [["tech"], ["tech"]]) is None
@@ -48,7 +48,8 @@ async def run_tests(
     
     # Initialize orchestrator
     print("\nInitializing orchestrator...")
-    orchestrator = Orchestrator()
+    # Inline evaluation so each response carries its quality score
+    orchestrator = Orchestrator(evaluation_mode="inline")
     print("✓ Orchestrator initialized")
     
     # Load datasets
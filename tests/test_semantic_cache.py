@@ -0,0 +1,86 @@
+"""Tests for the embedding-keyed SemanticCache."""
+
+import time
+
+from querying.cache import SemanticCache
+
+
+def test_hit_within_max_distance_and_miss_beyond():
+    cache = SemanticCache(max_entries=4, max_distance=0.02)
+    cache.put([1.0, 0.0], "finance")
+    
+    assert cache.get([1.0, 0.1]) == "finance"  # distance ~0.005
+    assert cache.get([1.0, 0.3]) is None  # distance ~0.042
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_nearest_entry_wins():
+    cache = SemanticCache(max_entries=4, max_distance=0.5)
+    cache.put([1.0, 0.0], "a")
+    cache.put([0.0, 1.0], "b")
+    
+    assert cache.get([0.2, 1.0]) == "b"
+
+
+def test_keys_partition_entries():
+    cache = SemanticCache(max_entries=4)
+    cache.put([1.0, 0.0], "strict", key=0.9)
+    
+    assert cache.get([1.0, 0.0], key=0.9) == "strict"
+    assert cache.get([1.0, 0.0], key=0.5) is None
+    assert cache.get([1.0, 0.0]) is None
+
+
+def test_least_recently_used_entry_is_replaced():
+    cache = SemanticCache(max_entries=2, max_distance=0.01)
+    cache.put([1.0, 0.0, 0.0], "a")
+    time.sleep(0.001)
+    cache.put([0.0, 1.0, 0.0], "b")
+    time.sleep(0.001)
+    assert cache.get([1.0, 0.0, 0.0]) == "a"
+    time.sleep(0.001)
+    cache.put([0.0, 0.0, 1.0], "c")
+    
+    assert cache.get([0.0, 1.0, 0.0]) is None
+    assert cache.get([1.0, 0.0, 0.0]) == "a"
+    assert cache.get([0.0, 0.0, 1.0]) == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = SemanticCache(max_entries=2, ttl_seconds=0.05)
+    cache.put([1.0, 0.0], "a")
+    time.sleep(0.1)
+    
+    assert cache.get([1.0, 0.0]) is None
+    assert len(cache) == 0
+
+
+def test_changing_version_drops_entries():
+    cache = SemanticCache(max_entries=2)
+    cache.set_version("v1")
+    cache.put([1.0, 0.0], "a")
+    cache.set_version("v1")
+    assert cache.get([1.0, 0.0]) == "a"
+    
+    cache.set_version("v2")
+    
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_byte_budget_evicts_until_the_entry_fits():
+    cache = SemanticCache(max_entries=4, max_distance=0.01, max_bytes=100)
+    cache.put([1.0, 0.0, 0.0], "a", size=60)
+    time.sleep(0.001)
+    cache.put([0.0, 1.0, 0.0], "b", size=30)
+    time.sleep(0.001)
+    cache.put([0.0, 0.0, 1.0], "c", size=50)
+    
+    assert cache.get([1.0, 0.0, 0.0]) is None
+    assert cache.get([0.0, 1.0, 0.0]) == "b"
+    assert cache.stats()["bytes"] == 80
+    
+    cache.put([1.0, 1.0, 0.0], "too big", size=101)
+    assert cache.get([1.0, 1.0, 0.0]) is None
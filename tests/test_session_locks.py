@@ -0,0 +1,69 @@
+"""Tests for per-session turn locks."""
+
+import asyncio
+
+import pytest
+
+from querying.agents.orchestrator import OrchestratorResponse, _one_turn_per_session
+from querying.session_store import SessionBusyError, SessionLocks
+
+
+@pytest.mark.asyncio
+async def test_turns_of_a_session_run_in_arrival_order():
+    locks = SessionLocks()
+    order = []
+    
+    async def turn(session_id, name):
+        async with locks.hold(session_id):
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+    
+    await asyncio.gather(turn("a", "first"), turn("a", "second"), turn("b", "other"))
+    
+    assert order.index("first end") < order.index("second start")
+    # Another session does not wait
+    assert order.index("other start") < order.index("first end")
+    assert locks.stats()["waited_turns"] == 1
+    assert locks.stats()["active_sessions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_session_with_max_pending_turns_rejects_more():
+    locks = SessionLocks(max_pending=1)
+    release = asyncio.Event()
+    
+    async def turn():
+        async with locks.hold("a"):
+            await release.wait()
+    
+    running = [asyncio.create_task(turn()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert locks.pending("a") == 1
+    
+    with pytest.raises(SessionBusyError):
+        async with locks.hold("a"):
+            pass
+    
+    release.set()
+    await asyncio.gather(*running)
+    assert locks.stats()["rejected"] == 1
+    assert not locks.is_busy("a")
+
+
+@pytest.mark.asyncio
+async def test_session_wait_is_recorded_on_a_copy_of_the_response():
+    shared = OrchestratorResponse(content="Answer", agents_used=["finance"], metadata={"timings": {"total_ms": 5.0}})
+    
+    class Orchestrator:
+        session_locks = SessionLocks()
+        
+        @_one_turn_per_session
+        async def process_query_async(self, query, session_id="default"):
+            return shared
+    
+    response = await Orchestrator().process_query_async("Question", session_id="a")
+    
+    assert response.metadata["timings"]["session_wait_ms"] >= 0
+    assert response.metadata["timings"]["total_ms"] == 5.0
+    assert shared.metadata == {"timings": {"total_ms": 5.0}}
@@ -0,0 +1,123 @@
+"""Tests for the bounded conversation session stores."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from querying import session_store
+from querying.session_store import InMemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake clock for both the monotonic (memory) and wall (SQLite) time of the stores."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        session_store, "time", SimpleNamespace(monotonic=lambda: clock.now, time=lambda: clock.now)
+    )
+    return clock
+
+
+def answer(context, text, agent="finance"):
+    context.add_message("assistant", text)
+    context.add_agents([agent])
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_memory_store_evicts_least_recently_used(clock):
+    store = InMemorySessionStore(max_sessions=2)
+    store.get_or_create("a")
+    clock.now += 1
+    store.get_or_create("b")
+    clock.now += 1
+    store.get("a")
+    store.get_or_create("c")
+    
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.stats()["evictions"] == 1
+
+
+def test_memory_store_drops_idle_sessions(clock):
+    store = InMemorySessionStore(ttl_seconds=60)
+    store.get_or_create("a").add_message("user", "Hello")
+    clock.now += 30
+    store.get_or_create("b")
+    clock.now += 31
+    
+    assert store.get("a") is None
+    assert store.get("b") is not None
+    assert store.stats()["expirations"] == 1
+
+
+def test_sqlite_store_round_trip_and_ttl(tmp_path, clock):
+    store = SQLiteSessionStore(tmp_path / "sessions.sqlite3", ttl_seconds=60)
+    context = store.get_or_create("a")
+    context.add_message("user", "Hello")
+    answer(context, "Hi")
+    store.save(context)
+    
+    stored = SQLiteSessionStore(tmp_path / "sessions.sqlite3", ttl_seconds=60).get("a")
+    assert list(stored.messages) == list(context.messages)
+    assert stored.last_agent == "finance"
+    assert stored.version == 1
+    
+    clock.now += 61
+    assert store.get("a") is None
+    # A new session replaces the expired row
+    fresh = store.get_or_create("a")
+    fresh.add_message("user", "Again")
+    store.save(fresh)
+    assert [message["content"] for message in store.get("a").messages] == ["Again"]
+
+
+def test_sqlite_sweep_evicts_least_recently_used(tmp_path, clock):
+    store = SQLiteSessionStore(tmp_path / "sessions.sqlite3", max_sessions=2, sweep_interval=3)
+    for session_id in ("a", "b", "c"):
+        clock.now += 1
+        store.save(store.get_or_create(session_id))
+    
+    assert store.get("a") is None
+    assert store.stats()["sessions"] == 2
+    assert store.stats()["evictions"] == 1
+
+
+def test_concurrent_turns_from_two_workers_are_merged(tmp_path):
+    path = tmp_path / "sessions.sqlite3"
+    first_worker, second_worker = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    context = first_worker.get_or_create("a")
+    context.add_message("user", "Hello")
+    answer(context, "Hi")
+    first_worker.save(context)
+    
+    # Both workers load the session, then both save a turn
+    first, second = first_worker.get("a"), second_worker.get("a")
+    first.add_message("user", "Expenses?")
+    answer(first, "Monthly", agent="finance")
+    second.add_message("user", "Holidays?")
+    answer(second, "25 days", agent="hr")
+    first_worker.save(first)
+    second_worker.save(second)
+    
+    stored = first_worker.get("a")
+    assert [message["content"] for message in stored.messages] == [
+        "Hello", "Hi", "Expenses?", "Monthly", "Holidays?", "25 days",
+    ]
+    assert list(stored.agent_history) == ["finance", "finance", "hr"]
+    assert stored.last_agent == "hr"
+    assert stored.version == 3
+    assert second_worker.stats()["conflicts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_async_variants(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.sqlite3")
+    context = await store.aget_or_create("a")
+    context.add_message("user", "Hello")
+    await store.asave(context)
+    
+    assert (await store.aget_or_create("a")).version == 1
@@ -0,0 +1,90 @@
+"""Tests for SingleFlight coalescing of identical in-flight requests."""
+
+import asyncio
+
+import pytest
+
+from querying.cache import SingleFlight
+
+
+async def started(event: asyncio.Event, result, delay: float = 0.01):
+    event.set()
+    await asyncio.sleep(delay)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_waiting_callers_share_the_leaders_result():
+    flights = SingleFlight()
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+    
+    results = await asyncio.gather(*(flights.run("key", compute) for _ in range(3)))
+    
+    assert results == [("answer", False), ("answer", True), ("answer", True)]
+    assert calls == [1]
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 2}
+
+
+@pytest.mark.asyncio
+async def test_failed_computation_is_rerun_by_a_waiting_caller():
+    flights = SingleFlight()
+    leader_started = asyncio.Event()
+    
+    async def fail():
+        leader_started.set()
+        await asyncio.sleep(0.01)
+        raise RuntimeError("LLM unavailable")
+    
+    leader = asyncio.create_task(flights.run("key", fail))
+    await leader_started.wait()
+    follower = await flights.run("key", lambda: asyncio.sleep(0, result="answer"))
+    
+    with pytest.raises(RuntimeError):
+        await leader
+    assert follower == ("answer", False)
+    assert flights.stats()["leaders"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_waiting_callers():
+    flights = SingleFlight()
+    leader_started = asyncio.Event()
+    leader = asyncio.create_task(flights.run("key", lambda: started(leader_started, "answer", delay=10)))
+    await leader_started.wait()
+    
+    follower = asyncio.create_task(flights.run("key", lambda: asyncio.sleep(0, result="own answer")))
+    await asyncio.sleep(0)
+    leader.cancel()
+    
+    assert await follower == ("own answer", False)
+    assert leader.cancelled()
+    assert flights.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unshareable_results_are_not_handed_to_waiting_callers():
+    flights = SingleFlight()
+    leader_started = asyncio.Event()
+    shareable = lambda result: result != "fallback"
+    
+    leader = asyncio.create_task(
+        flights.run("key", lambda: started(leader_started, "fallback"), shareable=shareable)
+    )
+    await leader_started.wait()
+    follower = await flights.run("key", lambda: asyncio.sleep(0, result="answer"), shareable=shareable)
+    
+    assert await leader == ("fallback", False)
+    assert follower == ("answer", False)
+    assert flights.stats()["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_join_without_flight_returns_none():
+    flights = SingleFlight()
+    
+    assert await flights.join("key") is None
@@ -0,0 +1,69 @@
+"""Tests for the streaming markdown chunker and its byte offsets."""
+
+from indexing.streaming_chunker import StreamingMarkdownChunker, iter_markdown_file_chunks
+
+HEADERS = [("#", "Header 1"), ("##", "Header 2")]
+
+HANDBOOK = """# Café policy
+
+Crème brûlée is served on Fridays — naïve estimates aside.
+
+## Payments
+
+Pay with the card.
+
+```
+# not a header
+```
+
+## Refunds
+
+Keep every receipt.
+"""
+
+
+def make_chunker(**kwargs):
+    return StreamingMarkdownChunker(headers_to_split_on=HEADERS, separators=["\n\n", "\n", " ", ""], **kwargs)
+
+
+def assert_offsets_match(chunks, source: bytes):
+    for chunk in chunks:
+        assert source[chunk.metadata["start_byte"]:chunk.metadata["end_byte"]].decode("utf-8") == chunk.page_content
+
+
+def test_sections_split_at_headers_with_byte_offsets():
+    chunks = list(make_chunker(chunk_size=1000, chunk_overlap=0).iter_chunks(HANDBOOK, "finance"))
+    
+    assert [chunk.metadata["header_path"] for chunk in chunks] == [
+        "Café policy",
+        "Café policy > Payments",
+        "Café policy > Refunds",
+    ]
+    assert chunks[0].page_content.startswith("# Café policy")
+    assert "# not a header" in chunks[1].page_content
+    assert chunks[2].metadata["Header 2"] == "Refunds"
+    assert chunks[2].metadata["source"] == "finance.md"
+    assert_offsets_match(chunks, HANDBOOK.encode("utf-8"))
+
+
+def test_long_sections_are_cut_with_overlap():
+    text = "# Rules\n\n" + " ".join(f"rülé{i}" for i in range(60)) + "\n"
+    chunks = list(make_chunker(chunk_size=80, chunk_overlap=20).iter_chunks(text, "hr"))
+    
+    assert len(chunks) > 3
+    assert all(len(chunk.page_content) <= 80 for chunk in chunks)
+    assert all(chunk.metadata["header_path"] == "Rules" for chunk in chunks)
+    # Consecutive pieces overlap in the source
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.metadata["start_byte"] < previous.metadata["end_byte"]
+    assert_offsets_match(chunks, text.encode("utf-8"))
+
+
+def test_file_offsets_match_crlf_files(tmp_path):
+    path = tmp_path / "general.md"
+    path.write_bytes(HANDBOOK.replace("\n", "\r\n").encode("utf-8"))
+    
+    chunks = list(iter_markdown_file_chunks(path))
+    
+    assert chunks[0].metadata["handbook"] == "general"
+    assert_offsets_match(chunks, path.read_bytes())
@@ -0,0 +1,37 @@
+"""Tests for handbook searches through the VectorStoreManager."""
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from querying.tools.vector_store_manager import VectorStoreManager
+
+
+def make_unified_manager(monkeypatch, embeddings):
+    store = FAISS.from_texts(
+        ["Expenses are reimbursed monthly.", "Holidays: 25 days.", "Laptops are replaced every 3 years."],
+        embeddings,
+        metadatas=[{"handbook": "finance"}, {"handbook": "hr"}, {"handbook": "tech"}],
+    )
+    manager = VectorStoreManager.__new__(VectorStoreManager)
+    manager.unified = True
+    manager._stores = {}
+    manager._unified_store = store
+    monkeypatch.setattr(manager, "embed_query", embeddings.embed_query)
+    return manager
+
+
+def test_unified_search_embeds_the_query_when_no_embedding_is_given(monkeypatch):
+    embeddings = DeterministicFakeEmbedding(size=8)
+    manager = make_unified_manager(monkeypatch, embeddings)
+    
+    results = manager.search_handbooks("How are expenses reimbursed?", ["finance", "hr"], k=2)
+    
+    assert set(results) == {"finance", "hr"}
+    assert [doc.metadata["handbook"] for doc, _ in results["finance"]] == ["finance"]
+    assert [doc.metadata["handbook"] for doc, _ in results["hr"]] == ["hr"]
+    assert results == manager.search_handbooks(
+        "How are expenses reimbursed?",
+        ["finance", "hr"],
+        k=2,
+        query_embedding=embeddings.embed_query("How are expenses reimbursed?"),
+    )